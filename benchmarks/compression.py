@@ -0,0 +1,90 @@
+from deeplearning.utils.config import Config
+from deeplearning.utils.pipelines import serialize_image_batch, tfrecord_suffix, write_tfrecords
+
+import argparse
+import datetime
+import logging
+import numpy  # type: ignore
+import os
+import sys
+import tempfile
+import tensorflow as tf  # type: ignore
+import time
+
+
+''' Set up the Python Logger using the configuration class defaults.'''
+handler: logging.Handler
+logger: logging.Logger = logging.getLogger(__name__)
+
+conf = Config()
+conf.configure(config=None)
+
+try:
+    formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+    if conf.configuration["logging"]["type"] == 'stream':
+        handler = logging.StreamHandler()
+        handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+    if conf.configuration["logging"]["type"] == 'file':
+        logdate = datetime.datetime.now()
+        handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_compression_benchmark.log')
+
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+        logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+        logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+except Exception as e:
+    raise e
+
+logger.info(f'Using Tensorflow version {tf.__version__}')
+
+''' Configure argument parsing, for convenience.'''
+parser = argparse.ArgumentParser()
+
+''' Optional local copy of mnist.npz; defaults to the keras dataset cache.'''
+parser.add_argument('--data-path', action='store', dest='data_path')
+parser.add_argument('--encoding', action='store', dest='encoding', default='raw', choices=['raw', 'tensor'])
+
+args = parser.parse_args()
+
+''' Load the MNIST dataset in numpy.'''
+if args.data_path is not None:
+    with numpy.load(args.data_path, allow_pickle=True) as data:
+        images, labels = numpy.concatenate((data['x_train'], data['x_test'])), numpy.concatenate((data['y_train'], data['y_test']))
+else:
+    (x_train, y_train), (x_test, y_test) = tf.keras.datasets.mnist.load_data()
+    images, labels = numpy.concatenate((x_train, x_test)), numpy.concatenate((y_train, y_test))
+
+images = numpy.expand_dims(images, -1)
+if args.encoding == 'tensor':
+    images = images.astype('float32') / 255.0
+    labels = tf.keras.utils.to_categorical(labels, num_classes=10)
+
+records = list(serialize_image_batch(images, labels, encoding=args.encoding))
+record_bytes = sum(len(record) for record in records)
+logger.info(f'Serialized {len(records)} MNIST images with {args.encoding} encoding to {record_bytes} bytes.')
+
+''' Write and read back the records with each codec.'''
+with tempfile.TemporaryDirectory(prefix='mnist-codecs') as temp_root:
+    for compression in [None, 'GZIP', 'ZLIB']:
+        path = os.path.join(temp_root, f'mnist{tfrecord_suffix(compression)}')
+
+        start = time.perf_counter()
+        write_tfrecords(records, path, compression=compression)
+        write_time = time.perf_counter() - start
+        size = os.stat(path).st_size
+
+        start = time.perf_counter()
+        count = 0
+        for batch in tf.data.TFRecordDataset(path, compression_type=compression or '', buffer_size=8 * 1024 * 1024).batch(1024):
+            count += int(batch.shape[0])
+        read_time = time.perf_counter() - start
+
+        logger.info(f'Codec {compression or "NONE"}: {size} bytes written ({size / (1024 * 1024):.1f} MiB), '
+                    f'write {record_bytes / (1024 * 1024) / write_time:.1f} MiB/s of records ({len(records) / write_time:.0f} records/s), '
+                    f'read {count / read_time:.0f} records/s.')
@@ -0,0 +1,84 @@
+from deeplearning.utils.config import Config
+from deeplearning.utils.pipelines import create_beam_pipeline_args, create_csv_pipeline
+
+import argparse
+import datetime
+import logging
+import numpy  # type: ignore
+import os
+import sys
+import tempfile
+import tfx.v1 as tfx  # type: ignore
+import time
+
+
+''' Set up the Python Logger using the configuration class defaults.'''
+handler: logging.Handler
+logger: logging.Logger = logging.getLogger(__name__)
+
+conf = Config()
+conf.configure(config=None)
+
+try:
+    formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+    if conf.configuration["logging"]["type"] == 'stream':
+        handler = logging.StreamHandler()
+        handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+    if conf.configuration["logging"]["type"] == 'file':
+        logdate = datetime.datetime.now()
+        handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_examplegen_benchmark.log')
+
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+        logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+        logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+except Exception as e:
+    raise e
+
+logger.info(f'Using TFX version {tfx.__version__}')
+
+''' Configure argument parsing, for convenience.'''
+parser = argparse.ArgumentParser()
+
+''' Size of the generated CSV input.'''
+parser.add_argument('--files', action='store', dest='files', default=16, type=int)
+parser.add_argument('--rows', action='store', dest='rows', default=100000, type=int)
+
+args = parser.parse_args()
+
+''' Compare a single in-process Beam worker with the configured parallelism.'''
+runs: dict = {
+    'single worker': create_beam_pipeline_args({'direct_num_workers': 1, 'direct_running_mode': 'in_memory'}),
+    'configured': create_beam_pipeline_args(conf.configuration["pipelines"]["beam"])
+}
+
+with tempfile.TemporaryDirectory(prefix='examplegen-benchmark') as temp_root:
+
+    ''' Generate a multi-file CSV input with penguins-like numeric features.'''
+    data_root = os.path.join(temp_root, 'data')
+    os.makedirs(data_root)
+    rng = numpy.random.default_rng(seed=42)
+    for index in range(args.files):
+        data = numpy.column_stack((rng.integers(0, 3, size=args.rows), rng.random(size=(args.rows, 4))))
+        numpy.savetxt(os.path.join(data_root, f'penguins-{index:05d}-of-{args.files:05d}.csv'), data,
+                      delimiter=',', fmt=['%d', '%.6f', '%.6f', '%.6f', '%.6f'],
+                      header='species,culmen_length_mm,culmen_depth_mm,flipper_length_mm,body_mass_g', comments='')
+    logger.info(f'Generated {args.files} CSV files with {args.rows} rows each in {data_root}.')
+
+    for label, beam_pipeline_args in runs.items():
+        pipeline_root = os.path.join(temp_root, 'pipelines', label.replace(' ', '-'))
+        pipeline = create_csv_pipeline(pipeline_name='penguins',
+                                       pipeline_root=pipeline_root,
+                                       data_root=data_root,
+                                       metadata_path=os.path.join(pipeline_root, 'metadata/metadata.db'),
+                                       beam_pipeline_args=beam_pipeline_args)
+
+        start = time.perf_counter()
+        tfx.orchestration.LocalDagRunner().run(pipeline)
+        logger.info(f'ExampleGen with {label} Beam args {beam_pipeline_args} ran in {time.perf_counter() - start:.1f}s.')
@@ -0,0 +1,81 @@
+from deeplearning.utils.config import Config
+from deeplearning.utils.processors import BatchManager, dequeue, dequeue_many, enqueue, enqueue_many
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+import time
+
+
+''' Set up the Python Logger using the configuration class defaults.'''
+handler: logging.Handler
+logger: logging.Logger = logging.getLogger(__name__)
+
+conf = Config()
+conf.configure(config=None)
+
+try:
+    formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+    if conf.configuration["logging"]["type"] == 'stream':
+        handler = logging.StreamHandler()
+        handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+    if conf.configuration["logging"]["type"] == 'file':
+        logdate = datetime.datetime.now()
+        handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_queues_benchmark.log')
+
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+        logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+        logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+except Exception as e:
+    raise e
+
+''' Configure argument parsing, for convenience.'''
+parser = argparse.ArgumentParser()
+
+''' Benchmark size and batching parameters.'''
+parser.add_argument('--items', action='store', dest='items', default=20000, type=int)
+parser.add_argument('--batch-size', action='store', dest='batch_size', default=256, type=int)
+
+args = parser.parse_args()
+
+''' Work items shaped like the (logname, pid, ppid) tuples of the multiprocessing template.'''
+items: list = [(f'__{index}__', index, os.getpid()) for index in range(args.items)]
+
+''' Each manager queue call is a round trip to the manager process, so time the wrappers against a manager proxy.'''
+with BatchManager() as manager:
+
+    ''' Time the per-item wrappers.'''
+    queue = manager.Queue()
+    start = time.perf_counter()
+    for item in items:
+        enqueue(item, queue)
+    results: list = [dequeue(queue) for _ in range(args.items)]
+    per_item = time.perf_counter() - start
+    assert results == items
+    logger.info(f'Per-item wrappers: {args.items} items in {per_item:.2f}s ({2 * args.items} round trips, {args.items / per_item:.0f} items/s).')
+
+    ''' Time the batch wrappers.'''
+    queue = manager.BatchQueue()  # type: ignore[attr-defined]
+    start = time.perf_counter()
+    round_trips: int = 0
+    for index in range(0, args.items, args.batch_size):
+        enqueue_many(items[index:index + args.batch_size], queue)
+        round_trips += 1
+    results = []
+    while len(results) < args.items:
+        results.extend(dequeue_many(queue, args.batch_size, timeout=1))
+        round_trips += 1
+    batched = time.perf_counter() - start
+    assert results == items
+    logger.info(f'Batch wrappers: {args.items} items in {batched:.2f}s ({round_trips} round trips, {args.items / batched:.0f} items/s).')
+
+logger.info(f'Batched queue speedup: {per_item / batched:.1f}x.')
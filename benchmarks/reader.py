@@ -0,0 +1,126 @@
+from deeplearning.utils.config import Config
+from deeplearning.utils.pipelines import load_image_dataset, write_sharded_tfrecords
+
+import argparse
+import datetime
+import logging
+import numpy  # type: ignore
+import os
+import sys
+import tempfile
+import tensorflow as tf  # type: ignore
+import time
+
+
+''' Spawned worker processes re-import the main module, so only run the script as the main process.'''
+if __name__ == '__main__':
+    ''' Set up the Python Logger using the configuration class defaults.'''
+    handler: logging.Handler
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    conf = Config()
+    conf.configure(config=None)
+
+    try:
+        formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+        if conf.configuration["logging"]["type"] == 'stream':
+            handler = logging.StreamHandler()
+            handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+        if conf.configuration["logging"]["type"] == 'file':
+            logdate = datetime.datetime.now()
+            handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_reader_benchmark.log')
+
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.propagate = False
+
+        if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+            logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+            logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+    except Exception as e:
+        raise e
+
+    logger.info(f'Using Tensorflow version {tf.__version__}')
+
+    ''' Configure argument parsing, for convenience.'''
+    parser = argparse.ArgumentParser()
+
+    ''' Optional local copy of mnist.npz; defaults to the keras dataset cache.'''
+    parser.add_argument('--data-path', action='store', dest='data_path')
+    parser.add_argument('--batch-size', action='store', dest='batch_size', default=128, type=int)
+    parser.add_argument('--epochs', action='store', dest='epochs', default=3, type=int)
+    parser.add_argument('--shards', action='store', dest='shards', default=os.cpu_count() or 1, type=int)
+
+    ''' Optionally train SequentialConv2D for one epoch on each input path.'''
+    parser.add_argument('--fit', action='store_true', dest='fit')
+
+    args = parser.parse_args()
+
+    '''
+    Configure and import Keras and our custom sequential model class.
+    We can't reconfigure the keras backend once it's imported.
+    '''
+    os.environ["KERAS_BACKEND"] = conf.configuration["keras"]["backend"]
+
+    import keras  # type: ignore # noqa: E402
+    from deeplearning.models.seq_conv_2d import SequentialConv2D  # noqa: E402
+
+    def load_mnist():
+        ''' Load the raw MNIST training data in numpy.'''
+        if args.data_path is not None:
+            with numpy.load(args.data_path, allow_pickle=True) as data:
+                return data['x_train'], data['y_train']
+        (x_train, y_train), _ = keras.datasets.mnist.load_data()
+        return x_train, y_train
+
+    def throughput(dataset, epochs: int):
+        ''' Iterate a dataset and return examples per second for each epoch.'''
+        rates: list = []
+        for _ in range(epochs):
+            start = time.perf_counter()
+            count = 0
+            for images, _ in dataset:
+                count += int(images.shape[0])
+            rates.append(count / (time.perf_counter() - start))
+        return rates
+
+    def fit(label: str, dataset, examples: int):
+        ''' Train SequentialConv2D for one epoch and log examples per second.'''
+        with SequentialConv2D(input_shape=(28, 28, 1), num_classes=10) as model:
+            model.compile(loss=keras.losses.CategoricalCrossentropy(),
+                          optimizer=keras.optimizers.Adam(learning_rate=1e-3),
+                          metrics=[keras.metrics.CategoricalAccuracy(name='categorical_accuracy')])
+            start = time.perf_counter()
+            model.fit(dataset, epochs=1, verbose=0)
+            logger.info(f'Trained SequentialConv2D for one epoch on the {label} path at {examples / (time.perf_counter() - start):.0f} examples/s.')
+
+    ''' The in-memory numpy path, as in examples/mnist.py.'''
+    start = time.perf_counter()
+    x_train, y_train = load_mnist()
+    x_train = numpy.expand_dims(x_train.astype('float32') / 255, -1)
+    y_train = keras.utils.to_categorical(y_train, num_classes=10)
+    numpy_dataset = tf.data.Dataset.from_tensor_slices((x_train, y_train)).batch(args.batch_size).prefetch(tf.data.AUTOTUNE)
+    logger.info(f'Prepared the in-memory numpy dataset in {time.perf_counter() - start:.2f}s.')
+    logger.info(f'In-memory numpy path: {", ".join(f"{rate:.0f}" for rate in throughput(numpy_dataset, args.epochs))} examples/s per epoch.')
+
+    if args.fit:
+        fit('in-memory numpy', numpy_dataset, x_train.shape[0])
+
+    with tempfile.TemporaryDirectory(prefix='mnist-reader') as temp_root:
+        for encoding in ['raw', 'tensor']:
+            x_train, y_train = load_mnist()
+            x_train = numpy.expand_dims(x_train, -1)
+            if encoding == 'tensor':
+                x_train = x_train.astype('float32') / 255.0
+                y_train = keras.utils.to_categorical(y_train, num_classes=10)
+            write_sharded_tfrecords(x_train, y_train, dest=temp_root, name=f'mnist-{encoding}', num_shards=args.shards, encoding=encoding)
+
+            ''' The TFRecord path; the first epoch reads files and fills the cache.'''
+            tfr_dataset = load_image_dataset(os.path.join(temp_root, f'mnist-{encoding}-*.tfrecord'), batch_size=args.batch_size, encoding=encoding)
+            logger.info(f'TFRecord {encoding} path: {", ".join(f"{rate:.0f}" for rate in throughput(tfr_dataset, args.epochs))} examples/s per epoch.')
+
+            if args.fit:
+                fit(f'TFRecord {encoding}', tfr_dataset, x_train.shape[0])
@@ -0,0 +1,76 @@
+from deeplearning.utils.config import Config
+from deeplearning.utils.pipelines import serialize_image_batch, serialize_image_data
+
+import argparse
+import datetime
+import logging
+import numpy  # type: ignore
+import os
+import sys
+import tensorflow as tf  # type: ignore
+import time
+
+
+''' Set up the Python Logger using the configuration class defaults.'''
+handler: logging.Handler
+logger: logging.Logger = logging.getLogger(__name__)
+
+conf = Config()
+conf.configure(config=None)
+
+try:
+    formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+    if conf.configuration["logging"]["type"] == 'stream':
+        handler = logging.StreamHandler()
+        handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+    if conf.configuration["logging"]["type"] == 'file':
+        logdate = datetime.datetime.now()
+        handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_serialization_benchmark.log')
+
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+        logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+        logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+except Exception as e:
+    raise e
+
+logger.info(f'Using Tensorflow version {tf.__version__}')
+
+''' Configure argument parsing, for convenience.'''
+parser = argparse.ArgumentParser()
+
+''' Benchmark size and batching parameters.'''
+parser.add_argument('--records', action='store', dest='records', default=70000, type=int)
+parser.add_argument('--batch-size', action='store', dest='batch_size', default=1024, type=int)
+
+args = parser.parse_args()
+
+''' Generate MNIST-shaped data, normalized and one-hot encoded as in the example pipelines.'''
+rng = numpy.random.default_rng(seed=42)
+images = numpy.expand_dims(rng.integers(0, 256, size=(args.records, 28, 28), dtype='uint8').astype('float32') / 255.0, -1)
+labels = tf.keras.utils.to_categorical(rng.integers(0, 10, size=args.records), num_classes=10)
+logger.info(f'Generated {args.records} images with shape {images.shape[1:]} and labels with shape {labels.shape[1:]}.')
+
+''' Time the per-record serialization path.'''
+start = time.perf_counter()
+record_bytes = 0
+for image, label in zip(images, labels):
+    record_bytes += len(serialize_image_data(image, label).SerializeToString())
+per_record = time.perf_counter() - start
+logger.info(f'Per-record path: {args.records} records, {record_bytes} bytes in {per_record:.2f}s ({args.records / per_record:.0f} records/s).')
+
+''' Time the batched serialization path.'''
+start = time.perf_counter()
+batch_bytes = 0
+for record in serialize_image_batch(images, labels, batch_size=args.batch_size):
+    batch_bytes += len(record)
+batched = time.perf_counter() - start
+logger.info(f'Batched path: {args.records} records, {batch_bytes} bytes in {batched:.2f}s ({args.records / batched:.0f} records/s).')
+
+logger.info(f'Batched serialization speedup: {per_record / batched:.1f}x.')
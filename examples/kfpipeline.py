@@ -1,14 +1,13 @@
 from deeplearning.utils.config import Config
-from deeplearning.utils.filesystem import data_fetcher, data_pusher
+from deeplearning.utils.filesystem import DownloadCache, bulk_data_pusher, data_fetcher
 from deeplearning.utils.logger import getContextLogger
-from deeplearning.utils.pipelines import create_csv_pipeline, create_tfr_pipeline, serialize_image_data
+from deeplearning.utils.pipelines import create_beam_pipeline_args, convert_npz_to_tfrecords, create_csv_pipeline, create_tfr_pipeline
 
 import argparse
 import datetime
 import kfp  # type: ignore
 import kfp.gcp as gcp  # type: ignore
 import logging
-import numpy  # type: ignore
 import os
 import sys
 import tempfile
@@ -57,6 +56,9 @@ parser.add_argument('--gcs-bucket', action='store', dest='gcs_bucket')
 
 args = parser.parse_args()
 
+''' Cache downloaded data between runs, as configured.'''
+cache = DownloadCache.from_config(conf.configuration["filesystem"]["cache"])
+
 ''' Name of the CSV pipeline.'''
 _csv_pipeline_name: str = 'penguins'
 
@@ -80,10 +82,12 @@ with getContextLogger(name='__csvf__') as csvflogger:
     csvflogger.setLevel(logging.INFO)
     csvflogger.propagate = False
 
-    ''' Fetch the pipeline input data and upload to storage.'''
+    ''' Fetch the pipeline input data through the download cache if it's enabled, otherwise stream it to storage without a local copy.'''
     csv_location = data_fetcher(name=_csv_pipeline_name,
                                 source=_csv_data_source_url,
-                                dest=_csv_data_root)
+                                dest=_csv_data_root,
+                                stream=cache is None,
+                                cache=cache)
     csvflogger.info(f'Fetched data and uploaded to bucket location {csv_location}')
 
     ''' Initialize the pipeline.'''
@@ -91,7 +95,8 @@ with getContextLogger(name='__csvf__') as csvflogger:
         pipeline_name=_csv_pipeline_name,
         pipeline_root=_csv_pipeline_root,
         data_root=_csv_data_root,
-        enable_cache=_csv_pipeline_cache
+        enable_cache=_csv_pipeline_cache,
+        beam_pipeline_args=create_beam_pipeline_args(conf.configuration["pipelines"]["beam"])
     )
     csvflogger.info(f'Created csv pipeline with id {csv_pipeline.id}.')
 
@@ -124,6 +129,9 @@ _mnst_pipeline_name: str = 'mnist'
 ''' Whether to enable the cache on the CSV pipeline.'''
 _mnst_pipeline_cache: bool = False
 
+''' Compression type of the TFRecord data, to reduce upload volume.'''
+_mnst_compression: str = 'GZIP'
+
 ''' Root path of the pipeline. Should be a cloud storage path.'''
 _mnst_pipeline_root: str = os.path.join(f'gs://{args.gcs_bucket}/pipelines',
                                         _mnst_pipeline_name)
@@ -147,56 +155,35 @@ with getContextLogger(name='__mnst__') as mnstlogger:
         ''' Fetch the pipeline input data and upload to storage.'''
         mnst_location = data_fetcher(name=_mnst_pipeline_name,
                                      source=_mnst_data_source_url,
-                                     dest=_mnst_data_temp)
+                                     dest=_mnst_data_temp,
+                                     cache=cache)
         mnstlogger.info(f'Fetched data and saved to {mnst_location} for processing.')
 
-        ''' Load the MNIST dataset in numpy.'''
-        with numpy.load(mnst_location, allow_pickle=True) as _tfr_images:
-            mnstlogger.info(f'Image datasets from {mnst_location}: {numpy.array(list(_tfr_images.keys()))}')
-            x_train, y_train = _tfr_images['x_train'], _tfr_images['y_train']
-            x_test, y_test = _tfr_images['x_test'], _tfr_images['y_test']
-
-            ''' Normalize the image data.'''
-            x_train = x_train.astype('float32') / 255.0
-            x_test = x_test.astype('float32') / 255.0
-            mnstlogger.info(f'Normalized {x_train.shape[0] + x_test.shape[0]}  to scale [0,1].')
-
-            ''' Reshape the image data.'''
-            x_train = numpy.expand_dims(x_train, -1)
-            mnstlogger.info(f'Reshaped training data to add a color channel: {x_train.shape}.')
-            x_test = numpy.expand_dims(x_test, -1)
-            mnstlogger.info(f'Reshaped test data to add a color channel: {x_test.shape}.')
-
-            ''' Reshape the labels.'''
-            y_train = tf.keras.utils.to_categorical(y_train, num_classes=10)
-            mnstlogger.info(f'Reshaped training labels to categorical for digits 0-9: {y_train.shape}.')
-            y_test = tf.keras.utils.to_categorical(y_test, num_classes=10)
-            mnstlogger.info(f'Reshaped test labels to categorical for digits 0-9: {y_test.shape}.')
-
-            ''' Get a temp dir that will be cleaned up after example generation.'''
-            with tempfile.TemporaryDirectory(prefix='-'.join((_mnst_pipeline_name, 'tfrecords'))) as _tfrecords_out:
-                _tfrecords_filepath = os.path.join(_tfrecords_out, 'mnist.tfrecord')
-                tfrecords = tf.io.TFRecordWriter(_tfrecords_filepath)
-
-                ''' Serialize the training dataset to TFRecord format.'''
-                for image, label in zip(x_train, y_train):
-                    tfrecords.write(serialize_image_data(image, label).SerializeToString())
-
-                ''' Serialize the test dataset to TFRecord format.'''
-                for image, label in zip(x_test, y_test):
-                    tfrecords.write(serialize_image_data(image, label).SerializeToString())
-
-                tfrecords.close()
+        ''' Get a temp dir that will be cleaned up after example generation.'''
+        with tempfile.TemporaryDirectory(prefix='-'.join((_mnst_pipeline_name, 'tfrecords'))) as _tfrecords_out:
+
+            ''' Stream the raw uint8 images and class ids to compressed TFRecord files; normalization and one-hot encoding happen at decode time.'''
+            _tfrecords_filepaths = convert_npz_to_tfrecords(source=mnst_location,
+                                                            dest=_tfrecords_out,
+                                                            name=_mnst_pipeline_name,
+                                                            encoding='raw',
+                                                            compression=_mnst_compression)
+
+            for _tfrecords_filepath in _tfrecords_filepaths:
                 mnstlogger.info(f'Created TFRecords file {_tfrecords_filepath} with size {round(os.stat(_tfrecords_filepath).st_size / (1024 * 1024))} MiB.')
 
-                mnst_location = data_pusher(name=_mnst_pipeline_name, source=_tfrecords_filepath, dest=_mnst_data_root)
+            ''' Push all splits concurrently over one client; each split's data is already named after the pipeline, e.g. mnist-train.'''
+            mnst_locations = bulk_data_pusher(sources=_tfrecords_filepaths, dest=_mnst_data_root, composite=True)
+            mnstlogger.info(f'Pushed TFRecords files to {mnst_locations}.')
 
     ''' Initialize the pipeline.'''
     pipeline = create_tfr_pipeline(
         pipeline_name=_mnst_pipeline_name,
         pipeline_root=_mnst_pipeline_root,
         data_root=_mnst_data_root,
-        enable_cache=_mnst_pipeline_cache
+        enable_cache=_mnst_pipeline_cache,
+        compression=_mnst_compression,
+        beam_pipeline_args=create_beam_pipeline_args(conf.configuration["pipelines"]["beam"])
     )
     mnstlogger.info(f'Created tfrecord pipeline with id {pipeline.id}.')
 
@@ -1,6 +1,7 @@
 from deeplearning.utils.config import Config
+from deeplearning.utils.filesystem import DownloadCache, data_fetcher
 from deeplearning.utils.logger import getContextLogger
-from deeplearning.utils.pipelines import create_csv_pipeline, create_tfr_pipeline, serialize_image_data
+from deeplearning.utils.pipelines import create_beam_pipeline_args, create_csv_pipeline, create_training_pipeline, write_sharded_tfrecords
 
 import datetime
 import itertools
@@ -13,141 +14,140 @@ import tempfile
 import tensorflow_datasets as tfds  # type: ignore
 import tensorflow as tf  # type: ignore
 import tfx.v1 as tfx  # type: ignore
-import urllib.request as geturl
 
 
-''' Set up the Python Logger using the configuration class defaults.'''
-handler: logging.Handler
-logger: logging.Logger = logging.getLogger(__name__)
-
-conf = Config()
-conf.configure(config=None)
-
-try:
-    formatter = logging.Formatter(conf.configuration["logging"]["format"])
-
-    if conf.configuration["logging"]["type"] == 'stream':
-        handler = logging.StreamHandler()
-        handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
-
-    if conf.configuration["logging"]["type"] == 'file':
-        logdate = datetime.datetime.now()
-        handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_example_pipeline.log')
-
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.propagate = False
-
-    if hasattr(logging, conf.configuration["logging"]["level"].upper()):
-        logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
-        logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
-
-except Exception as e:
-    raise e
-
-logger.info(f'Using Tensorflow version {tf.__version__}')
-logger.info(f'Using TFDS version {tfds.__version__}')
-logger.info(f'Using TFX version {tfx.__version__}')
-logger.info(f'Using KFP version {kfp.__version__}')  # type: ignore
-
-''' Create a pipeline with CSV data source.'''
-with getContextLogger(name='__csvf__') as csvflogger:
-    csvflogger.setLevel(logging.INFO)
-    csvflogger.propagate = False
-
-    ''' Get a temp dir that will be cleaned up after example generation.'''
-    with tempfile.TemporaryDirectory(prefix='example-data') as CSV_DATA_ROOT:
-
-        ''' Grab some data.'''
-        _data_url = 'https://raw.githubusercontent.com/tensorflow/tfx/master/tfx/examples/penguin/data/labelled/penguins_processed.csv'
-        _data_filepath = os.path.join(CSV_DATA_ROOT, 'data.csv')
-        geturl.urlretrieve(_data_url, _data_filepath)
-
-        ''' Set pipeline filesystem location parameters.'''
-        CSV_PIPELINE_NAME: str = 'penguins'
-        CSV_PIPELINE_PATH: str = os.path.join('pipelines', CSV_PIPELINE_NAME)
-        CSV_METADATA_PATH: str = os.path.join(CSV_PIPELINE_PATH, 'metadata/metadata.db')
-        CSV_SERVING_PATH: str = os.path.join(CSV_PIPELINE_PATH, 'serving')
-
-        ''' Inspect and log the data structure and top records.'''
-        with open(_data_filepath) as file:
-            csvflogger.info(f'Top records from {_data_filepath}:')
-            for line in itertools.islice(file, 0, 10):
-                csvflogger.info(line.rstrip())
-
-        ''' Define the TFX pipeline.'''
-        pipeline = create_csv_pipeline(pipeline_name=CSV_PIPELINE_NAME,
-                                       pipeline_root=CSV_PIPELINE_PATH,
-                                       data_root=CSV_DATA_ROOT,
-                                       metadata_path=CSV_METADATA_PATH)
-
-        ''' Run the pipeline locally.'''
-        tfx.orchestration.LocalDagRunner().run(pipeline)
-
-
-''' Create a pipeline with TFR data source.'''
-with getContextLogger(name='__tfrf__') as mnstlogger:
-    mnstlogger.setLevel(logging.INFO)
-    mnstlogger.propagate = False
-
-    ''' Get a temp dir that will be cleaned up after data serialization.'''
-    with tempfile.TemporaryDirectory(prefix='mnist-data') as TFR_DATA_ROOT:
-
-        ''' Grab some data.'''
-        _data_url = 'https://storage.googleapis.com/tensorflow/tf-keras-datasets/mnist.npz'
-        _data_filepath = os.path.join(TFR_DATA_ROOT, 'mnist.npz')
-        geturl.urlretrieve(_data_url, _data_filepath)
-
-        ''' Set pipeline filesystem location parameters.'''
-        TFR_PIPELINE_NAME: str = 'mnist'
-        TFR_PIPELINE_PATH: str = os.path.join('pipelines', TFR_PIPELINE_NAME)
-        TFR_METADATA_PATH: str = os.path.join(TFR_PIPELINE_PATH, 'metadata/metadata.db')
-        TFR_SERVING_PATH: str = os.path.join(TFR_PIPELINE_PATH, 'serving')
-
-        ''' Load the MNIST dataset in numpy.'''
-        with numpy.load(_data_filepath, allow_pickle=True) as data:
-            mnstlogger.info(f'Image datasets from {_data_filepath}: {numpy.array(list(data.keys()))}')
-            x_train, y_train = data['x_train'], data['y_train']
-            x_test, y_test = data['x_test'], data['y_test']
-
-            ''' Normalize the image data.'''
-            x_train = x_train.astype('float32') / 255.0
-            x_test = x_test.astype('float32') / 255.0
-            mnstlogger.info(f'Normalized {x_train.shape[0] + x_test.shape[0]}  to scale [0,1].')
-
-            ''' Reshape the image data.'''
-            x_train = numpy.expand_dims(x_train, -1)
-            mnstlogger.info(f'Reshaped training data to add a color channel: {x_train.shape}.')
-            x_test = numpy.expand_dims(x_test, -1)
-            mnstlogger.info(f'Reshaped test data to add a color channel: {x_test.shape}.')
-
-            ''' Reshape the labels.'''
-            y_train = tf.keras.utils.to_categorical(y_train, num_classes=10)
-            mnstlogger.info(f'Reshaped training labels to categorical for digits 0-9: {y_train.shape}.')
-            y_test = tf.keras.utils.to_categorical(y_test, num_classes=10)
-            mnstlogger.info(f'Reshaped test labels to categorical for digits 0-9: {y_test.shape}.')
-
-            ''' Get a temp dir that will be cleaned up after example generation.'''
-            with tempfile.TemporaryDirectory(prefix='mnist-tfr') as TFR_ROOT:
-                _tfrecord_filepath = os.path.join(TFR_ROOT, 'mnist.tfrecord')
-                records = tf.io.TFRecordWriter(_tfrecord_filepath)
-
-                ''' Serialize the training dataset to TFRecord format.'''
-                for image, label in zip(x_train, y_train):
-                    records.write(serialize_image_data(image, label).SerializeToString())
-
-                ''' Serialize the test dataset to TFRecord format.'''
-                for image, label in zip(x_test, y_test):
-                    records.write(serialize_image_data(image, label).SerializeToString())
-
-                records.close()
-                mnstlogger.info(f'Created TFRecords file {_tfrecord_filepath} with size {round(os.stat(_tfrecord_filepath).st_size / (1024 * 1024))} MiB.')
-
-                ''' Define the TFX pipeline.'''
-                pipeline = create_tfr_pipeline(pipeline_name=TFR_PIPELINE_NAME,
-                                               pipeline_root=TFR_PIPELINE_PATH,
-                                               data_root=TFR_ROOT,
-                                               metadata_path=TFR_METADATA_PATH)
+''' Spawned worker processes re-import the main module, so only run the script as the main process.'''
+if __name__ == '__main__':
+    ''' Set up the Python Logger using the configuration class defaults.'''
+    handler: logging.Handler
+    logger: logging.Logger = logging.getLogger(__name__)
+
+    conf = Config()
+    conf.configure(config=None)
+
+    try:
+        formatter = logging.Formatter(conf.configuration["logging"]["format"])
+
+        if conf.configuration["logging"]["type"] == 'stream':
+            handler = logging.StreamHandler()
+            handler.setStream(getattr(sys, conf.configuration["logging"]["path"]))
+
+        if conf.configuration["logging"]["type"] == 'file':
+            logdate = datetime.datetime.now()
+            handler = logging.FileHandler(f'{os.environ["PWD"]}/log/{logdate.strftime("%Y%m%d")}_example_pipeline.log')
+
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+        logger.propagate = False
+
+        if hasattr(logging, conf.configuration["logging"]["level"].upper()):
+            logger.setLevel(getattr(logging, conf.configuration["logging"]["level"].upper()))
+            logger.warning(f'Loglevel has been set to {logger.getEffectiveLevel()} for log {__name__}.')
+
+    except Exception as e:
+        raise e
+
+    logger.info(f'Using Tensorflow version {tf.__version__}')
+    logger.info(f'Using TFDS version {tfds.__version__}')
+    logger.info(f'Using TFX version {tfx.__version__}')
+    logger.info(f'Using KFP version {kfp.__version__}')  # type: ignore
+
+    ''' Cache downloaded data between runs, as configured.'''
+    cache = DownloadCache.from_config(conf.configuration["filesystem"]["cache"])
+
+    ''' Create a pipeline with CSV data source.'''
+    with getContextLogger(name='__csvf__') as csvflogger:
+        csvflogger.setLevel(logging.INFO)
+        csvflogger.propagate = False
+
+        ''' Get a temp dir that will be cleaned up after example generation.'''
+        with tempfile.TemporaryDirectory(prefix='example-data') as CSV_DATA_ROOT:
+
+            ''' Grab some data.'''
+            _data_url = 'https://raw.githubusercontent.com/tensorflow/tfx/master/tfx/examples/penguin/data/labelled/penguins_processed.csv'
+            _data_filepath = data_fetcher(name='data', source=_data_url, dest=CSV_DATA_ROOT, cache=cache)
+
+            ''' Set pipeline filesystem location parameters.'''
+            CSV_PIPELINE_NAME: str = 'penguins'
+            CSV_PIPELINE_PATH: str = os.path.join('pipelines', CSV_PIPELINE_NAME)
+            CSV_METADATA_PATH: str = os.path.join(CSV_PIPELINE_PATH, 'metadata/metadata.db')
+            CSV_SERVING_PATH: str = os.path.join(CSV_PIPELINE_PATH, 'serving')
+
+            ''' Inspect and log the data structure and top records.'''
+            with open(_data_filepath) as file:
+                csvflogger.info(f'Top records from {_data_filepath}:')
+                for line in itertools.islice(file, 0, 10):
+                    csvflogger.info(line.rstrip())
+
+            ''' Define the TFX pipeline.'''
+            pipeline = create_csv_pipeline(pipeline_name=CSV_PIPELINE_NAME,
+                                           pipeline_root=CSV_PIPELINE_PATH,
+                                           data_root=CSV_DATA_ROOT,
+                                           metadata_path=CSV_METADATA_PATH,
+                                           beam_pipeline_args=create_beam_pipeline_args(conf.configuration["pipelines"]["beam"]))
+
+            ''' Run the pipeline locally.'''
+            tfx.orchestration.LocalDagRunner().run(pipeline)
+
+    ''' Create a pipeline with TFR data source.'''
+    with getContextLogger(name='__tfrf__') as mnstlogger:
+        mnstlogger.setLevel(logging.INFO)
+        mnstlogger.propagate = False
+
+        ''' Get a temp dir that will be cleaned up after data serialization.'''
+        with tempfile.TemporaryDirectory(prefix='mnist-data') as TFR_DATA_ROOT:
+
+            ''' Grab some data.'''
+            _data_url = 'https://storage.googleapis.com/tensorflow/tf-keras-datasets/mnist.npz'
+            _data_filepath = data_fetcher(name='mnist', source=_data_url, dest=TFR_DATA_ROOT, cache=cache)
+
+            ''' Set pipeline filesystem location parameters.'''
+            TFR_PIPELINE_NAME: str = 'mnist'
+            TFR_PIPELINE_PATH: str = os.path.join('pipelines', TFR_PIPELINE_NAME)
+            TFR_METADATA_PATH: str = os.path.join(TFR_PIPELINE_PATH, 'metadata/metadata.db')
+            TFR_SERVING_PATH: str = os.path.join(TFR_PIPELINE_PATH, 'serving')
+
+            ''' Load the MNIST dataset in numpy.'''
+            with numpy.load(_data_filepath, allow_pickle=True) as data:
+                mnstlogger.info(f'Image datasets from {_data_filepath}: {numpy.array(list(data.keys()))}')
+                x_train, y_train = data['x_train'], data['y_train']
+                x_test, y_test = data['x_test'], data['y_test']
+
+                ''' Keep the raw uint8 pixels and class ids; normalization and one-hot encoding happen at decode time.'''
+                mnstlogger.info(f'Serializing {x_train.shape[0] + x_test.shape[0]} images with raw uint8 encoding.')
+
+                ''' Reshape the image data.'''
+                x_train = numpy.expand_dims(x_train, -1)
+                mnstlogger.info(f'Reshaped training data to add a color channel: {x_train.shape}.')
+                x_test = numpy.expand_dims(x_test, -1)
+                mnstlogger.info(f'Reshaped test data to add a color channel: {x_test.shape}.')
+
+                '''
+                Keep the TFRecord files in a stable location, and only write them when they're missing.
+                ExampleGen fingerprints its input files, so unchanged files let the cached stages be reused on later runs.
+                '''
+                TFR_ROOT: str = os.path.join(TFR_PIPELINE_PATH, 'data')
+                _num_shards: int = os.cpu_count() or 1
+                _tfrecord_paths = sorted(tf.io.gfile.glob(os.path.join(TFR_ROOT, f'{TFR_PIPELINE_NAME}-*-of-{_num_shards:05d}.tfrecord')))
+
+                if len(_tfrecord_paths) != 2 * _num_shards:
+                    ''' Serialize the training and test datasets to sharded TFRecord files, in parallel.'''
+                    _tfrecord_paths = write_sharded_tfrecords(x_train, y_train, dest=TFR_ROOT, name='-'.join((TFR_PIPELINE_NAME, 'train')), num_shards=_num_shards, encoding='raw')
+                    _tfrecord_paths += write_sharded_tfrecords(x_test, y_test, dest=TFR_ROOT, name='-'.join((TFR_PIPELINE_NAME, 'test')), num_shards=_num_shards, encoding='raw')
+
+                mnstlogger.info(f'Using {len(_tfrecord_paths)} TFRecords files in {TFR_ROOT} with size {round(sum(os.stat(path).st_size for path in _tfrecord_paths) / (1024 * 1024))} MiB.')
+
+                ''' Define the TFX training pipeline; cached stages are skipped when their inputs are unchanged.'''
+                pipeline = create_training_pipeline(pipeline_name=TFR_PIPELINE_NAME,
+                                                    pipeline_root=TFR_PIPELINE_PATH,
+                                                    data_root=TFR_ROOT,
+                                                    serving_model_dir=TFR_SERVING_PATH,
+                                                    metadata_path=TFR_METADATA_PATH,
+                                                    input_pattern={'train': f'{TFR_PIPELINE_NAME}-train-*', 'eval': f'{TFR_PIPELINE_NAME}-test-*'},
+                                                    example_gen_workers=_num_shards,
+                                                    encoding='raw',
+                                                    image_shape=x_train.shape[1:],
+                                                    beam_pipeline_args=create_beam_pipeline_args(conf.configuration["pipelines"]["beam"]))
 
                 ''' Run the pipeline locally.'''
                 tfx.orchestration.LocalDagRunner().run(pipeline)
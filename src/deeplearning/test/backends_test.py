@@ -0,0 +1,191 @@
+from deeplearning.test.servers import getDataServer, getFakeStorageServer
+from deeplearning.utils.backends import GCSBackend, LocalBackend, MemoryBackend, file_checksum, get_backend
+from deeplearning.utils.filesystem import data_fetcher, data_pusher_with_status
+from google.auth.credentials import AnonymousCredentials  # type: ignore
+from google.cloud import storage  # type: ignore
+
+import errno
+import logging
+import os
+import pytest
+import tempfile
+
+
+logger = logging.getLogger(__name__)
+
+
+def test_get_backend():
+    '''
+    Function to test that get_backend picks the storage backend from the URL scheme.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        assert isinstance(get_backend('/data/penguins'), LocalBackend)
+        assert isinstance(get_backend('file:///data/penguins'), LocalBackend)
+        assert isinstance(get_backend('gs://penguins/data', client=None, composite=True), GCSBackend)
+        assert isinstance(get_backend('memory://penguins/data'), MemoryBackend)
+
+        with pytest.raises(ValueError):
+            get_backend('s3://penguins/data')
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_local_backend(monkeypatch):
+    '''
+    Function to test moves, copies and atomic writes of the LocalBackend class, including moves across devices.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _data = os.urandom(3 * 1024 * 1024 + 5)
+    backend = LocalBackend()
+
+    with tempfile.TemporaryDirectory(prefix='local-backend-test') as temp_root:
+        try:
+            source = os.path.join(temp_root, 'source.bin')
+            with open(source, 'wb') as _source_file:
+                _source_file.write(_data)
+
+            copied = backend.put(source, os.path.join(temp_root, 'copy', 'data.bin'))
+            assert os.path.exists(source)
+            with backend.open(copied) as _copied_file:
+                assert _copied_file.read() == _data
+
+            moved = backend.put(source, f'file://{temp_root}/moved/data.bin', move=True)
+            assert not os.path.exists(source)
+            assert backend.exists(moved)
+
+            ''' Renames across devices fail with EXDEV, so the file is copied and the source removed.'''
+            def _rename(src, dst):
+                raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+            monkeypatch.setattr(os, 'rename', _rename)
+            remote = backend.put(moved[len('file://'):], os.path.join(temp_root, 'remote', 'data.bin'), move=True)
+            monkeypatch.undo()
+            assert not backend.exists(moved)
+            assert file_checksum(remote, 'md5') == file_checksum(copied, 'md5')
+            assert os.listdir(os.path.join(temp_root, 'remote')) == ['data.bin']
+
+            ''' Failed writes leave the location untouched.'''
+            with pytest.raises(RuntimeError):
+                with backend.open(remote, 'wb') as _writer:
+                    _writer.write(b'partial')
+                    raise RuntimeError('interrupted')
+            with backend.open(remote) as _remote_file:
+                assert _remote_file.read() == _data
+            assert os.listdir(os.path.join(temp_root, 'remote')) == ['data.bin']
+
+            backend.delete(remote)
+            assert not backend.exists(remote)
+
+            with pytest.raises(ValueError):
+                with backend.open(copied, 'ab'):
+                    pass
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_memory_backend():
+    '''
+    Function to test the MemoryBackend class as a data_fetcher and data_pusher destination.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _files = {'/penguins.csv': b'species,island\nAdelie,Torgersen\n'}
+    backend = MemoryBackend()
+
+    with getDataServer(_files) as url, tempfile.TemporaryDirectory(prefix='memory-backend-test') as temp_root:
+        try:
+            for stream in [False, True]:
+                location = data_fetcher(name=f'penguins-{stream}', source=f'{url}/penguins.csv', dest='memory://penguins/data', stream=stream)
+                assert location == f'memory://penguins/data/penguins-{stream}.csv'
+                with backend.open(location) as _file:
+                    assert _file.read() == _files['/penguins.csv']
+
+            source = os.path.join(temp_root, 'penguins.csv')
+            with open(source, 'wb') as _source_file:
+                _source_file.write(_files['/penguins.csv'])
+            assert data_pusher_with_status(name='penguins', source=source, dest='memory://penguins/pushed', checksum='crc32c') == ('memory://penguins/pushed/penguins.csv', False)
+            assert data_pusher_with_status(name='penguins', source=source, dest='memory://penguins/pushed', checksum='crc32c') == ('memory://penguins/pushed/penguins.csv', True)
+
+            private = MemoryBackend(objects={})
+            assert not private.exists(location)
+            with pytest.raises(FileNotFoundError):
+                with private.open(location):
+                    pass
+        except Exception as e:
+            logger.exception(e)
+            raise e
+        finally:
+            for location in list(backend.objects):
+                backend.delete(location)
+
+
+def test_gcs_backend():
+    '''
+    Function to test the GCSBackend class against a fake GCS server.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _data = os.urandom(300 * 1024)
+
+    with getFakeStorageServer() as (storage_url, objects), tempfile.TemporaryDirectory(prefix='gcs-backend-test') as temp_root:
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+        backend = GCSBackend(client=client)
+
+        try:
+            source = os.path.join(temp_root, 'data.bin')
+            with open(source, 'wb') as _source_file:
+                _source_file.write(_data)
+
+            location = backend.put(source, 'gs://penguins/data/data.bin', move=True)
+            assert objects[('penguins', 'data/data.bin')] == _data
+            assert backend.exists(location)
+            assert backend.checksum(location, 'crc32c') == file_checksum(source, 'crc32c')
+
+            with backend.open('gs://penguins/data/streamed.bin', 'wb', chunk_size=256 * 1024) as _writer:
+                _writer.write(_data)
+            assert objects[('penguins', 'data/streamed.bin')] == _data
+
+            with pytest.raises(ValueError):
+                with backend.open('gs://penguins/data/streamed.bin', 'wb', chunk_size=1000):
+                    pass
+
+            backend.delete(location)
+            backend.delete(location)
+            assert not backend.exists(location)
+            assert backend.checksum(location, 'md5') is None
+        except Exception as e:
+            logger.exception(e)
+            raise e
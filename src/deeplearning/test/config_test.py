@@ -24,6 +24,14 @@ def test_default_config():
         conf.configure(config=None)
         try:
             assert conf.configuration == {
+                'filesystem': {
+                    'cache': {
+                        'enabled': True,
+                        'max_age': 86400,
+                        'max_size': 4294967296,
+                        'path': '~/.cache/deeplearning'
+                    }
+                },
                 'keras': {
                     'backend': 'tensorflow'
                 },
@@ -31,12 +39,19 @@ def test_default_config():
                     'format': '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
                     'level': 'INFO',
                     'path': 'stdout',
+                    'queue': False,
                     'type': 'stream'
                 },
                 'multiprocessing': {
                     'enabled': False,
                     'workers': 2
                 },
+                'pipelines': {
+                    'beam': {
+                        'direct_num_workers': 0,
+                        'direct_running_mode': 'multi_processing'
+                    }
+                },
                 'telemetry': {
                     'metrics': True,
                     'tracing': True
@@ -69,6 +84,14 @@ def test_update_config():
         })
         try:
             assert conf.configuration == {
+                'filesystem': {
+                    'cache': {
+                        'enabled': True,
+                        'max_age': 86400,
+                        'max_size': 4294967296,
+                        'path': '~/.cache/deeplearning'
+                    }
+                },
                 'keras': {
                     'backend': 'tensorflow'
                 },
@@ -76,12 +99,19 @@ def test_update_config():
                     'format': '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
                     'level': 'INFO',
                     'path': 'stdout',
+                    'queue': False,
                     'type': 'stream'
                 },
                 'multiprocessing': {
                     'enabled': True,
                     'workers': 2
                 },
+                'pipelines': {
+                    'beam': {
+                        'direct_num_workers': 0,
+                        'direct_running_mode': 'multi_processing'
+                    }
+                },
                 'telemetry': {
                     'metrics': True,
                     'tracing': True
@@ -160,6 +190,14 @@ def test_from_file_config():
         conf.configure(config=config)
         try:
             assert conf.configuration == {
+                'filesystem': {
+                    'cache': {
+                        'enabled': True,
+                        'max_age': 86400,
+                        'max_size': 4294967296,
+                        'path': '~/.cache/deeplearning'
+                    }
+                },
                 'keras': {
                     'backend': 'tensorflow'
                 },
@@ -167,12 +205,19 @@ def test_from_file_config():
                     'format': '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
                     'level': 'INFO',
                     'path': 'stdout',
+                    'queue': False,
                     'type': 'stream'
                 },
                 'multiprocessing': {
                     'enabled': False,
                     'workers': 2
                 },
+                'pipelines': {
+                    'beam': {
+                        'direct_num_workers': 0,
+                        'direct_running_mode': 'multi_processing'
+                    }
+                },
                 'telemetry': {
                     'metrics': True,
                     'tracing': True
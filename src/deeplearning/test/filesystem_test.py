@@ -1,8 +1,21 @@
-from deeplearning.utils.filesystem import data_fetcher, data_pusher
+from deeplearning.test.servers import getDataServer, getFakeStorageServer
+from deeplearning.utils.backends import _sidecar_path
+from deeplearning.utils.filesystem import DownloadCache, _IncompleteDownload, _partial_path, _pipe, _pooled_client, bulk_data_pusher, data_fetcher, data_fetcher_with_status, data_pusher, data_pusher_with_status, fetch_many
+from google.auth.credentials import AnonymousCredentials  # type: ignore
+from google.cloud import storage  # type: ignore
 
+import asyncio
+import google.auth  # type: ignore
+import gzip
+import io
 import logging
 import os
+import pytest
+import tarfile
 import tempfile
+import time
+import urllib.error
+import zipfile
 
 
 logger = logging.getLogger(__name__)
@@ -67,3 +80,578 @@ def test_data_pusher():
             except Exception as e:
                 logger.exception(e)
                 raise e
+
+
+def test_data_fetcher_stream():
+    '''
+    Function to test the streaming mode of the data_fetcher function, with local and GCS destinations.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _pipeline_name = 'snowcrabs'
+    _data = os.urandom(3 * 256 * 1024 + 123)
+
+    with getDataServer({'/data/crabs.csv': _data}) as url, getFakeStorageServer() as (storage_url, objects):
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+
+        with tempfile.TemporaryDirectory(prefix='snowcrabs-data-test') as temp_root:
+            try:
+                location = data_fetcher(name=_pipeline_name, source=f'{url}/data/crabs.csv', dest=temp_root, stream=True, chunk_size=256 * 1024)
+                assert location == os.path.join(temp_root, 'snowcrabs.csv')
+                with open(location, 'rb') as _dest_file:
+                    assert _dest_file.read() == _data
+                assert os.listdir(temp_root) == ['snowcrabs.csv']
+
+                location = data_fetcher(name=_pipeline_name, source=f'{url}/data/crabs.csv', dest='gs://crabs/data', stream=True, chunk_size=256 * 1024, client=client)
+                assert location == 'gs://crabs/data/snowcrabs.csv'
+                assert objects[('crabs', 'data/snowcrabs.csv')] == _data
+
+                with pytest.raises(urllib.error.HTTPError):
+                    data_fetcher(name='missing', source=f'{url}/data/missing.csv', dest='gs://crabs/data', stream=True, client=client)
+                assert ('crabs', 'data/missing.csv') not in objects
+
+                with pytest.raises(ValueError):
+                    data_fetcher(name=_pipeline_name, source=f'{url}/data/crabs.csv', dest='gs://crabs/data', stream=True, chunk_size=1000, client=client)
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+
+def test_pipe_writer_failure():
+    '''
+    Function to test that the _pipe function stops reading the response when the writer fails, e.g. on a failed upload.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    class _SlowResponse:
+        ''' A slow response body of 1000 chunks, which takes about 10 seconds to read in full.'''
+        def __init__(self):
+            self.reads = 0
+
+        def read(self, size):
+            if self.reads == 1000:
+                return b''
+            self.reads += 1
+            time.sleep(0.01)
+            return b'0' * size
+
+    class _FailingWriter:
+        def write(self, chunk):
+            raise OSError('Upload failed.')
+
+    response = _SlowResponse()
+
+    try:
+        start = time.monotonic()
+        with pytest.raises(OSError):
+            _pipe(response, _FailingWriter(), chunk_size=1024)
+        assert time.monotonic() - start < 2
+
+        ''' The reader stops after its read ahead chunks and the read in flight.'''
+        reads = response.reads
+        time.sleep(0.2)
+        assert response.reads == reads
+        assert reads <= 4
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_download_cache():
+    '''
+    Function to test the DownloadCache class and its use by the data_fetcher function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _files = {'/penguins.csv': b'species,mass\n0,3750\n', '/mnist.npz': os.urandom(1000)}
+    _requests: list = []
+
+    with getDataServer(_files, requests=_requests) as url, tempfile.TemporaryDirectory(prefix='cache-test') as temp_root:
+        try:
+            assert DownloadCache.from_config({'enabled': False}) is None
+
+            with DownloadCache.from_config({'enabled': True, 'max_age': 3600, 'max_size': 1010, 'path': os.path.join(temp_root, 'cache')}) as cache:
+                ''' Repeat fetches within max_age don't hit the network.'''
+                for _ in range(2):
+                    location = data_fetcher(name='penguins', source=f'{url}/penguins.csv', dest=os.path.join(temp_root, 'data'), cache=cache)
+                    with open(location, 'rb') as _dest_file:
+                        assert _dest_file.read() == _files['/penguins.csv']
+                assert [status for _, _, status, _ in _requests] == [200]
+
+                ''' Streaming mode can't be combined with the cache.'''
+                with pytest.raises(ValueError):
+                    data_fetcher(name='penguins', source=f'{url}/penguins.csv', dest=os.path.join(temp_root, 'data'), stream=True, cache=cache)
+                assert [status for _, _, status, _ in _requests] == [200]
+
+                ''' Expired files are revalidated with a conditional request.'''
+                cache.max_age = 0
+                cache.fetch(f'{url}/penguins.csv')
+                assert [status for _, _, status, _ in _requests] == [200, 304]
+
+                ''' Changed files are downloaded again.'''
+                _files['/penguins.csv'] = b'species,mass\n1,4000\n'
+                with open(cache.fetch(f'{url}/penguins.csv'), 'rb') as _cached_file:
+                    assert _cached_file.read() == _files['/penguins.csv']
+                assert [status for _, _, status, _ in _requests] == [200, 304, 200]
+
+                ''' The least recently used file is evicted when the cache is over its size cap.'''
+                cache.fetch(f'{url}/mnist.npz')
+                assert not os.path.exists(cache._paths(f'{url}/penguins.csv')[0])
+                assert os.path.exists(cache._paths(f'{url}/mnist.npz')[0])
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_data_pusher_composite():
+    '''
+    Function to test parallel composite uploads by the data_pusher function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _data = os.urandom(40 * 1024 + 17)
+
+    with getFakeStorageServer() as (storage_url, objects), tempfile.TemporaryDirectory(prefix='mnist-data-src') as temp_source:
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+
+        try:
+            ''' 41 parts are composed in two rounds, through intermediate objects.'''
+            for name, part_size in [('mnist-train', 1024), ('mnist-test', 8 * 1024), ('mnist-valid', 1024 * 1024)]:
+                _data_source = os.path.join(temp_source, 'mnist.tfrecord')
+                with open(_data_source, 'wb') as _data_file:
+                    _data_file.write(_data)
+
+                location = data_pusher(name=name, source=_data_source, dest='gs://mnist/data', client=client, composite=True, part_size=part_size, max_workers=4)
+                assert location == f'gs://mnist/data/{name}.tfrecord'
+                assert objects[('mnist', f'data/{name}.tfrecord')] == _data
+
+            ''' Only the composed objects remain.'''
+            assert sorted(objects.keys()) == [('mnist', 'data/mnist-test.tfrecord'), ('mnist', 'data/mnist-train.tfrecord'), ('mnist', 'data/mnist-valid.tfrecord')]
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_bulk_data_pusher():
+    '''
+    Function to test the bulk_data_pusher function, with a directory of shards and a list of files.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _shards = {f'mnist-train-{index:05d}-of-00012.tfrecord.gz': os.urandom(1024 + index) for index in range(12)}
+
+    with getFakeStorageServer() as (storage_url, objects), tempfile.TemporaryDirectory(prefix='mnist-shards') as temp_source:
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+
+        try:
+            for filename, data in _shards.items():
+                with open(os.path.join(temp_source, filename), 'wb') as _shard_file:
+                    _shard_file.write(data)
+
+            locations = bulk_data_pusher(sources=temp_source, dest='gs://mnist/data', client=client, max_workers=4)
+            assert locations == [f'gs://mnist/data/{filename}' for filename in sorted(_shards)]
+            assert {name: data for (_, name), data in objects.items()} == {f'data/{filename}': data for filename, data in _shards.items()}
+
+            with tempfile.TemporaryDirectory(prefix='mnist-dest') as temp_dest:
+                sources = [os.path.join(temp_source, filename) for filename in sorted(_shards)[:3]]
+                locations = bulk_data_pusher(sources=sources, dest=temp_dest)
+                assert locations == [os.path.join(temp_dest, filename) for filename in sorted(_shards)[:3]]
+                assert all(os.path.exists(location) for location in locations)
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_pooled_client(monkeypatch):
+    '''
+    Function to test that the _pooled_client function passes a session with a sized connection pool to the storage client.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        monkeypatch.setattr(google.auth, 'default', lambda scopes=None: (AnonymousCredentials(), 'test'))
+        client = _pooled_client(128)
+        assert client.project == 'test'
+        assert client._http.get_adapter('https://storage.googleapis.com')._pool_maxsize == 128
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_data_fetcher_ranges():
+    '''
+    Function to test parallel range downloads by the data_fetcher function, and the single stream fallback.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _data = os.urandom(1024 * 1024 + 7)
+
+    for ranges in [True, False]:
+        _requests: list = []
+
+        with getDataServer({'/mnist.npz': _data}, requests=_requests, ranges=ranges) as url, tempfile.TemporaryDirectory(prefix='mnist-data-test') as temp_root:
+            try:
+                location = data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root, connections=4, chunk_size=64 * 1024)
+                with open(location, 'rb') as _dest_file:
+                    assert _dest_file.read() == _data
+
+                ranged = sorted(request[3] for request in _requests if request[0] == 'GET')
+                if ranges:
+                    assert ranged == ['bytes=0-262145', 'bytes=262146-524291', 'bytes=524292-786437', 'bytes=786438-1048582']
+                else:
+                    assert ranged == [None]
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+
+def test_checksum_skip():
+    '''
+    Function to test that data_fetcher and data_pusher skip unchanged data by checksum, and report it with status.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _files = {'/penguins.csv': b'species,island\nAdelie,Torgersen\n'}
+    _requests: list = []
+
+    with getDataServer(_files, requests=_requests, hashes=True) as url, tempfile.TemporaryDirectory(prefix='penguins-data-test') as temp_root:
+        try:
+            dest = os.path.join(temp_root, 'data')
+            os.makedirs(dest)
+
+            for checksum in ['crc32c', 'md5']:
+                location, skipped = data_fetcher_with_status(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum=checksum)
+                assert not skipped
+                assert os.path.exists(_sidecar_path(location, checksum))
+                assert data_fetcher_with_status(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum=checksum) == (location, True)
+
+            ''' Sidecars are kept in a hidden directory of the data directory, and data_fetcher returns the location alone.'''
+            assert sorted(os.listdir(dest)) == ['.checksums', 'penguins.csv']
+            assert sorted(os.listdir(os.path.join(dest, '.checksums'))) == ['penguins.csv.crc32c', 'penguins.csv.md5']
+            assert data_fetcher(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum='md5') == location
+            assert len([request for request in _requests if request[0] == 'GET']) == 2
+
+            _files['/penguins.csv'] = b'species,island\nGentoo,Biscoe\n'
+            assert data_fetcher_with_status(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum='crc32c') == (location, False)
+            with open(location, 'rb') as _dest_file:
+                assert _dest_file.read() == _files['/penguins.csv']
+
+            ''' A file changed after its checksum was recorded is fetched again.'''
+            with open(location, 'ab') as _dest_file:
+                _dest_file.write(b'Chinstrap,Dream\n')
+            assert data_fetcher_with_status(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum='crc32c') == (location, False)
+            assert data_fetcher_with_status(name='penguins', source=f'{url}/penguins.csv', dest=dest) == (location, False)
+
+            with pytest.raises(ValueError):
+                data_fetcher(name='penguins', source=f'{url}/penguins.csv', dest=dest, checksum='sha1')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    with getFakeStorageServer() as (storage_url, objects), tempfile.TemporaryDirectory(prefix='penguins-source') as temp_source:
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+
+        try:
+            source = os.path.join(temp_source, 'penguins.csv')
+            for checksum in ['crc32c', 'md5']:
+                with open(source, 'wb') as _source_file:
+                    _source_file.write(f'species,island,{checksum}\n'.encode('utf-8'))
+                assert data_pusher_with_status(name='penguins', source=source, dest='gs://penguins/data', client=client, checksum=checksum) == ('gs://penguins/data/penguins.csv', False)
+                assert data_pusher_with_status(name='penguins', source=source, dest='gs://penguins/data', client=client, checksum=checksum) == ('gs://penguins/data/penguins.csv', True)
+            assert objects[('penguins', 'data/penguins.csv')] == b'species,island,md5\n'
+
+            with tempfile.TemporaryDirectory(prefix='penguins-dest') as temp_dest:
+                assert data_pusher_with_status(name='penguins', source=source, dest=temp_dest, checksum='md5') == (os.path.join(temp_dest, 'penguins.csv'), False)
+                with open(source, 'wb') as _source_file:
+                    _source_file.write(b'species,island,md5\n')
+                assert data_pusher_with_status(name='penguins', source=source, dest=temp_dest, checksum='md5') == (os.path.join(temp_dest, 'penguins.csv'), True)
+                assert data_pusher(name='penguins', source=source, dest=temp_dest, checksum='md5') == os.path.join(temp_dest, 'penguins.csv')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_fetch_many():
+    '''
+    Function to test concurrent fetches by the fetch_many function, with per-source results and errors.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _files = {f'/mnist-train-{index:05d}.tfrecord': os.urandom(1024 * (index + 1)) for index in range(6)}
+    _sources = [f'mnist-train-{index:05d}' for index in range(6)] + ['mnist-missing']
+
+    with getDataServer(_files) as url, tempfile.TemporaryDirectory(prefix='mnist-data-test') as temp_root:
+        try:
+            summary = asyncio.run(fetch_many([f'{url}/{source}.tfrecord' for source in _sources], dest=temp_root, max_concurrency=3))
+
+            assert [result['name'] for result in summary['results']] == _sources
+            assert summary['failed'] == 1
+            assert isinstance(summary['results'][-1]['error'], urllib.error.HTTPError)
+            assert summary['bytes'] == sum(len(data) for data in _files.values())
+            assert summary['throughput'] > 0
+
+            for result in summary['results'][:-1]:
+                assert result['error'] is None
+                with open(result['location'], 'rb') as _dest_file:
+                    assert _dest_file.read() == _files[f'/{result["name"]}.tfrecord']
+
+            summary = asyncio.run(fetch_many({'shard': f'{url}/mnist-train-00000.tfrecord'}, dest=temp_root, max_concurrency=1, stream=True))
+            assert summary['results'][0]['location'] == os.path.join(temp_root, 'shard.tfrecord')
+
+            ''' Fetches of the same URL under different names both complete.'''
+            summary = asyncio.run(fetch_many({'first': f'{url}/mnist-train-00001.tfrecord', 'second': f'{url}/mnist-train-00001.tfrecord'}, dest=temp_root))
+            assert summary['failed'] == 0
+            for result in summary['results']:
+                with open(result['location'], 'rb') as _dest_file:
+                    assert _dest_file.read() == _files['/mnist-train-00001.tfrecord']
+
+            with pytest.raises(ValueError):
+                asyncio.run(fetch_many([], dest=temp_root, max_concurrency=0))
+
+            ''' Sources named after the same file name aren't dropped.'''
+            with pytest.raises(ValueError):
+                asyncio.run(fetch_many([f'{url}/2023/data.csv', f'{url}/2024/data.csv'], dest=temp_root))
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_data_fetcher_extract():
+    '''
+    Function to test on the fly decompression and extraction by the data_fetcher function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _members = {'data/train.csv': os.urandom(300 * 1024), 'data/eval.csv': b'species,island\nAdelie,Torgersen\n' * 1000}
+
+    class _Unseekable():
+        ''' Zip files written to unseekable streams have data descriptors.'''
+        def __init__(self):
+            self.buffer = io.BytesIO()
+
+        def write(self, data):
+            return self.buffer.write(data)
+
+        def flush(self):
+            pass
+
+    _tar = io.BytesIO()
+    with tarfile.open(fileobj=_tar, mode='w:gz') as archive:
+        directory = tarfile.TarInfo('data')
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for member, data in _members.items():
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    _zip, _streamed_zip = io.BytesIO(), _Unseekable()
+    for target in [_zip, _streamed_zip]:
+        with zipfile.ZipFile(target, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('.hidden', b'hidden')
+            archive.writestr('data/train.csv', _members['data/train.csv'], compress_type=zipfile.ZIP_STORED if target is _zip else None)
+            archive.writestr('data/eval.csv', _members['data/eval.csv'])
+
+    ''' Members with the same file name in different directories.'''
+    _nested = io.BytesIO()
+    with tarfile.open(fileobj=_nested, mode='w:gz') as archive:
+        for member in ['train/data.csv', 'eval/data.csv']:
+            info = tarfile.TarInfo(member)
+            info.size = len(member)
+            archive.addfile(info, io.BytesIO(member.encode('utf-8')))
+
+    _gzip = gzip.compress(_members['data/train.csv']) + gzip.compress(_members['data/eval.csv'])
+    _files = {
+        '/penguins.csv.gz': _gzip,
+        '/truncated.csv.gz': _gzip[:-100],
+        '/penguins.tar.gz': _tar.getvalue(),
+        '/penguins.zip': _zip.getvalue(),
+        '/streamed.zip': _streamed_zip.buffer.getvalue(),
+        '/nested.tar.gz': _nested.getvalue(),
+        '/penguins.rar': b''
+    }
+
+    with getDataServer(_files) as url, getFakeStorageServer() as (storage_url, objects):
+        client = storage.Client(project='test', credentials=AnonymousCredentials(), client_options={'api_endpoint': storage_url})
+
+        with tempfile.TemporaryDirectory(prefix='penguins-data-test') as temp_root:
+            try:
+                location = data_fetcher(name='penguins', source=f'{url}/penguins.csv.gz', dest=temp_root, extract=True, chunk_size=64 * 1024)
+                assert location == os.path.join(temp_root, 'penguins.csv')
+                with open(location, 'rb') as _dest_file:
+                    assert _dest_file.read() == _members['data/train.csv'] + _members['data/eval.csv']
+
+                for archive in ['penguins.tar.gz', 'penguins.zip', 'streamed.zip']:
+                    locations = data_fetcher(name=archive.split('.')[0], source=f'{url}/{archive}', dest=os.path.join(temp_root, archive), extract=True, chunk_size=64 * 1024)
+                    assert sorted(locations) == [os.path.join(temp_root, archive, f'{archive.split(".")[0]}-data-{split}.csv') for split in ['eval', 'train']]
+                    for location in locations:
+                        with open(location, 'rb') as _dest_file:
+                            assert _dest_file.read() == _members[f'data/{location.split("-")[-1]}']
+                    assert sorted(os.listdir(os.path.join(temp_root, archive))) == sorted(os.path.basename(location) for location in locations)
+
+                locations = data_fetcher(name='nested', source=f'{url}/nested.tar.gz', dest=os.path.join(temp_root, 'nested'), extract=True)
+                assert locations == [os.path.join(temp_root, 'nested', f'nested-{split}-data.csv') for split in ['train', 'eval']]
+                for location, member in zip(locations, ['train/data.csv', 'eval/data.csv']):
+                    with open(location, 'rb') as _dest_file:
+                        assert _dest_file.read() == member.encode('utf-8')
+
+                with pytest.raises(EOFError):
+                    data_fetcher(name='truncated', source=f'{url}/truncated.csv.gz', dest=temp_root, extract=True)
+                assert not os.path.exists(os.path.join(temp_root, 'truncated.csv'))
+
+                with pytest.raises(ValueError):
+                    data_fetcher(name='penguins', source=f'{url}/penguins.rar', dest=temp_root, extract=True)
+
+                with pytest.raises(ValueError):
+                    data_fetcher(name='penguins', source=f'{url}/penguins.csv.gz', dest=temp_root, extract=True, checksum='md5')
+
+                location = data_fetcher(name='penguins', source=f'{url}/penguins.csv.gz', dest='gs://penguins/data', extract=True, chunk_size=256 * 1024, client=client)
+                assert location == 'gs://penguins/data/penguins.csv'
+                assert objects[('penguins', 'data/penguins.csv')] == _members['data/train.csv'] + _members['data/eval.csv']
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+
+def test_data_fetcher_resume():
+    '''
+    Function to test that the data_fetcher function retries and resumes interrupted downloads, against a fault-injecting server.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _data = os.urandom(1024 * 1024)
+    _files = {'/mnist.npz': _data}
+    _faults: list = [('truncate', 100000), ('error', 503), ('truncate', 300000)]
+    _requests: list = []
+
+    with getDataServer(_files, requests=_requests, faults=_faults) as url, tempfile.TemporaryDirectory(prefix='mnist-data-test') as temp_root:
+        partial = _partial_path(f'{url}/mnist.npz')
+        try:
+            ''' Retries resume from the end of the partial download, after errors and truncated responses.'''
+            location = data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root, chunk_size=64 * 1024, retries=3, backoff=0.01)
+            with open(location, 'rb') as _dest_file:
+                assert _dest_file.read() == _data
+            assert [(request[2], request[3]) for request in _requests if request[0] == 'GET'] == [
+                (200, None), (503, 'bytes=100000-'), (206, 'bytes=100000-'), (206, 'bytes=400000-')]
+            assert not os.path.exists(partial)
+
+            ''' Failed downloads are kept, resumed by a later fetch, and only moved to the destination when complete.'''
+            os.unlink(location)
+            _faults.append(('truncate', 1000))
+            with pytest.raises(_IncompleteDownload):
+                data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root)
+            assert os.stat(partial).st_size == 1000
+            assert not os.path.exists(location)
+
+            _requests.clear()
+            location = data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root)
+            with open(location, 'rb') as _dest_file:
+                assert _dest_file.read() == _data
+            assert [request[3] for request in _requests if request[0] == 'GET'] == ['bytes=1000-']
+
+            ''' Partial downloads of a changed source start over.'''
+            _faults.append(('truncate', 1000))
+            with pytest.raises(_IncompleteDownload):
+                data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root)
+            _files['/mnist.npz'] = _data[::-1]
+            location = data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root)
+            with open(location, 'rb') as _dest_file:
+                assert _dest_file.read() == _data[::-1]
+
+            ''' Client errors aren't retried.'''
+            _requests.clear()
+            with pytest.raises(urllib.error.HTTPError):
+                data_fetcher(name='missing', source=f'{url}/missing.npz', dest=temp_root, retries=3, backoff=0.01)
+            assert len(_requests) == 1
+
+            ''' Range downloads retry the rest of an interrupted range.'''
+            _requests.clear()
+            _faults.extend([('truncate', 1000), ('error', 500)])
+            location = data_fetcher(name='mnist', source=f'{url}/mnist.npz', dest=temp_root, connections=4, chunk_size=64 * 1024, retries=2, backoff=0.01)
+            with open(location, 'rb') as _dest_file:
+                assert _dest_file.read() == _data[::-1]
+            assert len([request for request in _requests if request[0] == 'GET' and request[2] == 206]) == 5
+        except Exception as e:
+            logger.exception(e)
+            raise e
+        finally:
+            for stale in [partial, f'{partial}.json']:
+                if os.path.exists(stale):
+                    os.unlink(stale)
@@ -1,7 +1,11 @@
-from deeplearning.utils.logger import getContextLogger
+from deeplearning.utils.logger import getContextLogListener, getContextLogger, set_log_queue
+from deeplearning.utils.processors import WorkerPool, pid_logger
+from logging.handlers import QueueHandler
+from queue import Queue
 
 import logging
 import os
+import tempfile
 
 
 logger = logging.getLogger(__name__)
@@ -92,3 +96,83 @@ def test_custom_context_logger():
         except Exception as e:
             logger.exception(e)
             raise e
+
+
+def test_queue_context_logger():
+    '''
+    Function to test the getContextLogger() function with a log queue.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    queue: Queue = Queue()
+
+    with getContextLogger(level=logging.INFO, name='__test__', queue=queue) as ctxtlogger:
+        try:
+            assert len(ctxtlogger.handlers) == 1
+            assert isinstance(ctxtlogger.handlers[0], QueueHandler)
+            ctxtlogger.info('queued')
+            record = queue.get_nowait()
+            assert record.name == '__test__'
+            assert record.getMessage() == 'queued'
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    ''' A queue set for the process is used by default.'''
+    try:
+        set_log_queue(queue)
+        with getContextLogger(name='__test__') as ctxtlogger:
+            assert isinstance(ctxtlogger.handlers[0], QueueHandler)
+    except Exception as e:
+        logger.exception(e)
+        raise e
+    finally:
+        set_log_queue(None)
+
+    with getContextLogger(name='__test__') as ctxtlogger:
+        try:
+            assert isinstance(ctxtlogger.handlers[0], logging.StreamHandler)
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_context_log_listener():
+    '''
+    Function to test the getContextLogListener() function, writing the logs of worker processes.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='log-listener-test') as temp_root:
+        path = os.path.join(temp_root, 'workers.log')
+
+        try:
+            with getContextLogListener(format='%(name)s: %(levelname)s: %(message)s', path=path, type='file') as queue:
+                with WorkerPool(workers=2, initializer=set_log_queue, initargs=(queue,)) as pool:
+                    results = list(pool.map(pid_logger, [('__ctxt__',), ('__iter__',), ('__test__',), ('__with__',)]))
+
+            ''' Each worker's records were written once, whole lines, by the listener.'''
+            with open(path) as log:
+                lines = log.read().splitlines()
+
+            assert len(lines) == 8
+            for name, pid, _ in results:
+                assert f'{name}: INFO: Process PID: {pid}' in lines
+                assert f'{name}: INFO: Parent PID: {os.getpid()}' in lines
+        except Exception as e:
+            logger.exception(e)
+            raise e
@@ -1,7 +1,31 @@
-from deeplearning.utils.pipelines import _bytes_feature, _float_feature, _int64_feature, serialize_array, serialize_image_data
+from deeplearning.utils.pipelines import (
+    _bytes_feature,
+    _float_feature,
+    _int64_feature,
+    convert_npz_to_tfrecords,
+    create_beam_pipeline_args,
+    create_csv_pipeline,
+    create_output_config,
+    create_range_config,
+    create_tfr_pipeline,
+    create_training_pipeline,
+    decode_image_batch,
+    load_image_dataset,
+    serialize_array,
+    serialize_image_batch,
+    serialize_image_data,
+    tfrecord_suffix,
+    write_sharded_tfrecords,
+    write_tfrecords
+)
 
 import logging
 import numpy  # type: ignore
+import os
+import pytest
+import subprocess
+import sys
+import tempfile
 import tensorflow as tf  # type: ignore
 
 
@@ -117,3 +141,493 @@ def test_serialize_image():
     except Exception as e:
         logger.exception(e)
         raise e
+
+
+def test_serialize_image_batch():
+    '''
+    Function to test the serialize_image_batch function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        images = numpy.random.rand(5, 4, 3, 1).astype('float32')
+        labels = numpy.eye(3, dtype='float32')[numpy.array((0, 1, 2, 1, 0))]
+        records = list(serialize_image_batch(images, labels, batch_size=2))
+        assert len(records) == 5
+        for record, image, label in zip(records, images, labels):
+            assert isinstance(record, bytes)
+            assert tf.train.Example.FromString(record) == serialize_image_data(image, label)
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_write_sharded_tfrecords():
+    '''
+    Function to test the write_sharded_tfrecords function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mnist-shards') as temp_root:
+        try:
+            images = numpy.random.rand(10, 4, 3, 1).astype('float32')
+            labels = numpy.eye(3, dtype='float32')[numpy.arange(10) % 3]
+            paths = write_sharded_tfrecords(images, labels, dest=temp_root, name='mnist', num_shards=3, workers=2)
+            assert [os.path.basename(path) for path in paths] == [f'mnist-{index:05d}-of-00003.tfrecord' for index in range(3)]
+            records = list(tf.data.TFRecordDataset(sorted(tf.io.gfile.glob(os.path.join(temp_root, 'mnist-*.tfrecord')))))
+            assert len(records) == 10
+            for record, image, label in zip(records, images, labels):
+                assert tf.train.Example.FromString(record.numpy()) == serialize_image_data(image, label)
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_write_sharded_tfrecords_script():
+    '''
+    Function to test that a script writing sharded TFRecords runs end to end, as the shard writers are spawned
+    processes that re-import the script's main module. Runs benchmarks/reader.py on a small dataset.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'benchmarks', 'reader.py')
+
+    with tempfile.TemporaryDirectory(prefix='mnist-reader-script') as temp_root:
+        try:
+            path = os.path.join(temp_root, 'mnist.npz')
+            numpy.savez(path, x_train=numpy.random.randint(0, 256, size=(64, 28, 28), dtype='uint8'), y_train=numpy.arange(64) % 10)
+
+            result = subprocess.run([sys.executable, script, '--data-path', path, '--epochs', '1', '--shards', '2'],
+                                    capture_output=True, text=True, timeout=600)
+            assert result.returncode == 0, result.stderr
+            assert 'TFRecord raw path' in result.stdout and 'TFRecord tensor path' in result.stdout
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_serialize_image_batch_raw():
+    '''
+    Function to test the serialize_image_batch function with the raw encoding.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        images = numpy.random.randint(0, 256, size=(5, 4, 3, 1), dtype='uint8')
+        labels = numpy.array((0, 1, 200, 1, 0))
+        records = list(serialize_image_batch(images, labels, batch_size=2, encoding='raw'))
+        assert len(records) == 5
+        for record, image, label in zip(records, images, labels):
+            assert tf.train.Example.FromString(record) == serialize_image_data(image, label, encoding='raw')
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_decode_image_batch():
+    '''
+    Function to test that raw and tensor encoded records decode to the same tensors.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        images = numpy.random.randint(0, 256, size=(6, 4, 3, 1), dtype='uint8')
+        labels = numpy.arange(6) % 3
+        raw = list(serialize_image_batch(images, labels, encoding='raw'))
+        tensor = list(serialize_image_batch(images.astype('float32') / 255.0, numpy.eye(3, dtype='float32')[labels]))
+        assert sum(len(record) for record in raw) < sum(len(record) for record in tensor)
+
+        raw_images, raw_labels = decode_image_batch(tf.constant(raw), num_classes=3, encoding='raw')
+        tensor_images, tensor_labels = decode_image_batch(tf.constant(tensor), num_classes=3)
+        assert raw_images.shape == (6, 4, 3, 1)
+        assert raw_images.dtype == tf.float32
+        assert numpy.array_equal(raw_images.numpy(), tensor_images.numpy())
+        assert numpy.array_equal(raw_labels.numpy(), tensor_labels.numpy())
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_write_tfrecords():
+    '''
+    Function to test the write_tfrecords function with each compression type.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mnist-codecs') as temp_root:
+        try:
+            images = numpy.zeros((20, 4, 3, 1), dtype='uint8')
+            labels = numpy.arange(20) % 3
+            records = list(serialize_image_batch(images, labels, encoding='raw'))
+            sizes: dict = {}
+            for compression in [None, 'GZIP', 'ZLIB']:
+                path = os.path.join(temp_root, f'mnist{tfrecord_suffix(compression)}')
+                assert write_tfrecords(records, path, compression=compression) == len(records)
+                sizes[compression] = os.stat(path).st_size
+                read = [record.numpy() for record in tf.data.TFRecordDataset(path, compression_type=compression or '')]
+                assert read == records
+            assert sizes['GZIP'] < sizes[None]
+            assert sizes['ZLIB'] < sizes[None]
+
+            paths = write_sharded_tfrecords(images, labels, dest=temp_root, name='mnist', num_shards=2, encoding='raw', compression='GZIP')
+            assert all(path.endswith('.tfrecord.gz') for path in paths)
+            with open(paths[0], 'rb') as shard:
+                assert shard.read(2) == b'\x1f\x8b'
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+        with pytest.raises(ValueError):
+            tfrecord_suffix('SNAPPY')
+
+
+def test_convert_npz_to_tfrecords():
+    '''
+    Function to test the convert_npz_to_tfrecords function with stored and compressed archives.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mnist-npz') as temp_root:
+        try:
+            x_train = numpy.random.randint(0, 256, size=(11, 4, 3), dtype='uint8')
+            y_train = numpy.random.randint(0, 3, size=11).astype('uint8')
+            x_test = numpy.random.randint(0, 256, size=(5, 4, 3), dtype='uint8')
+            y_test = numpy.random.randint(0, 3, size=5).astype('uint8')
+
+            for save in [numpy.savez, numpy.savez_compressed]:
+                source = os.path.join(temp_root, f'{save.__name__}.npz')
+                save(source, x_train=x_train, y_train=y_train, x_test=x_test, y_test=y_test)
+
+                for encoding in ['raw', 'tensor']:
+                    dest = os.path.join(temp_root, save.__name__, encoding)
+                    paths = convert_npz_to_tfrecords(source, dest, name='mnist', num_classes=3, chunk_size=4, encoding=encoding)
+                    assert [os.path.basename(path) for path in paths] == ['mnist-train.tfrecord', 'mnist-test.tfrecord']
+
+                    for path, images, labels in zip(paths, [x_train, x_test], [y_train, y_test]):
+                        records = tf.constant([record.numpy() for record in tf.data.TFRecordDataset(path)])
+                        decoded_images, decoded_labels = decode_image_batch(records, num_classes=3, encoding=encoding)
+                        assert numpy.array_equal(decoded_images.numpy(), numpy.expand_dims(images.astype('float32') / 255.0, -1))
+                        assert numpy.array_equal(decoded_labels.numpy(), numpy.eye(3, dtype='float32')[labels])
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_load_image_dataset():
+    '''
+    Function to test the load_image_dataset function over sharded, compressed records.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mnist-dataset') as temp_root:
+        try:
+            images = numpy.random.randint(0, 256, size=(10, 4, 3, 1), dtype='uint8')
+            labels = numpy.arange(10) % 3
+            write_sharded_tfrecords(images, labels, dest=temp_root, name='mnist', num_shards=3, encoding='raw', compression='GZIP')
+
+            dataset = load_image_dataset(os.path.join(temp_root, 'mnist-*.tfrecord.gz'), batch_size=4, num_classes=3, encoding='raw', compression='GZIP')
+            assert dataset.element_spec[0].shape.as_list() == [None, 4, 3, 1]
+            assert dataset.element_spec[1].shape.as_list() == [None, 3]
+
+            batches = list(dataset)
+            assert [int(batch[0].shape[0]) for batch in batches] == [4, 4, 2]
+
+            ''' Interleaved reads don't preserve record order across shards, so compare the records as sets.'''
+            decoded = sorted((image.tobytes(), label.tobytes()) for batch in batches for image, label in zip(batch[0].numpy(), batch[1].numpy()))
+            expected = sorted((image.tobytes(), label.tobytes()) for image, label in zip(images.astype('float32') / 255.0, numpy.eye(3, dtype='float32')[labels]))
+            assert decoded == expected
+
+            shuffled = load_image_dataset(os.path.join(temp_root, 'mnist-*.tfrecord.gz'), batch_size=4, num_classes=3, encoding='raw', compression='GZIP', shuffle_buffer=10, cache=False)
+            assert sum(int(batch[0].shape[0]) for batch in shuffled) == 10
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_create_beam_pipeline_args():
+    '''
+    Function to test the create_beam_pipeline_args function and its use by the pipeline builders.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='penguins-beam') as temp_root:
+        try:
+            args = create_beam_pipeline_args({'direct_num_workers': 4, 'direct_running_mode': 'multi_processing', 'runner': None})
+            assert args == ['--direct_num_workers=4', '--direct_running_mode=multi_processing']
+            assert create_beam_pipeline_args() == []
+
+            pipeline = create_csv_pipeline(pipeline_name='penguins',
+                                           pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                           data_root=os.path.join(temp_root, 'data'),
+                                           beam_pipeline_args=args)
+            assert pipeline.beam_pipeline_args == args
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_create_training_pipeline():
+    '''
+    Function to test the create_training_pipeline function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='mnist-training') as temp_root:
+        try:
+            pipeline = create_training_pipeline(pipeline_name='mnist',
+                                                pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                                data_root=os.path.join(temp_root, 'data'),
+                                                serving_model_dir=os.path.join(temp_root, 'serving'),
+                                                encoding='raw')
+            assert pipeline.enable_cache
+            assert [component.id for component in pipeline.components] == [
+                'ImportExampleGen', 'StatisticsGen', 'SchemaGen', 'Transform', 'Trainer', 'Pusher']
+
+            pipeline = create_training_pipeline(pipeline_name='mnist',
+                                                pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                                data_root=os.path.join(temp_root, 'data'),
+                                                enable_cache=False)
+            assert not pipeline.enable_cache
+            assert 'Pusher' not in [component.id for component in pipeline.components]
+
+            with pytest.raises(ValueError):
+                create_training_pipeline(pipeline_name='mnist',
+                                         pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                         data_root=os.path.join(temp_root, 'data'),
+                                         encoding='png')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_create_range_config():
+    '''
+    Function to test the create_range_config function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        config = create_range_config(start_span=3)
+        assert config.static_range.start_span_number == 3
+        assert config.static_range.end_span_number == 3
+
+        config = create_range_config(start_span=1, end_span=5)
+        assert config.static_range.end_span_number == 5
+
+        config = create_range_config(num_spans=7)
+        assert config.rolling_range.num_spans == 7
+
+        for kwargs in [{}, {'start_span': 1, 'num_spans': 2}, {'start_span': 5, 'end_span': 1}, {'num_spans': 0}]:
+            with pytest.raises(ValueError):
+                create_range_config(**kwargs)
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_span_pipelines():
+    '''
+    Function to test the span and version input options of the pipeline builders.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='span-pipelines') as temp_root:
+        try:
+            pattern = 'span-{SPAN}/version-{VERSION}/*'
+
+            pipeline = create_csv_pipeline(pipeline_name='penguins',
+                                           pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                           data_root=os.path.join(temp_root, 'data'),
+                                           input_pattern=pattern,
+                                           range_config=create_range_config(start_span=2))
+            example_gen = pipeline.components[0]
+            assert pattern in str(example_gen.exec_properties['input_config'])
+            assert 'start_span_number' in str(example_gen.exec_properties['range_config'])
+
+            pipeline = create_tfr_pipeline(pipeline_name='mnist',
+                                           pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                           data_root=os.path.join(temp_root, 'data'),
+                                           compression='GZIP',
+                                           input_pattern=pattern)
+            assert pattern in str(pipeline.components[0].exec_properties['input_config'])
+
+            pipeline = create_training_pipeline(pipeline_name='mnist',
+                                                pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                                data_root=os.path.join(temp_root, 'data'),
+                                                input_pattern=pattern,
+                                                num_spans=3)
+            assert 'span_resolver' in [component.id for component in pipeline.components]
+
+            ''' ExampleGen only ingests a single span.'''
+            for range_config in [create_range_config(start_span=1, end_span=3), create_range_config(num_spans=2)]:
+                with pytest.raises(ValueError):
+                    create_csv_pipeline(pipeline_name='penguins',
+                                        pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                        data_root=os.path.join(temp_root, 'data'),
+                                        input_pattern=pattern,
+                                        range_config=range_config)
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def test_create_output_config():
+    '''
+    Function to test the create_output_config function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        config = create_output_config()
+        assert [(split.name, split.hash_buckets) for split in config.split_config.splits] == [('train', 2), ('eval', 1)]
+
+        config = create_output_config({'train': 8, 'eval': 1, 'test': 1}, partition_feature_name='label')
+        assert [split.hash_buckets for split in config.split_config.splits] == [8, 1, 1]
+        assert config.split_config.partition_feature_name == 'label'
+
+        for splits in [{}, {'train': 1, 'eval': 0}]:
+            with pytest.raises(ValueError):
+                create_output_config(splits)
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_example_gen_options():
+    '''
+    Function to test the split, input pattern and ExampleGen worker options of the pipeline builders.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with tempfile.TemporaryDirectory(prefix='example-gen-options') as temp_root:
+        try:
+            pipeline = create_csv_pipeline(pipeline_name='penguins',
+                                           pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                           data_root=os.path.join(temp_root, 'data'),
+                                           output_config=create_output_config({'train': 9, 'eval': 1}),
+                                           example_gen_workers=8,
+                                           beam_pipeline_args=['--direct_num_workers=2', '--direct_running_mode=multi_processing'])
+            example_gen = pipeline.components[0]
+            assert 'hash_buckets' in str(example_gen.exec_properties['output_config'])
+            assert example_gen._beam_pipeline_args == ['--direct_running_mode=multi_processing', '--direct_num_workers=8']
+
+            pipeline = create_tfr_pipeline(pipeline_name='mnist',
+                                           pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                           data_root=os.path.join(temp_root, 'data'),
+                                           input_pattern={'train': 'mnist-train-*', 'eval': 'mnist-test-*'})
+            input_config = str(pipeline.components[0].exec_properties['input_config'])
+            assert 'mnist-train-*' in input_config and 'mnist-test-*' in input_config
+
+            with pytest.raises(ValueError):
+                create_tfr_pipeline(pipeline_name='mnist',
+                                    pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                    data_root=os.path.join(temp_root, 'data'),
+                                    input_pattern={'train': 'mnist-train-*', 'eval': 'mnist-test-*'},
+                                    output_config=create_output_config())
+
+            with pytest.raises(ValueError):
+                create_csv_pipeline(pipeline_name='penguins',
+                                    pipeline_root=os.path.join(temp_root, 'pipelines'),
+                                    data_root=os.path.join(temp_root, 'data'),
+                                    example_gen_workers=0)
+        except Exception as e:
+            logger.exception(e)
+            raise e
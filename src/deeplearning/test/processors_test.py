@@ -1,8 +1,13 @@
 from contextlib2 import contextmanager
-from deeplearning.utils.processors import dequeue, enqueue, pid_logger
-from queue import Queue
+from deeplearning.utils.processors import BatchManager, BatchQueue, SharedArrays, WorkerPool, dequeue, dequeue_many, enqueue, enqueue_many, getContextSharedArrays, pid_logger
+from multiprocessing import shared_memory
+from queue import Empty, Full, Queue
 
 import logging
+import numpy  # type: ignore
+import os
+import pytest
+import time
 
 
 logger = logging.getLogger(__name__)
@@ -106,3 +111,157 @@ def test_pid_logger_with_queue():
         except Exception as e:
             logger.exception(e)
             raise e
+
+
+def sleeper(seconds: float):
+    ''' A helper function to finish work after a delay, in a worker process.'''
+    time.sleep(seconds)
+    return seconds, os.getpid()
+
+
+def failer(code: int):
+    ''' A helper function to fail work in a worker process, by exception or exit code.'''
+    if code == 0:
+        raise ValueError('Failed work.')
+    os._exit(code)
+
+
+def test_worker_pool():
+    '''
+    Function to test the WorkerPool class.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        with WorkerPool(workers=4) as pool:
+            results = list(pool.map(pid_logger, [('__ctxt__',), ('__iter__',), ('__test__',), ('__with__',)]))
+            assert sorted(result[0] for result in results) == ['__ctxt__', '__iter__', '__test__', '__with__']
+            assert all(result[2] == os.getpid() for result in results)
+            assert len(set(result[1] for result in results)) == 4
+
+        ''' Results are collected in completion order, and queued work waits for a free worker.'''
+        with WorkerPool(workers=2) as pool:
+            start = time.monotonic()
+            results = list(pool.map(sleeper, [(0.6,), (0.0,), (0.2,)]))
+            assert [result[0] for result in results] == [0.0, 0.2, 0.6]
+            assert time.monotonic() - start < 1.2
+
+        with WorkerPool(workers=2) as pool:
+            pool.submit(sleeper, 0.0)
+            pool.submit(failer, 0)
+            with pytest.raises(ValueError):
+                list(pool.results())
+
+        with WorkerPool(workers=1) as pool:
+            pool.submit(failer, 3)
+            with pytest.raises(ChildProcessError):
+                list(pool.results())
+
+        with pytest.raises(ValueError):
+            WorkerPool(workers=0)
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def test_enqueue_dequeue_many():
+    '''
+    Function to test the enqueue_many and dequeue_many functions, with local queues and manager proxies.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    args_list: list = [(index, f'__{index}__') for index in range(10)]
+
+    with BatchManager() as manager:
+        try:
+            for queue in [Queue(), BatchQueue(), manager.Queue(), manager.BatchQueue()]:
+                enqueue_many(args_list, queue)
+                assert dequeue_many(queue, 4) == args_list[:4]
+                assert dequeue_many(queue, 100, timeout=1) == args_list[4:]
+
+                ''' Blocking dequeues time out on an empty queue.'''
+                start = time.monotonic()
+                with pytest.raises(Empty):
+                    dequeue_many(queue, 4, timeout=0.2)
+                assert time.monotonic() - start >= 0.2
+
+                with pytest.raises(Empty):
+                    dequeue_many(queue, 4)
+
+            for queue in [Queue(maxsize=4), manager.BatchQueue(maxsize=4)]:
+                with pytest.raises(Full):
+                    enqueue_many(args_list, queue, timeout=0.1)
+                assert dequeue_many(queue, 10) == args_list[:4]
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def shared_reader(specs: dict):
+    ''' A helper function to read shared arrays in a worker process, and check that they're read-only views.'''
+    with getContextSharedArrays(specs) as arrays:
+        try:
+            arrays['images'][0, 0] = 1.0
+            writable = True
+        except ValueError:
+            writable = False
+        return {key: float(array.sum()) for key, array in arrays.items()}, writable, arrays['images'].flags.owndata
+
+
+def test_shared_arrays():
+    '''
+    Function to test the SharedArrays class and getContextSharedArrays function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    rng = numpy.random.default_rng(seed=42)
+    _arrays = {'images': rng.random((64, 28, 28), dtype='float32'), 'labels': rng.integers(0, 10, size=64), 'empty': numpy.zeros((0, 3))}
+
+    try:
+        with SharedArrays(_arrays) as shared:
+            for key, array in _arrays.items():
+                assert numpy.array_equal(shared.arrays[key], array)
+                assert shared.arrays[key].dtype == array.dtype
+                assert not shared.arrays[key].flags.writeable
+
+            with WorkerPool(workers=2) as pool:
+                results = list(pool.map(shared_reader, [(shared.specs,), (shared.specs,)]))
+            for sums, writable, owndata in results:
+                assert sums == {key: float(array.sum()) for key, array in _arrays.items()}
+                assert not writable
+                assert not owndata
+
+            names = [name for name, _, _ in shared.specs.values()]
+
+        ''' The blocks are unlinked when the context exits.'''
+        for name in names:
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+        with pytest.raises(FileNotFoundError):
+            with getContextSharedArrays(shared.specs):
+                pass
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,285 @@
+from contextlib2 import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import base64
+import google_crc32c  # type: ignore
+import hashlib
+import json
+import logging
+import threading
+import urllib.parse
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def getContextServer(handler: type):
+    '''
+    A function to run a local HTTP server in a background thread with a Context Manager.
+
+    Args:
+        handler (type): A subclass of BaseHTTPRequestHandler to handle requests.
+
+    Returns:
+        url (str): The base URL of the running server, e.g. 'http://127.0.0.1:8080'.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@contextmanager
+def getDataServer(files: dict, requests: list | None = None, ranges: bool = True, hashes: bool = False, faults: list | None = None):
+    '''
+    A function to serve in-memory files over HTTP with a Context Manager.
+
+    Responses carry an ETag and Last-Modified validator, and conditional requests for
+    unchanged files are answered with 304 Not Modified. Files may be replaced while serving.
+    Single byte range requests are answered with 206 Partial Content, unless ranges are disabled.
+    Optionally, responses advertise CRC32C and MD5 hashes in x-goog-hash headers, like GCS-hosted data.
+    Range requests with an If-Range validator that doesn't match the file are answered with the whole file.
+
+    Faults are injected into GET requests in order, one per request, until the list is empty. A fault is
+    one of ('error', status), to answer with an error status, or ('truncate', size), to close the connection
+    after size bytes of the response body.
+
+    Args:
+        files (dict): A dictionary of file contents as bytes, keyed by URL path, e.g. {'/data.csv': b'a,b\n'}.
+        requests (list): An optional list to record (method, path, status, range) tuples of served requests.
+        ranges (bool): Whether to advertise and serve byte range requests.
+        hashes (bool): Whether to advertise the file hashes in x-goog-hash headers.
+        faults (list): An optional list of (kind, value) tuples of faults to inject, consumed as they are injected.
+
+    Returns:
+        url (str): The base URL of the running server.
+    '''
+    class DataHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def send_response(self, code, message=None):
+            if requests is not None:
+                requests.append((self.command, self.path, code, self.headers.get('Range')))
+            super().send_response(code, message)
+
+        def _send_headers(self):
+            path = urllib.parse.urlparse(self.path).path
+            if path not in files:
+                self.send_error(404)
+                return None
+
+            data = files[path]
+            etag = f'"{hashlib.md5(data).hexdigest()}"'
+            resource = _object_resource('', path, data, 1)
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return None
+
+            ''' Range is 'bytes={first}-{last}' or 'bytes={first}-'.'''
+            if_range = self.headers.get('If-Range')
+            if ranges and self.headers.get('Range') and if_range in [None, etag, 'Mon, 01 Jan 2024 00:00:00 GMT']:
+                first, last = self.headers['Range'].split('=')[1].split('-')
+                end = min(int(last) + 1 if last else len(data), len(data))
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {first}-{end - 1}/{len(data)}')
+                data = data[int(first):end]
+            else:
+                self.send_response(200)
+
+            self.send_header('Content-Length', str(len(data)))
+            if ranges:
+                self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', 'Mon, 01 Jan 2024 00:00:00 GMT')
+            if hashes:
+                self.send_header('x-goog-hash', f'crc32c={resource["crc32c"]}')
+                self.send_header('x-goog-hash', f'md5={resource["md5Hash"]}')
+            self.end_headers()
+            return data
+
+        def do_HEAD(self):
+            self._send_headers()
+
+        def do_GET(self):
+            fault = faults.pop(0) if faults else None
+            if fault is not None and fault[0] == 'error':
+                self.send_error(fault[1])
+                return
+
+            data = self._send_headers()
+            if data is not None:
+                self.wfile.write(data if fault is None else data[:fault[1]])
+
+    with getContextServer(DataHandler) as url:
+        yield url
+
+
+def _object_resource(bucket: str, name: str, data: bytes, generation: int):
+    '''
+    Builds a GCS JSON API object resource for stored object data.
+
+    Args:
+        bucket (str): The bucket name.
+        name (str): The object name.
+        data (bytes): The object data.
+        generation (int): The object generation.
+
+    Returns:
+        resource (dict): The object resource, including its size, MD5 and CRC32C hashes.
+    '''
+    return {
+        'kind': 'storage#object',
+        'bucket': bucket,
+        'name': name,
+        'id': f'{bucket}/{name}/{generation}',
+        'size': str(len(data)),
+        'generation': str(generation),
+        'md5Hash': base64.b64encode(hashlib.md5(data).digest()).decode('utf-8'),
+        'crc32c': base64.b64encode(google_crc32c.Checksum(data).digest()).decode('utf-8')
+    }
+
+
+@contextmanager
+def getFakeStorageServer():
+    '''
+    A function to run a fake Google Cloud Storage JSON API server with a Context Manager.
+
+    Supports simple, multipart and resumable uploads, object metadata, compose and delete
+    requests, which is enough for storage.Client() to upload and inspect objects without GCP credentials.
+
+    Returns:
+        A tuple of the base URL of the running server, and a dictionary of stored object data keyed by (bucket, name).
+    '''
+    objects: dict = {}
+    sessions: dict = {}
+    lock = threading.Lock()
+
+    class StorageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        def _send_json(self, status: int, resource: dict, headers: dict = {}):
+            body = json.dumps(resource).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _store(self, bucket: str, name: str, data: bytes):
+            with lock:
+                objects[(bucket, name)] = data
+                return _object_resource(bucket, name, data, len(objects))
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            parts = url.path.split('/')
+            ''' /storage/v1/b/{bucket}/o/{name}'''
+            if len(parts) == 7 and parts[1:3] == ['storage', 'v1'] and parts[5] == 'o':
+                key = (parts[4], urllib.parse.unquote(parts[6]))
+                if key not in objects:
+                    self._send_json(404, {'error': {'code': 404, 'message': 'Not Found'}})
+                    return
+                self._send_json(200, _object_resource(*key, objects[key], 1))
+                return
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not Found'}})
+
+        def do_POST(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            parts = url.path.split('/')
+            body = self._body()
+
+            ''' /storage/v1/b/{bucket}/o/{name}/compose'''
+            if len(parts) == 8 and parts[1:3] == ['storage', 'v1'] and parts[7] == 'compose':
+                request = json.loads(body)
+                sources = [(parts[4], source['name']) for source in request['sourceObjects']]
+                if any(source not in objects for source in sources):
+                    self._send_json(404, {'error': {'code': 404, 'message': 'Not Found'}})
+                    return
+                self._send_json(200, self._store(parts[4], urllib.parse.unquote(parts[6]), b''.join(objects[source] for source in sources)))
+                return
+
+            ''' /upload/storage/v1/b/{bucket}/o?uploadType=...'''
+            if parts[1:4] == ['upload', 'storage', 'v1']:
+                bucket = parts[5]
+                upload_type = query['uploadType'][0]
+                if upload_type == 'media':
+                    self._send_json(200, self._store(bucket, query['name'][0], body))
+                elif upload_type == 'multipart':
+                    boundary = self.headers.get_param('boundary', header='content-type').encode('utf-8')
+                    metadata_part, data_part = body.split(b'--' + boundary)[1:3]
+                    metadata = json.loads(metadata_part.split(b'\r\n\r\n', 1)[1])
+                    data = data_part.split(b'\r\n\r\n', 1)[1][:-2]
+                    self._send_json(200, self._store(bucket, metadata['name'], data))
+                elif upload_type == 'resumable':
+                    metadata = json.loads(body) if body else {}
+                    session = uuid.uuid4().hex
+                    sessions[session] = (bucket, metadata.get('name') or query['name'][0], bytearray())
+                    location = f'http://{self.headers["Host"]}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={session}'
+                    self._send_json(200, {}, headers={'Location': location})
+                return
+            self._send_json(404, {'error': {'code': 404, 'message': 'Not Found'}})
+
+        def do_PUT(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            bucket, name, buffer = sessions[query['upload_id'][0]]
+            body = self._body()
+
+            ''' Content-Range is one of 'bytes {first}-{last}/{total|*}' or 'bytes */{total}'.'''
+            span, total = self.headers['Content-Range'].split(' ')[1].split('/')
+            if span != '*':
+                first = int(span.split('-')[0])
+                buffer[first:first + len(body)] = body
+
+            if total == '*':
+                self.send_response(308)
+                self.send_header('Range', f'bytes=0-{len(buffer) - 1}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            del sessions[query['upload_id'][0]]
+            self._send_json(200, self._store(bucket, name, bytes(buffer)))
+
+        def do_DELETE(self):
+            url = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(url.query)
+            parts = url.path.split('/')
+
+            ''' /storage/v1/b/{bucket}/o/{name}'''
+            if len(parts) == 7 and parts[1:3] == ['storage', 'v1'] and parts[5] == 'o':
+                with lock:
+                    if objects.pop((parts[4], urllib.parse.unquote(parts[6])), None) is None:
+                        self._send_json(404, {'error': {'code': 404, 'message': 'Not Found'}})
+                        return
+
+            ''' Cancel a resumable upload session.'''
+            sessions.pop(query.get('upload_id', [''])[0], None)
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    with getContextServer(StorageHandler) as url:
+        yield url, objects
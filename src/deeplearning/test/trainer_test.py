@@ -0,0 +1,31 @@
+from deeplearning.utils.trainer import _build_model
+
+import keras  # type: ignore
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def test_build_model(shape=(28, 28, 1), classes=10):
+    '''
+    Function to test the _build_model function used by the TFX Trainer.
+
+    Args:
+        shape (tuple): Shape of the model input tensor.
+        classes (int): Number of classes for the model to predict.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    with _build_model(image_shape=shape, num_classes=classes, learning_rate=1e-3) as model:
+        try:
+            assert model.input_shape[1:] == shape
+            assert model.output_shape[1:] == (classes,)
+            assert isinstance(model.loss, keras.losses.SparseCategoricalCrossentropy)
+        except Exception as e:
+            logger.exception(e)
+            raise e
@@ -0,0 +1,66 @@
+from deeplearning.utils.pipelines import serialize_image_data
+from deeplearning.utils.transform import IMAGE_KEY, LABEL_KEY, preprocessing_fn
+
+import logging
+import numpy  # type: ignore
+import pytest
+import tensorflow as tf  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_inputs(records: list, encoding: str):
+    '''
+    Parses serialized image records into raw feature tensors, as supplied to preprocessing_fn() by Transform.
+
+    Args:
+        records: A list of tf.train.Example objects.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+
+    Returns:
+        A dictionary of raw feature tensors of shape (records, 1).
+    '''
+    spec = {
+        'raw_image': tf.io.FixedLenFeature([1], tf.string),
+        'label': tf.io.FixedLenFeature([1], tf.int64 if encoding == 'raw' else tf.string)
+    }
+    return tf.io.parse_example(tf.constant([record.SerializeToString() for record in records]), spec)
+
+
+def test_preprocessing_fn():
+    '''
+    Function to test the preprocessing_fn function with both record encodings.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        rng = numpy.random.default_rng(seed=42)
+        images = rng.integers(0, 256, size=(4, 28, 28, 1), dtype=numpy.uint8)
+        labels = rng.integers(0, 10, size=4)
+        config = {'image_shape': [28, 28, 1], 'num_classes': 10}
+
+        raw = [serialize_image_data(image, label, encoding='raw') for image, label in zip(images, labels)]
+        outputs = preprocessing_fn(_parse_inputs(raw, 'raw'), {**config, 'encoding': 'raw'})
+        assert outputs[IMAGE_KEY].shape == (4, 784)
+        assert numpy.allclose(outputs[IMAGE_KEY].numpy(), images.reshape(4, -1) / 255.0)
+        assert outputs[LABEL_KEY].numpy().tolist() == labels.tolist()
+
+        tensor = [serialize_image_data((image / 255.0).astype(numpy.float32), numpy.eye(10, dtype=numpy.float32)[label])
+                  for image, label in zip(images, labels)]
+        outputs = preprocessing_fn(_parse_inputs(tensor, 'tensor'), {**config, 'encoding': 'tensor'})
+        assert numpy.allclose(outputs[IMAGE_KEY].numpy(), images.reshape(4, -1) / 255.0)
+        assert outputs[LABEL_KEY].numpy().tolist() == labels.tolist()
+
+        with pytest.raises(ValueError):
+            preprocessing_fn(_parse_inputs(raw, 'raw'), {**config, 'encoding': 'png'})
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,78 @@
+from deeplearning.models.seq_conv_2d import SequentialConv2DTunable
+from deeplearning.utils.config import Config
+from deeplearning.utils.processors import SharedArrays
+from deeplearning.utils.tuners import parallel_search
+
+import functools
+import keras_tuner as tuner  # type: ignore
+import logging
+import multiprocessing as mp
+import numpy  # type: ignore
+import os
+import pytest
+import tempfile
+
+
+logger = logging.getLogger(__name__)
+
+conf = Config()
+conf.configure()
+
+os.environ["KERAS_BACKEND"] = conf.configuration["keras"]["backend"]
+
+
+def build_tuner(directory: str, overwrite: bool):
+    ''' A helper function to build the same small tuner in each process of a parallel search.'''
+    hp = tuner.HyperParameters()
+    hp.Fixed('epochs', 1)
+    hp.Fixed('validation_split', 0.25)
+    hp.Fixed('batch_size', 32)
+
+    return tuner.RandomSearch(objective='val_loss',
+                              max_trials=3,
+                              hypermodel=SequentialConv2DTunable(input_shape=(16, 16, 1), num_classes=2, verbose=0),
+                              hyperparameters=hp,
+                              directory=directory,
+                              project_name='parallel',
+                              overwrite=overwrite)
+
+
+def test_parallel_search():
+    '''
+    Function to test the parallel_search function, with a chief oracle and two workers sharing one trial budget.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    rng = numpy.random.default_rng(seed=42)
+    _arrays = {'x_train': rng.random((64, 16, 16, 1), dtype='float32'), 'y_train': rng.integers(0, 2, size=64)}
+
+    with tempfile.TemporaryDirectory(prefix='parallel-search-test') as temp_root, SharedArrays(_arrays) as shared:
+        try:
+            ''' Spawn rather than fork, as Tensorflow may already be initialized in the test process.'''
+            trials = parallel_search(functools.partial(build_tuner, temp_root),
+                                     workers=2,
+                                     fit_kwargs={'callbacks': []},
+                                     shared=shared.specs,
+                                     num_trials=2,
+                                     overwrite=True,
+                                     context=mp.get_context('spawn'))
+
+            assert len(trials) == 2
+            assert trials[0].score <= trials[1].score
+            assert all(trial.status == 'COMPLETED' for trial in trials)
+
+            ''' The workers shared one oracle, so the budget was spent once across them.'''
+            assert len([path for path in os.listdir(os.path.join(temp_root, 'parallel')) if path.startswith('trial_')]) == 3
+
+            with pytest.raises(ValueError):
+                parallel_search(functools.partial(build_tuner, temp_root), workers=0)
+        except Exception as e:
+            logger.exception(e)
+            raise e
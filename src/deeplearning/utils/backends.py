@@ -0,0 +1,843 @@
+from abcmeta import ABC, abstractmethod  # type: ignore
+from concurrent.futures import ThreadPoolExecutor
+from contextlib2 import contextmanager
+from google.api_core.exceptions import NotFound  # type: ignore
+from google.cloud import storage  # type: ignore
+from typing import Optional
+
+import base64
+import errno
+import google_crc32c  # type: ignore
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+''' Objects of MemoryBackend() instances without their own store, keyed by location.'''
+_MEMORY_OBJECTS: dict = {}
+_MEMORY_LOCK = threading.Lock()
+
+
+class StorageBackend(ABC):
+    '''
+    An Abstract Base Class for pipeline data storage, addressed by location strings.
+    '''
+
+    @abstractmethod
+    def put(self, path: str, location: str, move: bool = False):
+        '''
+        Abstract method to store a local file at a location.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            path (str): The path of the local file.
+            location (str): The destination location.
+            move (bool): Whether the local file may be moved rather than copied.
+
+        Returns:
+            location (str): The location of the stored data.
+
+        Raises:
+            e (Exception): Any unhandled exception, as necessary.
+        '''
+
+    @abstractmethod
+    def open(self, location: str, mode: str = 'rb', chunk_size: int = 8 * 1024 * 1024):
+        '''
+        Abstract method to open a location for reading or writing with a Context Manager.
+
+        Written data only replaces the data at the location when the context exits without an exception.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location to open.
+            mode (str): One of ['rb', 'wb'].
+            chunk_size (int): The count of bytes per transferred chunk.
+
+        Returns:
+            file (object): A binary file-like object.
+
+        Raises:
+            e (Exception): Any unhandled exception, as necessary.
+        '''
+
+    @abstractmethod
+    def exists(self, location: str):
+        '''
+        Abstract method to check whether a location holds data.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location to check.
+
+        Returns:
+            exists (bool): Whether the location holds data.
+        '''
+
+    @abstractmethod
+    def size(self, location: str):
+        '''
+        Abstract method to return the size of the data at a location.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location of the data.
+
+        Returns:
+            size (int): The count of bytes at the location, or None if the location holds no data.
+        '''
+
+    @abstractmethod
+    def delete(self, location: str):
+        '''
+        Abstract method to delete the data at a location, if any.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location to delete.
+
+        Returns:
+            None
+        '''
+
+    @abstractmethod
+    def checksum(self, location: str, algorithm: str):
+        '''
+        Abstract method to return the stored checksum of the data at a location.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location of the data.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+
+        Returns:
+            checksum (str): The base64 encoded checksum, or None if the data or its checksum doesn't exist.
+        '''
+
+    def record_checksum(self, location: str, algorithm: str, value: Optional[str] = None):
+        '''
+        Records the checksum of the data at a location, for backends that don't store checksums themselves.
+
+        Args:
+            self (Self): A concrete subclass of StorageBackend().
+            location (str): The location of the data.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+            value (str): An optional base64 encoded checksum, computed from the data if not given.
+
+        Returns:
+            None
+        '''
+        return None
+
+
+class LocalBackend(StorageBackend):
+    '''
+    A local filesystem storage backend. Implements StorageBackend().
+
+    Files are moved by rename when possible, and otherwise copied in the kernel with
+    copy_file_range() or sendfile(), e.g. when the source is on another device. Copies are written
+    to a partial file and renamed when complete, so a location is never left incomplete.
+    Checksums are recorded in sidecar files.
+    '''
+
+    def _path(self, location: str):
+        '''
+        Returns the local file path of a location.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): A file path, or a 'file://' URL.
+
+        Returns:
+            path (str): The file path.
+        '''
+        return location[len('file://'):] if location.startswith('file://') else location
+
+    def put(self, path: str, location: str, move: bool = False):
+        '''
+        Stores a local file at a location.
+
+        A move is a rename on the same device, and a copy then delete of the local file across devices.
+        Copies are written to a partial file that replaces the location when complete.
+
+        Args:
+            self (Self): A LocalBackend().
+            path (str): The path of the local file.
+            location (str): The destination file path, or a 'file://' URL.
+            move (bool): Whether the local file may be moved rather than copied.
+
+        Returns:
+            location (str): The location of the stored data.
+
+        Raises:
+            e (Exception): Any unhandled exception, as necessary.
+        '''
+        target = self._path(location)
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+
+        if move:
+            try:
+                os.rename(path, target)
+                return location
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise e
+                logger.info(f'Copying file {path} to {target} across devices.')
+
+        try:
+            _copy_file(path, f'{target}.part')
+            os.replace(f'{target}.part', target)
+        except Exception as e:
+            if os.path.exists(f'{target}.part'):
+                os.unlink(f'{target}.part')
+            logger.exception(e)
+            raise e
+
+        if move:
+            os.unlink(path)
+        return location
+
+    @contextmanager
+    def open(self, location: str, mode: str = 'rb', chunk_size: int = 8 * 1024 * 1024):
+        '''
+        Opens a file for reading or writing with a Context Manager, creating its directory for writing.
+
+        Written data goes to a partial file that replaces the file when the context exits without an exception, and is deleted otherwise.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+            mode (str): One of ['rb', 'wb'].
+            chunk_size (int): The buffer size of reads.
+
+        Returns:
+            file (object): A binary file object.
+
+        Raises:
+            e (Exception): If the mode is not supported, or any unhandled exception.
+        '''
+        _check_mode(mode)
+        target = self._path(location)
+
+        if mode == 'rb':
+            with io.open(target, 'rb', buffering=chunk_size) as file:
+                yield file
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+        try:
+            with io.open(f'{target}.part', 'wb') as file:
+                yield file
+            os.replace(f'{target}.part', target)
+        finally:
+            if os.path.exists(f'{target}.part'):
+                os.unlink(f'{target}.part')
+
+    def exists(self, location: str):
+        '''
+        Checks whether a file exists.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+
+        Returns:
+            exists (bool): Whether the file exists.
+        '''
+        return os.path.exists(self._path(location))
+
+    def size(self, location: str):
+        '''
+        Returns the size of a file.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+
+        Returns:
+            size (int): The count of bytes in the file, or None if it doesn't exist.
+        '''
+        return os.stat(self._path(location)).st_size if os.path.exists(self._path(location)) else None
+
+    def delete(self, location: str):
+        '''
+        Deletes a file, if it exists. Its checksum sidecars are kept, and ignored while the file is missing or changed.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+
+        Returns:
+            None
+        '''
+        if os.path.exists(self._path(location)):
+            os.unlink(self._path(location))
+
+    def checksum(self, location: str, algorithm: str):
+        '''
+        Returns the checksum of a file recorded in its sidecar by record_checksum().
+
+        The checksum is ignored if the size or modification time of the file changed after it was recorded.
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+
+        Returns:
+            checksum (str): The base64 encoded checksum, or None if the file or a current sidecar doesn't exist.
+        '''
+        target = self._path(location)
+        sidecar = _sidecar_path(target, algorithm)
+        if not os.path.exists(target) or not os.path.exists(sidecar):
+            return None
+        with io.open(sidecar) as file:
+            stored = json.load(file)
+        ''' Ignore the sidecar if the file was changed after the checksum was recorded.'''
+        stat = os.stat(target)
+        if stored['size'] != stat.st_size or stored['mtime'] != stat.st_mtime_ns:
+            return None
+        return stored['checksum']
+
+    def record_checksum(self, location: str, algorithm: str, value: Optional[str] = None):
+        '''
+        Records the checksum, size and modification time of a file in a sidecar, see _sidecar_path().
+
+        Args:
+            self (Self): A LocalBackend().
+            location (str): The file path, or a 'file://' URL.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+            value (str): An optional base64 encoded checksum, computed from the file if not given.
+
+        Returns:
+            None
+        '''
+        target = self._path(location)
+        sidecar = _sidecar_path(target, algorithm)
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        stat = os.stat(target)
+        with io.open(f'{sidecar}.part', 'w') as file:
+            json.dump({'checksum': value or file_checksum(target, algorithm), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}, file)
+        os.replace(f'{sidecar}.part', sidecar)
+
+
+class GCSBackend(StorageBackend):
+    '''
+    A Google Cloud Storage backend, for 'gs://{bucket}/{name}' locations. Implements StorageBackend().
+
+    In composite mode, files larger than the part size are split into parts that are uploaded
+    concurrently over separate connections, then composed into the destination blob and deleted.
+    Composite objects have a CRC32C but no MD5 hash.
+    '''
+
+    def __init__(self,
+                 client: Optional[storage.Client] = None,
+                 composite: bool = False,
+                 part_size: int = 64 * 1024 * 1024,
+                 max_workers: int = 8):
+        '''
+        Args:
+            client: An optional storage.Client, defaults to a new client when first used.
+            composite: A bool indicating whether to use parallel composite uploads for large files.
+            part_size: An integer count of bytes per part of a parallel composite upload.
+            max_workers: An integer count of parts to upload concurrently.
+        '''
+        self.client = client
+        self.composite = composite
+        self.part_size = part_size
+        self.max_workers = max_workers
+
+    def _blob(self, location: str):
+        '''
+        Returns the blob of a location, creating a storage client when first used.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+
+        Returns:
+            blob (storage.Blob): The blob of the location.
+        '''
+        if self.client is None:
+            self.client = storage.Client()
+        return self.client.bucket(location.split('/')[2]).blob('/'.join(location.split('/')[3:]))
+
+    def put(self, path: str, location: str, move: bool = False):
+        '''
+        Uploads a local file to a blob.
+
+        The local file is always kept, so a move is a copy. In composite mode, files larger than the part size are
+        uploaded as concurrent parts that are composed into the blob, otherwise in one upload, in chunks for files over 20 MiB.
+
+        Args:
+            self (Self): A GCSBackend().
+            path (str): The path of the local file.
+            location (str): A 'gs://{bucket}/{name}' location.
+            move (bool): Ignored, local files are not deleted.
+
+        Returns:
+            location (str): The location of the stored data.
+
+        Raises:
+            e (Exception): Any unhandled exception, as necessary.
+        '''
+        blob = self._blob(location)
+        logger.info(f'Uploading blob {blob.name} to bucket {blob.bucket.name} from file {path}.')
+        if self.composite and os.stat(path).st_size > self.part_size:
+            _composite_upload(blob=blob, path=path, part_size=self.part_size, max_workers=self.max_workers)
+        else:
+            ''' Fix chunk size for large(ish) files.'''
+            if os.stat(path).st_size > 20 * 1024 * 1024:
+                blob.chunk_size = 5 * 1024 * 1024
+            blob.upload_from_filename(path)
+        logger.info(f'Uploaded blob {blob.name} to bucket {blob.bucket.name} from file {path}.')
+        return location
+
+    @contextmanager
+    def open(self, location: str, mode: str = 'rb', chunk_size: int = 8 * 1024 * 1024):
+        '''
+        Opens a blob for reading or writing with a Context Manager.
+
+        Writes are a resumable upload, finalized when the context exits without an exception and terminated otherwise.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+            mode (str): One of ['rb', 'wb'].
+            chunk_size (int): The count of bytes per request, a multiple of 256 KiB for writes.
+
+        Returns:
+            file (object): A binary blob reader or writer.
+
+        Raises:
+            e (Exception): If the mode or chunk size is not supported, or any unhandled exception.
+        '''
+        _check_mode(mode)
+        blob = self._blob(location)
+
+        if mode == 'rb':
+            with blob.open('rb', chunk_size=chunk_size) as file:
+                yield file
+            return
+
+        if chunk_size % (256 * 1024) != 0:
+            try:
+                raise ValueError(f'Chunk size {chunk_size} must be a multiple of 256 KiB for resumable uploads.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+        ''' The resumable upload is terminated rather than finalized if the context exits with an exception.'''
+        with blob.open('wb', chunk_size=chunk_size, ignore_flush=True) as file:
+            yield file
+
+    def exists(self, location: str):
+        '''
+        Checks whether a blob exists.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+
+        Returns:
+            exists (bool): Whether the blob exists.
+        '''
+        return self._blob(location).exists()
+
+    def size(self, location: str):
+        '''
+        Returns the size of a blob.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+
+        Returns:
+            size (int): The count of bytes in the blob, or None if it doesn't exist.
+        '''
+        blob = self._blob(location).bucket.get_blob('/'.join(location.split('/')[3:]))
+        return None if blob is None else blob.size
+
+    def delete(self, location: str):
+        '''
+        Deletes a blob, if it exists.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+
+        Returns:
+            None
+        '''
+        try:
+            self._blob(location).delete()
+        except NotFound:
+            pass
+
+    def checksum(self, location: str, algorithm: str):
+        '''
+        Returns the hash that GCS stores for a blob, so checksums are never recorded.
+
+        Args:
+            self (Self): A GCSBackend().
+            location (str): A 'gs://{bucket}/{name}' location.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+
+        Returns:
+            checksum (str): The base64 encoded checksum, or None if the blob doesn't exist or is a composite object without an MD5 hash.
+        '''
+        blob = self._blob(location).bucket.get_blob('/'.join(location.split('/')[3:]))
+        if blob is None:
+            return None
+        ''' Composite objects have no MD5 hash.'''
+        return blob.crc32c if algorithm == 'crc32c' else blob.md5_hash
+
+
+class MemoryBackend(StorageBackend):
+    '''
+    An in-memory storage backend, for 'memory://{name}' locations, e.g. in tests. Implements StorageBackend().
+
+    Instances share one process-wide store unless given their own.
+    '''
+
+    def __init__(self, objects: Optional[dict] = None):
+        '''
+        Args:
+            objects: An optional dictionary to store object data in, keyed by location.
+        '''
+        self.objects = _MEMORY_OBJECTS if objects is None else objects
+
+    def put(self, path: str, location: str, move: bool = False):
+        '''
+        Stores a copy of a local file in memory. The local file is always kept, so a move is a copy.
+
+        Args:
+            self (Self): A MemoryBackend().
+            path (str): The path of the local file.
+            location (str): A 'memory://{name}' location.
+            move (bool): Ignored, local files are not deleted.
+
+        Returns:
+            location (str): The location of the stored data.
+        '''
+        with io.open(path, 'rb') as file:
+            data = file.read()
+        with _MEMORY_LOCK:
+            self.objects[location] = data
+        return location
+
+    @contextmanager
+    def open(self, location: str, mode: str = 'rb', chunk_size: int = 8 * 1024 * 1024):
+        '''
+        Opens an object for reading or writing with a Context Manager.
+
+        Written data is stored when the context exits without an exception.
+
+        Args:
+            self (Self): A MemoryBackend().
+            location (str): A 'memory://{name}' location.
+            mode (str): One of ['rb', 'wb'].
+            chunk_size (int): Ignored.
+
+        Returns:
+            file (io.BytesIO): A binary buffer of the object data.
+
+        Raises:
+            e (Exception): If the mode is not supported, or the object doesn't exist for reading.
+        '''
+        _check_mode(mode)
+
+        if mode == 'rb':
+            if location not in self.objects:
+                try:
+                    raise FileNotFoundError(f'No data at location {location}.')
+                except Exception as e:
+                    logger.exception(e)
+                    raise e
+            yield io.BytesIO(self.objects[location])
+            return
+
+        buffer = io.BytesIO()
+        yield buffer
+        with _MEMORY_LOCK:
+            self.objects[location] = buffer.getvalue()
+
+    def exists(self, location: str):
+        '''
+        Checks whether an object exists.
+
+        Args:
+            self (Self): A MemoryBackend().
+            location (str): A 'memory://{name}' location.
+
+        Returns:
+            exists (bool): Whether the object exists.
+        '''
+        return location in self.objects
+
+    def size(self, location: str):
+        '''
+        Returns the size of an object.
+
+        Args:
+            self (Self): A MemoryBackend().
+            location (str): A 'memory://{name}' location.
+
+        Returns:
+            size (int): The count of bytes in the object, or None if it doesn't exist.
+        '''
+        return len(self.objects[location]) if location in self.objects else None
+
+    def delete(self, location: str):
+        '''
+        Deletes an object, if it exists.
+
+        Args:
+            self (Self): A MemoryBackend().
+            location (str): A 'memory://{name}' location.
+
+        Returns:
+            None
+        '''
+        with _MEMORY_LOCK:
+            self.objects.pop(location, None)
+
+    def checksum(self, location: str, algorithm: str):
+        '''
+        Computes the checksum of an object from its data, so checksums are never recorded.
+
+        Args:
+            self (Self): A MemoryBackend().
+            location (str): A 'memory://{name}' location.
+            algorithm (str): The checksum algorithm. One of ['crc32c', 'md5'].
+
+        Returns:
+            checksum (str): The base64 encoded checksum, or None if the object doesn't exist.
+        '''
+        if location not in self.objects:
+            return None
+        hasher = google_crc32c.Checksum() if algorithm == 'crc32c' else hashlib.md5()
+        hasher.update(self.objects[location])
+        return base64.b64encode(hasher.digest()).decode('utf-8')
+
+
+def get_backend(url: str, client: Optional[storage.Client] = None, **options):
+    '''
+    Returns the storage backend for the scheme of a location URL.
+
+    Args:
+        url: A string specifying a location or destination, e.g. 'gs://bucket/data', 'memory://data' or '/data'.
+        client: An optional storage.Client for GCS locations.
+        options: Keyword arguments of the GCSBackend() upload options, ignored by other backends.
+
+    Returns:
+        backend: A StorageBackend.
+
+    Raises:
+        e (Exception): If the URL scheme is not supported.
+    '''
+    if url.startswith('gs://'):
+        return GCSBackend(client=client, **options)
+    if url.startswith('memory://'):
+        return MemoryBackend()
+    if '://' in url and not url.startswith('file://'):
+        try:
+            raise ValueError(f'Unsupported storage scheme in {url}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+    return LocalBackend()
+
+
+def file_checksum(path: str, algorithm: str, chunk_size: int = 8 * 1024 * 1024):
+    '''
+    Computes the checksum of a local file in a streaming pass, encoded like GCS object hashes.
+
+    Args:
+        path: A string specifying the file path.
+        algorithm: A string specifying the checksum algorithm. One of ['crc32c', 'md5'].
+        chunk_size: An integer count of bytes per read.
+
+    Returns:
+        checksum: A string with the base64 encoded big-endian checksum.
+    '''
+    hasher = google_crc32c.Checksum() if algorithm == 'crc32c' else hashlib.md5()
+    with io.open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            hasher.update(chunk)
+    return base64.b64encode(hasher.digest()).decode('utf-8')
+
+
+def _check_mode(mode: str):
+    '''
+    Validates a storage backend open mode.
+
+    Args:
+        mode: A string specifying the mode. One of ['rb', 'wb'].
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): If the mode is not supported.
+    '''
+    if mode not in ['rb', 'wb']:
+        try:
+            raise ValueError(f'Unsupported mode {mode}, must be one of [\'rb\', \'wb\'].')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def _copy_file(source: str, dest: str):
+    '''
+    Copies a file in the kernel, with copy_file_range() where supported and sendfile() otherwise.
+
+    copy_file_range() can share extents on filesystems that support reflinks, but isn't available
+    across filesystems on older kernels, so the copy continues with sendfile() from the same offset.
+
+    Args:
+        source: A string specifying the source file path.
+        dest: A string specifying the destination file path.
+
+    Returns:
+        copied: An integer count of bytes copied.
+    '''
+    with io.open(source, 'rb') as fsrc, io.open(dest, 'wb') as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(infd).st_size
+        copied: int = 0
+
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while copied < size:
+                    sent = os.copy_file_range(infd, outfd, size - copied, copied, copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError as e:
+                logger.debug(f'copy_file_range() failed, continuing with sendfile(): {e}')
+
+        if copied < size:
+            os.lseek(outfd, copied, os.SEEK_SET)
+            try:
+                while copied < size:
+                    sent = os.sendfile(outfd, infd, copied, size - copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+            except OSError as e:
+                logger.debug(f'sendfile() failed, continuing with a buffered copy: {e}')
+                fsrc.seek(copied)
+                os.lseek(outfd, copied, os.SEEK_SET)
+                shutil.copyfileobj(fsrc, fdst)
+                copied = size
+
+    return copied
+
+
+def _sidecar_path(location: str, algorithm: str):
+    '''
+    Returns the sidecar file path holding the checksum of a local data file.
+
+    Sidecars are kept in a hidden '.checksums' directory in the data directory, which is removed with it.
+    The pipeline builders' default ExampleGen input pattern skips hidden files, so they aren't ingested.
+
+    Args:
+        location: A string specifying the data file path.
+        algorithm: A string specifying the checksum algorithm. One of ['crc32c', 'md5'].
+
+    Returns:
+        path: A string specifying the sidecar file path, e.g. '/data/.checksums/penguins.csv.crc32c'.
+    '''
+    directory, filename = os.path.split(os.path.abspath(location))
+    return os.path.join(directory, '.checksums', f'{filename}.{algorithm}')
+
+
+def _upload_part(blob: storage.Blob, path: str, offset: int, size: int):
+    '''
+    Uploads a byte range of a file to a blob.
+
+    Args:
+        blob: A storage.Blob to upload to.
+        path: A string specifying the file path.
+        offset: An integer byte offset of the range.
+        size: An integer count of bytes in the range.
+
+    Returns:
+        blob: The uploaded storage.Blob.
+    '''
+    with io.open(path, 'rb') as file:
+        file.seek(offset)
+        blob.upload_from_file(file, size=size)
+    return blob
+
+
+def _composite_upload(blob: storage.Blob, path: str, part_size: int, max_workers: int):
+    '''
+    Uploads a file to a blob as concurrently uploaded parts, composed into the blob.
+
+    GCS composes at most 32 objects per request, so larger part counts are composed in
+    rounds through intermediate objects. All parts and intermediate objects are deleted.
+
+    Args:
+        blob: A storage.Blob to upload to.
+        path: A string specifying the file path.
+        part_size: An integer count of bytes per part.
+        max_workers: An integer count of parts to upload concurrently.
+
+    Returns:
+        blob: The composed storage.Blob.
+
+    Raises:
+        e (Exception): If the part size is not positive, or any unhandled exception.
+    '''
+    if part_size < 1:
+        try:
+            raise ValueError(f'Composite upload part size must be positive, got {part_size}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    size = os.stat(path).st_size
+    prefix = f'{blob.name}.parts-{uuid.uuid4().hex}'
+    temporary: list = []
+
+    try:
+        offsets = list(range(0, size, part_size))
+        parts = [blob.bucket.blob(f'{prefix}/{index:05d}') for index in range(len(offsets))]
+        temporary.extend(parts)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_upload_part, part, path, offset, min(part_size, size - offset)) for part, offset in zip(parts, offsets)]
+            for future in futures:
+                future.result()
+        logger.info(f'Uploaded {len(parts)} parts of file {path} to bucket {blob.bucket.name}.')
+
+        rounds: int = 0
+        while len(parts) > 32:
+            rounds += 1
+            groups = [parts[index:index + 32] for index in range(0, len(parts), 32)]
+            parts = [blob.bucket.blob(f'{prefix}/compose-{rounds}-{index:05d}') for index in range(len(groups))]
+            for composed, group in zip(parts, groups):
+                composed.compose(group)
+            temporary.extend(parts)
+
+        blob.compose(parts)
+        logger.info(f'Composed blob {blob.name} in bucket {blob.bucket.name} from {len(temporary)} objects.')
+        return blob
+    finally:
+        for part in temporary:
+            try:
+                part.delete()
+            except NotFound:
+                pass
+            except Exception as e:
+                logger.warning(f'Failed to delete temporary object {part.name}: {e}')
@@ -1,98 +1,1379 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib2 import AbstractContextManager
+from deeplearning.utils.backends import file_checksum, get_backend
+from google.auth.transport.requests import AuthorizedSession  # type: ignore
 from google.cloud import storage  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from typing import Optional
 
+import asyncio
+import functools
+import google.auth  # type: ignore
+import hashlib
+import http.client
+import json
 import logging
 import os
+import queue
+import struct
+import tarfile
 import tempfile
+import threading
+import time
+import urllib.error
 import urllib.request as geturl
+import zlib
 
 
 logger = logging.getLogger(__name__)
 
 
-def data_fetcher(name: str, source: str, dest: str):
+class DownloadCache(AbstractContextManager):
     '''
-    Fetches data from external URL and writes to pipeline data root. Supports GCS destinations.
+    An on-disk download cache for data_fetcher(), keyed by a hash of the source URL.
+
+    Cached files are served without a network request while they are younger than max_age seconds,
+    and revalidated with an ETag/Last-Modified conditional request after that. When the cache grows
+    beyond max_size bytes, the least recently used files are evicted.
+    '''
+
+    def __init__(self, path: str, max_size: int, max_age: int = 0):
+        '''
+        Initialize the cache and return the instance.
+
+        Args:
+            path: A string specifying the cache directory, created if it doesn't exist.
+            max_size: An integer count of bytes to keep in the cache.
+            max_age: An integer count of seconds to serve cached files without revalidation.
+
+        Returns:
+            self: An initialized DownloadCache().
+        '''
+        self.path: str = os.path.expanduser(path)
+        self.max_size: int = max_size
+        self.max_age: int = max_age
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def __enter__(self):
+        ''' Context Manager entry method.'''
+        return self
+
+    def __exit__(self, *args):
+        ''' Context Manager exit method.'''
+        return False
+
+    @staticmethod
+    def from_config(config: dict):
+        '''
+        Static method to create a cache from the filesystem.cache section of the Config() class.
+
+        Args:
+            config: A dictionary of cache settings, e.g. {'enabled': True, 'max_age': 86400, 'max_size': 4294967296, 'path': '~/.cache/deeplearning'}.
+
+        Returns:
+            cache: A DownloadCache(), or None if the cache is not enabled.
+        '''
+        if not config.get('enabled', False):
+            return None
+        return DownloadCache(path=config['path'], max_size=config['max_size'], max_age=config.get('max_age', 0))
+
+    def _paths(self, source: str):
+        '''
+        Returns the data and metadata paths of a cached source URL.
+
+        Args:
+            source: A string specifying the URL of a data source.
+
+        Returns:
+            A tuple of the data file path and the metadata file path.
+        '''
+        key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, key), os.path.join(self.path, f'{key}.json')
+
+    def _write_metadata(self, path: str, metadata: dict):
+        '''
+        Atomically writes the metadata of a cached file.
+
+        Args:
+            path: A string specifying the metadata file path.
+            metadata: A dictionary of metadata values.
+
+        Returns:
+            None
+        '''
+        with open(f'{path}.part', 'w') as file:
+            json.dump(metadata, file)
+        os.replace(f'{path}.part', path)
+
+    def fetch(self, source: str, chunk_size: int = 8 * 1024 * 1024):
+        '''
+        Returns the path of a cached copy of a source URL, downloading it if it is missing or has changed.
+
+        Args:
+            source: A string specifying the URL of a data source.
+            chunk_size: An integer count of bytes per downloaded chunk.
+
+        Returns:
+            path: A string specifying the path of the cached file. Copy it before modifying it.
+
+        Raises:
+            e (Exception): Any unhandled exception, as necessary.
+        '''
+        data_path, metadata_path = self._paths(source)
+        metadata: dict = {}
+
+        if os.path.exists(data_path) and os.path.exists(metadata_path):
+            with open(metadata_path) as file:
+                metadata = json.load(file)
+
+        if metadata and time.time() - metadata['validated'] < self.max_age:
+            logger.info(f'Using cached copy of {source}.')
+            return self._hit(data_path, metadata_path, metadata)
+
+        request = geturl.Request(source)
+        if metadata.get('etag'):
+            request.add_header('If-None-Match', metadata['etag'])
+        if metadata.get('last_modified'):
+            request.add_header('If-Modified-Since', metadata['last_modified'])
+
+        try:
+            with geturl.urlopen(request) as response:
+                with tempfile.NamedTemporaryFile(dir=self.path, suffix='.part', delete=False) as writer:
+                    try:
+                        size = _pipe(response, writer, chunk_size)
+                    except Exception as e:
+                        os.unlink(writer.name)
+                        raise e
+                os.replace(writer.name, data_path)
+                metadata = {
+                    'source': source,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'size': size,
+                    'validated': time.time()
+                }
+                logger.info(f'Cached {size} bytes from {source}.')
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or not metadata:
+                logger.exception(e)
+                raise e
+            logger.info(f'Cached copy of {source} is unchanged.')
+            metadata['validated'] = time.time()
+
+        path = self._hit(data_path, metadata_path, metadata)
+        self.evict(keep=source)
+        return path
+
+    def _hit(self, data_path: str, metadata_path: str, metadata: dict):
+        '''
+        Records an access to a cached file, for least recently used eviction.
+
+        Args:
+            data_path: A string specifying the data file path.
+            metadata_path: A string specifying the metadata file path.
+            metadata: A dictionary of metadata values.
+
+        Returns:
+            data_path: The data file path.
+        '''
+        metadata['accessed'] = time.time()
+        with self.lock:
+            self._write_metadata(metadata_path, metadata)
+        return data_path
+
+    def evict(self, keep: Optional[str] = None):
+        '''
+        Evicts the least recently used files until the cache is within its size cap.
+
+        Args:
+            keep: An optional source URL to keep in the cache, e.g. the file just fetched.
+
+        Returns:
+            evicted: A list of the source URLs of evicted files.
+        '''
+        entries: list = []
+        evicted: list = []
+
+        with self.lock:
+            for filename in os.listdir(self.path):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(self.path, filename)) as file:
+                        entries.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+
+            size = sum(entry['size'] for entry in entries)
+            for entry in sorted(entries, key=lambda entry: entry.get('accessed', 0)):
+                if size <= self.max_size:
+                    break
+                if entry['source'] == keep:
+                    continue
+                for path in self._paths(entry['source']):
+                    if os.path.exists(path):
+                        os.unlink(path)
+                size -= entry['size']
+                evicted.append(entry['source'])
+                logger.info(f'Evicted cached copy of {entry["source"]}.')
+
+        return evicted
+
+
+def data_fetcher(name: str,
+                 source: str,
+                 dest: str,
+                 stream: bool = False,
+                 chunk_size: int = 8 * 1024 * 1024,
+                 client: Optional[storage.Client] = None,
+                 cache: Optional[DownloadCache] = None,
+                 connections: int = 1,
+                 checksum: Optional[str] = None,
+                 extract: bool = False,
+                 retries: int = 0,
+                 backoff: float = 0.5):
+    '''
+    Fetches data from external URL and writes to pipeline data root. Supports local, GCS and in-memory destinations by URL scheme, see get_backend().
+
+    In streaming mode the HTTP response is read in chunks and written to the destination as the
+    chunks arrive, through a resumable upload for GCS destinations, without a local temporary copy.
+    Download and upload overlap, so the fetch takes about as long as the slower of the two.
+
+    With a download cache, the data is copied or uploaded from the cached file, which is only
+    downloaded again when the source has changed. Streaming mode skips the local copy that the cache keeps,
+    so the two can't be combined.
+
+    With more than one connection, sources from servers that accept byte range requests are
+    downloaded as concurrent ranges into a preallocated file, otherwise as a single stream.
+
+    Failed requests and interrupted downloads are retried with exponential backoff, resuming with range
+    requests rather than starting over. Single stream downloads are kept as partial files in the temporary
+    directory when they fail, so that a later fetch of the same source resumes them, and are only moved to
+    the destination when complete.
+
+    With a checksum algorithm, the fetch is skipped when the source advertises a checksum, e.g. in
+    the x-goog-hash headers of GCS-hosted data, that matches the destination's stored checksum.
+    Use data_fetcher_with_status() to find out whether a fetch was skipped.
+
+    In extract mode, '.gz' files are decompressed and '.tar.gz', '.tgz' and '.zip' archives are extracted
+    while streaming, so the compressed data never reaches the disk. Gzip files are named after the pipeline,
+    e.g. 'penguins.csv' for 'penguins.csv.gz', and archive members after the pipeline and the member's path, e.g.
+    'penguins-data-train.csv' for member 'data/train.csv'. Extract mode takes precedence over the cache and ranges.
 
     Args:
         name: A string specifying the pipeline name.
         source: A string specifying the URL of a public data source.
         dest: A string specifying filesystem or cloud storage destination.
+        stream: A bool indicating whether to stream the data to the destination without a temporary file.
+        chunk_size: An integer count of bytes per streamed chunk, a multiple of 256 KiB for GCS destinations.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+        cache: An optional DownloadCache, e.g. as returned by DownloadCache.from_config().
+        connections: An integer count of concurrent range requests, when not streaming.
+        checksum: An optional string specifying the checksum algorithm to skip unchanged data with. One of [None, 'crc32c', 'md5'].
+        extract: A bool indicating whether to decompress or extract the data while streaming it to the destination.
+        retries: An integer count of retries of failed requests, when not streaming.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
 
     Returns:
-        destination: A string specifying the location of the data.
+        destination: A string specifying the location of the data, or in extract mode, a list of locations of the data extracted from an archive.
 
     Raises:
-        e (Exception): Any unhandled exception, as necessary.
+        e (Exception): If the checksum algorithm or archive format is not supported, streaming mode is combined with a cache, or any unhandled exception.
     '''
+    if stream and cache is not None:
+        try:
+            raise ValueError('Streaming mode doesn\'t keep a local copy of the data, so it can\'t be combined with a download cache.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    if extract:
+        if checksum is not None:
+            try:
+                raise ValueError('Checksums of extracted data can\'t be compared with the source, so extract mode doesn\'t support them.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+        return _extract_fetcher(name=name, source=source, dest=dest, chunk_size=chunk_size, client=client)
+
+    if checksum is not None:
+        location, _ = data_fetcher_with_status(name=name, source=source, dest=dest, checksum=checksum, stream=stream, chunk_size=chunk_size, client=client, cache=cache,
+                                               connections=connections, retries=retries, backoff=backoff)
+        return location
+
+    if cache is not None:
+        return _cached_fetcher(name=name, source=source, dest=dest, cache=cache, chunk_size=chunk_size, client=client)
+
+    if stream:
+        return _stream_fetcher(name=name, source=source, dest=dest, chunk_size=chunk_size, client=client)
 
     ''' Get a temporary directory with context manager.'''
     with tempfile.TemporaryDirectory(prefix=name) as _temp_root:
 
         ''' Name the destination file after the pipeline.'''
-        if source.split('/')[-1].lower().split('.')[-1]:
-            _data_filepath = os.path.join(_temp_root, '.'.join((name, source.split('/')[-1].lower().split('.')[-1])))
-        else:
-            _data_filepath = os.path.join(_temp_root, name)
+        _data_filepath = os.path.join(_temp_root, _data_filename(name, source))
 
-        geturl.urlretrieve(source, _data_filepath)
+        _download(source, _data_filepath, connections=connections, chunk_size=chunk_size, retries=retries, backoff=backoff)
         logger.info(f'Fetched data to file {_data_filepath}.')
 
-        if dest.startswith('gs://'):
-            cli = storage.Client()
-            bucket = cli.bucket(dest.split('/')[2])
-            blob = bucket.blob(os.path.join('/'.join(dest.split('/')[3:]), _data_filepath.split('/')[-1]))
-            blob.upload_from_filename(_data_filepath)
-            logger.info(f'Uploaded blob {blob.name} to bucket {bucket.name} from file {_data_filepath}.')
-            location = os.path.join('gs://', f'{bucket.name}', f'{blob.name}')
-        else:
-            if not os.path.exists(dest):
-                os.makedirs(dest)
-            os.rename(_data_filepath, '/'.join((dest, _data_filepath.split('/')[-1])))
-            location = '/'.join((dest, _data_filepath.split('/')[-1]))
+        location = get_backend(dest, client).put(_data_filepath, os.path.join(dest, _data_filepath.split('/')[-1]), move=True)
+        logger.info(f'Stored data from file {_data_filepath} at {location}.')
 
         return location
 
 
-def data_pusher(name: str, source: str, dest: str):
+def data_fetcher_with_status(name: str, source: str, dest: str, checksum: Optional[str] = None, **options):
+    '''
+    Fetches data like data_fetcher(), and reports whether the fetch was skipped as unchanged.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the URL of a public data source.
+        dest: A string specifying filesystem or cloud storage destination.
+        checksum: An optional string specifying the checksum algorithm to skip unchanged data with. One of [None, 'crc32c', 'md5'].
+        options: Keyword arguments of data_fetcher(), e.g. stream, connections, client or cache.
+
+    Returns:
+        A tuple of the location of the data, as returned by data_fetcher(), and a bool indicating whether the fetch was skipped.
+
+    Raises:
+        e (Exception): If the checksum algorithm is not supported, or any unhandled exception.
+    '''
+    if checksum is None or options.get('extract'):
+        return data_fetcher(name=name, source=source, dest=dest, checksum=checksum, **options), False
+
+    _check_checksum(checksum)
+    backend = get_backend(dest, options.get('client'))
+    location = os.path.join(dest, _data_filename(name, source))
+    advertised = _source_checksum(source, checksum)
+    if advertised is not None and advertised == backend.checksum(location, checksum):
+        logger.info(f'Skipped fetching unchanged data from {source} to {location}.')
+        return location, True
+
+    location = data_fetcher(name=name, source=source, dest=dest, **options)
+    backend.record_checksum(location, checksum)
+    return location, False
+
+
+async def fetch_many(sources,
+                     dest: str,
+                     max_concurrency: int = 8,
+                     **options):
+    '''
+    Fetches many data files from external URLs to pipeline data root concurrently, e.g. sharded datasets.
+
+    Each fetch runs data_fetcher() in a worker thread, with at most max_concurrency fetches in
+    flight, so that slow sources don't hold up the rest. Failed fetches don't cancel the others,
+    and are reported with their error. Run with asyncio.run(fetch_many(...)), or await in a running event loop.
+
+    Fetches of the same URL under different names run one at a time, as they share a partial download file.
+
+    Args:
+        sources: A dictionary of URLs keyed by data file name, or a list of URLs named after their file names, which must be unique.
+        dest: A string specifying filesystem or cloud storage destination.
+        max_concurrency: An integer count of fetches in flight.
+        options: Keyword arguments of data_fetcher(), e.g. stream, connections, client, cache or checksum.
+
+    Returns:
+        summary: A dictionary with a list of per-source 'results', the total 'bytes', elapsed 'seconds',
+            'throughput' in bytes per second and a count of 'failed' fetches. Each result is a dictionary with
+            the 'name', 'source', 'location', 'bytes', 'seconds', 'skipped' and 'error' of a fetch, in the order of the sources,
+            with a list of locations for extracted archives.
+
+    Raises:
+        e (Exception): If the maximum concurrency is less than 1, or a list of sources has duplicate file names.
     '''
-    Pushes data to pipeline data root. Supports GCS destinations.
+    if max_concurrency < 1:
+        try:
+            raise ValueError(f'Maximum concurrency must be at least 1, got {max_concurrency}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    if not isinstance(sources, dict):
+        names = [source.split('/')[-1].split('.')[0] for source in sources]
+        duplicates = sorted(set(name for name in names if names.count(name) > 1))
+        if duplicates:
+            try:
+                raise ValueError(f'Sources have duplicate file names {duplicates}, pass a dictionary of sources keyed by unique names.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+        sources = dict(zip(names, sources))
+
+    backend = get_backend(dest, options.get('client'))
+    semaphore = asyncio.Semaphore(max_concurrency)
+    locks = {source: asyncio.Lock() for source in sources.values()}
+
+    async def _fetch(name: str, source: str):
+        result: dict = {'name': name, 'source': source, 'location': None, 'bytes': 0, 'seconds': 0.0, 'skipped': False, 'error': None}
+        async with locks[source], semaphore:
+            started = time.monotonic()
+            try:
+                location, result['skipped'] = await asyncio.to_thread(data_fetcher_with_status, name=name, source=source, dest=dest, **options)
+                result['location'] = location
+                if not result['skipped']:
+                    locations = location if isinstance(location, list) else [location]
+                    result['bytes'] = sum([await asyncio.to_thread(backend.size, location) or 0 for location in locations])
+            except Exception as e:
+                logger.warning(f'Failed to fetch data from {source}: {e}')
+                result['error'] = e
+            result['seconds'] = time.monotonic() - started
+        return result
+
+    started = time.monotonic()
+    results = await asyncio.gather(*[_fetch(name, source) for name, source in sources.items()])
+    seconds = time.monotonic() - started
+
+    size = sum(result['bytes'] for result in results)
+    failed = sum(result['error'] is not None for result in results)
+    logger.info(f'Fetched {len(results) - failed} of {len(results)} sources, {size} bytes in {seconds:.2f}s.')
+    return {
+        'results': results,
+        'bytes': size,
+        'seconds': seconds,
+        'throughput': size / seconds if seconds > 0 else 0.0,
+        'failed': failed
+    }
+
+
+def data_pusher(name: str,
+                source: str,
+                dest: str,
+                client: Optional[storage.Client] = None,
+                composite: bool = False,
+                part_size: int = 64 * 1024 * 1024,
+                max_workers: int = 8,
+                checksum: Optional[str] = None):
+    '''
+    Pushes data to pipeline data root. Supports local, GCS and in-memory destinations by URL scheme, see get_backend().
+
+    In composite mode, files larger than the part size are split into parts that are uploaded
+    concurrently over separate connections, then composed into the destination blob and deleted.
+    Composite objects have a CRC32C but no MD5 hash.
+
+    With a checksum algorithm, the push is skipped when the checksum of the source, computed in
+    a streaming pass, matches the destination's stored checksum. Use data_pusher_with_status() to
+    find out whether a push was skipped.
 
     Args:
         name: A string specifying the pipeline name.
         source: A string specifying the data source.
         dest: A string specifying filesystem or cloud storage destination.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+        composite: A bool indicating whether to use parallel composite uploads for large files to GCS destinations.
+        part_size: An integer count of bytes per part of a parallel composite upload.
+        max_workers: An integer count of parts to upload concurrently.
+        checksum: An optional string specifying the checksum algorithm to skip unchanged data with. One of [None, 'crc32c', 'md5'].
 
     Returns:
         destination: A string specifying the location of the data.
 
     Raises:
-        e (Exception): Any unhandled exception, as necessary.
+        e (Exception): If the checksum algorithm is not supported, or any unhandled exception.
     '''
 
+    if checksum is not None:
+        location, _ = data_pusher_with_status(name=name, source=source, dest=dest, checksum=checksum, client=client, composite=composite, part_size=part_size,
+                                              max_workers=max_workers)
+        return location
+
     ''' Name the destination file after the pipeline.'''
-    if source.split('/')[-1].lower().split('.')[-1]:
-        _data_filepath = os.path.join('/'.join(source.split('/')[:-1]), '.'.join((name, source.split('/')[-1].lower().split('.')[-1])))
-    else:
-        _data_filepath = os.path.join('/'.join(source.split('/')[:-1]), name)
+    _data_filepath = os.path.join('/'.join(source.split('/')[:-1]), _data_filename(name, source))
 
     if source != _data_filepath:
         os.rename(source, _data_filepath)
 
-    if dest.startswith('gs://'):
-        cli = storage.Client()
-        bucket = cli.bucket(dest.split('/')[2])
-        blob = bucket.blob(os.path.join('/'.join(dest.split('/')[3:]), _data_filepath.split('/')[-1]))
-        ''' Fix chunk size for large(ish) files.'''
-        if os.stat(_data_filepath).st_size > 20 * 1024 * 1024:
-            blob.chunk_size = 5 * 1024 * 1024
-        logger.info(f'Uploading blob {blob.name} to bucket {bucket.name} from file {_data_filepath}.')
-        blob.upload_from_filename(_data_filepath)
-        logger.info(f'Uploaded blob {blob.name} to bucket {bucket.name} from file {_data_filepath}.')
-        location = os.path.join('gs://', f'{bucket.name}', f'{blob.name}')
-    else:
-        if not os.path.exists(dest):
-            os.makedirs(dest)
-        os.rename(_data_filepath, '/'.join((dest, _data_filepath.split('/')[-1])))
-        location = '/'.join((dest, _data_filepath.split('/')[-1]))
+    return _push_file(path=_data_filepath, dest=dest, client=client, composite=composite, part_size=part_size, max_workers=max_workers)
+
+
+def data_pusher_with_status(name: str, source: str, dest: str, checksum: Optional[str] = None, **options):
+    '''
+    Pushes data like data_pusher(), and reports whether the push was skipped as unchanged.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the data source.
+        dest: A string specifying filesystem or cloud storage destination.
+        checksum: An optional string specifying the checksum algorithm to skip unchanged data with. One of [None, 'crc32c', 'md5'].
+        options: Keyword arguments of data_pusher(), e.g. client, composite, part_size or max_workers.
+
+    Returns:
+        A tuple of the location of the data, and a bool indicating whether the push was skipped.
+
+    Raises:
+        e (Exception): If the checksum algorithm is not supported, or any unhandled exception.
+    '''
+    if checksum is None:
+        return data_pusher(name=name, source=source, dest=dest, **options), False
+
+    _check_checksum(checksum)
+
+    ''' Name the destination file after the pipeline.'''
+    _data_filepath = os.path.join('/'.join(source.split('/')[:-1]), _data_filename(name, source))
+
+    if source != _data_filepath:
+        os.rename(source, _data_filepath)
+
+    backend = get_backend(dest, options.get('client'))
+    location = os.path.join(dest, _data_filepath.split('/')[-1])
+    value = file_checksum(_data_filepath, checksum)
+    if value == backend.checksum(location, checksum):
+        logger.info(f'Skipped pushing unchanged data from {_data_filepath} to {location}.')
+        return location, True
+
+    location = data_pusher(name=name, source=_data_filepath, dest=dest, **options)
+    backend.record_checksum(location, checksum, value)
+    return location, False
+
+
+def bulk_data_pusher(sources,
+                     dest: str,
+                     client: Optional[storage.Client] = None,
+                     max_workers: int = 16,
+                     composite: bool = False,
+                     part_size: int = 64 * 1024 * 1024,
+                     part_workers: int = 8):
+    '''
+    Pushes many data files, e.g. TFRecord shards, to pipeline data root concurrently. Supports GCS destinations.
+
+    Files keep their names, and are uploaded from a thread pool over one storage client, whose
+    connection pool is sized to the thread pool so that connections are reused across uploads.
+    Parallel composite uploads run their parts in a thread pool per file, so the connection pool
+    is sized to max_workers * part_workers concurrent requests. A client passed in keeps its own pool.
+
+    Args:
+        sources: A list of strings specifying the data files, or a string specifying a directory of data files.
+        dest: A string specifying filesystem or cloud storage destination.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new pooled client.
+        max_workers: An integer count of files to push concurrently.
+        composite: A bool indicating whether to use parallel composite uploads for large files to GCS destinations.
+        part_size: An integer count of bytes per part of a parallel composite upload.
+        part_workers: An integer count of parts to upload concurrently per file, in a parallel composite upload.
+
+    Returns:
+        destinations: A list of strings specifying the locations of the data, in the order of the sources.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    if isinstance(sources, str):
+        sources = sorted(os.path.join(sources, filename) for filename in os.listdir(sources) if os.path.isfile(os.path.join(sources, filename)))
+
+    if dest.startswith('gs://') and client is None:
+        client = _pooled_client(max_workers * part_workers if composite else max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_push_file, source, dest, client, composite, part_size, part_workers) for source in sources]
+        try:
+            locations = [future.result() for future in futures]
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    logger.info(f'Pushed {len(locations)} files to {dest}.')
+    return locations
+
+
+def _pooled_client(max_connections: int):
+    '''
+    Creates a storage client with a connection pool for concurrent requests.
+
+    The pool is mounted on an authorized session with the application default credentials, which is
+    passed to the client as its HTTP transport through the _http argument of storage.Client().
+
+    Args:
+        max_connections: An integer count of concurrent requests.
+
+    Returns:
+        client: A storage.Client.
+    '''
+    credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    ''' The default pool keeps 10 connections per host, so further threads would reconnect for each request.'''
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    session.mount('https://', adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
+
+def _push_file(path: str,
+               dest: str,
+               client: Optional[storage.Client] = None,
+               composite: bool = False,
+               part_size: int = 64 * 1024 * 1024,
+               max_workers: int = 8):
+    '''
+    Pushes a data file to pipeline data root under its own name. Supports GCS destinations.
+
+    Args:
+        path: A string specifying the data file.
+        dest: A string specifying filesystem or cloud storage destination.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+        composite: A bool indicating whether to use parallel composite uploads for large files to GCS destinations.
+        part_size: An integer count of bytes per part of a parallel composite upload.
+        max_workers: An integer count of parts to upload concurrently.
+
+    Returns:
+        destination: A string specifying the location of the data.
+    '''
+    backend = get_backend(dest, client, composite=composite, part_size=part_size, max_workers=max_workers)
+    return backend.put(path, os.path.join(dest, path.split('/')[-1]), move=True)
+
+
+def _data_filename(name: str, source: str):
+    '''
+    Names a data file after the pipeline, keeping the extension of the source.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the URL or path of the data source.
+
+    Returns:
+        filename: A string specifying the file name, e.g. 'penguins.csv'.
+    '''
+    if source.split('/')[-1].lower().split('.')[-1]:
+        return '.'.join((name, source.split('/')[-1].lower().split('.')[-1]))
+    return name
+
+
+def _read_chunks(response, chunks: queue.Queue, chunk_size: int, stop: threading.Event):
+    '''
+    Reads a response in chunks onto a bounded queue, ending with an empty chunk or the raised exception.
+
+    Args:
+        response: A readable file-like object, e.g. an HTTP response.
+        chunks: A queue.Queue to put the chunks on.
+        chunk_size: An integer count of bytes per chunk.
+        stop: A threading.Event set when the chunks are no longer wanted, e.g. after a failed write.
+
+    Returns:
+        None
+    '''
+    try:
+        while not stop.is_set():
+            chunk = response.read(chunk_size)
+            chunks.put(chunk)
+            if not chunk:
+                return
+    except Exception as e:
+        chunks.put(e)
+
+
+def _pipe(response, writer, chunk_size: int, depth: int = 2):
+    '''
+    Copies a response to a writer, reading the next chunks in a background thread while the current chunk is written.
+
+    Args:
+        response: A readable file-like object, e.g. an HTTP response.
+        writer: A writable file-like object, e.g. a local file or a storage.Blob writer.
+        chunk_size: An integer count of bytes per chunk.
+        depth: An integer count of chunks to read ahead of the writer.
+
+    Returns:
+        size: An integer count of the bytes copied.
+
+    Raises:
+        e (Exception): Any exception raised while reading the response or writing a chunk.
+    '''
+    size: int = 0
+    chunks: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    reader = threading.Thread(target=_read_chunks, args=(response, chunks, chunk_size, stop), daemon=True)
+    reader.start()
+
+    try:
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                return size
+            writer.write(chunk)
+            size += len(chunk)
+    finally:
+        ''' Stop the reader if the writer failed, and drain the queue so it can end after its current read.'''
+        stop.set()
+        while reader.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
+
+
+def _download(source: str,
+              path: str,
+              connections: int = 1,
+              chunk_size: int = 8 * 1024 * 1024,
+              retries: int = 0,
+              backoff: float = 0.5):
+    '''
+    Downloads a source URL to a file, as concurrent byte ranges if the server supports them.
+
+    Failed requests and interrupted responses are retried with exponential backoff. Range downloads
+    retry the rest of each range, and single stream downloads resume their partial download, see _resumable_download().
+
+    Args:
+        source: A string specifying the URL of a data source.
+        path: A string specifying the file path to write.
+        connections: An integer count of concurrent range requests.
+        chunk_size: An integer count of bytes per read.
+        retries: An integer count of retries per request.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
+
+    Returns:
+        size: An integer count of the bytes downloaded.
+    '''
+    if connections > 1:
+        with geturl.urlopen(geturl.Request(source, method='HEAD')) as response:
+            size = int(response.headers.get('Content-Length') or 0)
+            ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+
+        if ranges and size > 0:
+            try:
+                return _range_download(source, path, size, connections, chunk_size, retries, backoff)
+            except (_RangeNotSatisfied, _IncompleteDownload) as e:
+                logger.warning(f'Falling back to a single stream for {source}: {e}')
+        else:
+            logger.info(f'Server does not accept range requests for {source}, using a single stream.')
+
+    return _resumable_download(source, path, _partial_path(source), chunk_size, retries, backoff)
+
+
+class _RangeNotSatisfied(Exception):
+    '''
+    Raised when a server answers a range request with anything but the requested range.
+    '''
+
+
+class _IncompleteDownload(Exception):
+    '''
+    Raised when a response ends before the advertised end of its content.
+    '''
+
+
+def _retryable(e: Exception):
+    '''
+    Returns whether a failed download request may succeed when retried.
 
+    Args:
+        e: The exception raised by the request.
+
+    Returns:
+        retryable: A bool, True for interrupted responses, connection errors, timeouts and 408, 429 and 5xx HTTP statuses.
+    '''
+    if isinstance(e, urllib.error.HTTPError):
+        return e.code in [408, 429] or e.code >= 500
+    return isinstance(e, (_IncompleteDownload, urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError))
+
+
+def _retry(function, retries: int, backoff: float, source: str):
+    '''
+    Calls a function until it succeeds, retrying retryable failures with exponential backoff.
+
+    Args:
+        function: A callable with no arguments.
+        retries: An integer count of retries.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
+        source: A string specifying the URL of a data source, for logging.
+
+    Returns:
+        result: The result of the function.
+
+    Raises:
+        e (Exception): The last exception raised by the function, once it isn't retryable or the retries are used up.
+    '''
+    attempt: int = 0
+    while True:
+        try:
+            return function()
+        except Exception as e:
+            if attempt >= retries or not _retryable(e):
+                raise e
+            delay = backoff * 2 ** attempt
+            attempt += 1
+            logger.warning(f'Retrying download of {source} in {delay:.2f}s, attempt {attempt} of {retries}: {e}')
+            time.sleep(delay)
+
+
+def _partial_path(source: str):
+    '''
+    Returns the path that a partial download of a source URL is kept at, so that a later fetch can resume it.
+
+    The path only depends on the URL, so concurrent fetches of the same URL must not share it, see fetch_many().
+
+    Args:
+        source: A string specifying the URL of a data source.
+
+    Returns:
+        path: A string specifying the partial file path, in the temporary directory.
+    '''
+    return os.path.join(tempfile.gettempdir(), 'deeplearning-partials', hashlib.sha256(source.encode('utf-8')).hexdigest())
+
+
+def _resumable_download(source: str, path: str, partial: str, chunk_size: int, retries: int = 0, backoff: float = 0.5):
+    '''
+    Downloads a source URL to a file as a single stream, resuming a partial download where possible.
+
+    The response is written to a partial file, which is kept when the download fails, and renamed to the
+    file path only when complete. Partial downloads are resumed with a range request, conditional on the
+    source's ETag or Last-Modified validator, so a changed source is downloaded again from the start.
+
+    Args:
+        source: A string specifying the URL of a data source.
+        path: A string specifying the file path to write.
+        partial: A string specifying the partial file path, with its validator kept in a '.json' file beside it.
+        chunk_size: An integer count of bytes per read.
+        retries: An integer count of retries.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
+
+    Returns:
+        size: An integer count of the bytes of the file.
+    '''
+    os.makedirs(os.path.dirname(partial), exist_ok=True)
+
+    def _discard():
+        for stale in [partial, f'{partial}.json']:
+            if os.path.exists(stale):
+                os.unlink(stale)
+
+    def _attempt():
+        headers: dict = {}
+        offset: int = 0
+        if os.path.exists(partial) and os.path.exists(f'{partial}.json'):
+            with open(f'{partial}.json') as file:
+                validator = json.load(file).get('validator')
+            if validator:
+                offset = os.stat(partial).st_size
+                headers = {'Range': f'bytes={offset}-', 'If-Range': validator}
+
+        try:
+            response = geturl.urlopen(geturl.Request(source, headers=headers))
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                _discard()
+                raise _IncompleteDownload(f'Partial download of {source} is not satisfiable, restarting: {e}')
+            raise e
+
+        with response:
+            if response.status == 206:
+                content_range = response.headers.get('Content-Range', '')
+                if not content_range.startswith(f'bytes {offset}-'):
+                    _discard()
+                    raise _IncompleteDownload(f'Expected a range from byte {offset} of {source}, got {content_range}.')
+                logger.info(f'Resuming download of {source} from byte {offset}.')
+                total = None if content_range.endswith('/*') else int(content_range.split('/')[-1])
+                mode = 'ab'
+            else:
+                ''' Only strong ETags are valid If-Range validators.'''
+                etag = response.headers.get('ETag')
+                validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+                with open(f'{partial}.json', 'w') as file:
+                    json.dump({'source': source, 'validator': validator}, file)
+                total = int(response.headers['Content-Length']) if response.headers.get('Content-Length') else None
+                offset, mode = 0, 'wb'
+
+            with open(partial, mode) as writer:
+                size = offset + _pipe(response, writer, chunk_size)
+
+        if total is not None and size != total:
+            raise _IncompleteDownload(f'Download of {source} ended at byte {size} of {total}.')
+
+        os.replace(partial, path)
+        os.unlink(f'{partial}.json')
+        return size
+
+    return _retry(_attempt, retries, backoff, source)
+
+
+def _fetch_range(source: str, fd: int, first: int, last: int, chunk_size: int, retries: int = 0, backoff: float = 0.5):
+    '''
+    Downloads a byte range of a source URL into an open file at the same offset, retrying the rest of the range on failure.
+
+    Args:
+        source: A string specifying the URL of a data source.
+        fd: An integer file descriptor, open for writing.
+        first: An integer offset of the first byte of the range.
+        last: An integer offset of the last byte of the range, inclusive.
+        chunk_size: An integer count of bytes per read.
+        retries: An integer count of retries.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
+
+    Returns:
+        size: An integer count of the bytes downloaded.
+
+    Raises:
+        _RangeNotSatisfied: If the server doesn't return the requested range.
+        _IncompleteDownload: If the range ends early, once the retries are used up.
+    '''
+    offset: int = first
+
+    def _attempt():
+        nonlocal offset
+        request = geturl.Request(source, headers={'Range': f'bytes={offset}-{last}'})
+        with geturl.urlopen(request) as response:
+            if response.status != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {offset}-{last}/'):
+                raise _RangeNotSatisfied(f'Expected bytes {offset}-{last}, got status {response.status} and range {response.headers.get("Content-Range")}.')
+            while offset <= last:
+                chunk = response.read(min(chunk_size, last + 1 - offset))
+                if not chunk:
+                    raise _IncompleteDownload(f'Range bytes {first}-{last} ended early at offset {offset}.')
+                offset += os.pwrite(fd, chunk, offset)
+
+    _retry(_attempt, retries, backoff, source)
+    return offset - first
+
+
+def _range_download(source: str, path: str, size: int, connections: int, chunk_size: int, retries: int = 0, backoff: float = 0.5):
+    '''
+    Downloads a source URL into a preallocated file, as concurrent byte ranges.
+
+    Args:
+        source: A string specifying the URL of a data source.
+        path: A string specifying the file path to write.
+        size: An integer count of bytes in the source.
+        connections: An integer count of concurrent range requests.
+        chunk_size: An integer count of bytes per read.
+        retries: An integer count of retries per range.
+        backoff: A float count of seconds to wait before the first retry, doubled for each further retry.
+
+    Returns:
+        size: An integer count of the bytes downloaded.
+    '''
+    part_size = -(-size // connections)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    try:
+        ''' Reserve the space up front, so ranges written out of order don't fragment the file.'''
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            futures = [executor.submit(_fetch_range, source, fd, first, min(first + part_size, size) - 1, chunk_size, retries, backoff)
+                       for first in range(0, size, part_size)]
+            downloaded = sum(future.result() for future in futures)
+    finally:
+        os.close(fd)
+
+    logger.info(f'Downloaded {downloaded} bytes from {source} over {len(futures)} connections.')
+    return downloaded
+
+
+def _check_checksum(checksum: str):
+    '''
+    Validates a checksum algorithm.
+
+    Args:
+        checksum: A string specifying the checksum algorithm. One of ['crc32c', 'md5'].
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): If the checksum algorithm is not supported.
+    '''
+    if checksum not in ['crc32c', 'md5']:
+        try:
+            raise ValueError(f'Unsupported checksum algorithm {checksum}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def _source_checksum(source: str, checksum: str):
+    '''
+    Returns the checksum that a source URL advertises in its response headers, without downloading it.
+
+    GCS-hosted sources advertise CRC32C and MD5 hashes in x-goog-hash headers, and some
+    other servers advertise MD5 hashes in a Content-MD5 header.
+
+    Args:
+        source: A string specifying the URL of a data source.
+        checksum: A string specifying the checksum algorithm. One of ['crc32c', 'md5'].
+
+    Returns:
+        checksum: A string with the base64 encoded checksum, or None if the source doesn't advertise one.
+    '''
+    with geturl.urlopen(geturl.Request(source, method='HEAD')) as response:
+        for header in response.headers.get_all('x-goog-hash') or []:
+            for value in header.split(','):
+                key, _, digest = value.strip().partition('=')
+                if key == checksum:
+                    return digest
+        if checksum == 'md5':
+            return response.headers.get('Content-MD5')
+    return None
+
+
+def _stream_fetcher(name: str, source: str, dest: str, chunk_size: int, client: Optional[storage.Client] = None):
+    '''
+    Streams data from external URL to the pipeline data root, without a temporary file.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the URL of a public data source.
+        dest: A string specifying filesystem or cloud storage destination.
+        chunk_size: An integer count of bytes per streamed chunk, a multiple of 256 KiB for GCS destinations.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+
+    Returns:
+        destination: A string specifying the location of the data.
+
+    Raises:
+        e (Exception): If the chunk size is not a multiple of 256 KiB for a GCS destination, or any unhandled exception.
+    '''
+    location = os.path.join(dest, _data_filename(name, source))
+
+    with geturl.urlopen(source) as response:
+        with get_backend(dest, client).open(location, 'wb', chunk_size=chunk_size) as writer:
+            size = _pipe(response, writer, chunk_size)
+    logger.info(f'Streamed {size} bytes from {source} to {location}.')
+    return location
+
+
+def _archive_format(source: str):
+    '''
+    Returns the archive format of a data source, from its file extension.
+
+    Args:
+        source: A string specifying the URL of a data source.
+
+    Returns:
+        format: A string specifying the archive format. One of ['gzip', 'tar', 'zip'].
+
+    Raises:
+        e (Exception): If the file extension isn't a supported archive format.
+    '''
+    filename = source.split('/')[-1].lower()
+    for suffix, format in [('.tar.gz', 'tar'), ('.tgz', 'tar'), ('.zip', 'zip'), ('.gz', 'gzip')]:
+        if filename.endswith(suffix):
+            return format
+    try:
+        raise ValueError(f'Unsupported archive format of {source}, must be one of [\'.gz\', \'.tar.gz\', \'.tgz\', \'.zip\'].')
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def _member_filename(name: str, member: str):
+    '''
+    Names a data file extracted from an archive after the pipeline and the path of the archive member, keeping the extension of the member.
+
+    The member's directories are part of the name, so members with the same file name in different directories,
+    e.g. 'train/data.csv' and 'eval/data.csv', are extracted to different files.
+
+    Args:
+        name: A string specifying the pipeline name.
+        member: A string specifying the path of the archive member.
+
+    Returns:
+        filename: A string specifying the file name, e.g. 'penguins-data-train.csv' for member 'data/train.csv'.
+    '''
+    parts = [part for part in member.split('/') if part not in ['', '.', '..']]
+    return _data_filename('-'.join([name] + parts[:-1] + [parts[-1].split('.')[0]]), parts[-1])
+
+
+def _extract_fetcher(name: str, source: str, dest: str, chunk_size: int, client: Optional[storage.Client] = None):
+    '''
+    Streams a compressed file or archive from external URL to the pipeline data root, decompressing or extracting
+    it on the fly so that the compressed data never reaches the disk.
+
+    Gzip files are decompressed to one data file named after the pipeline, e.g. 'penguins.csv' for 'penguins.csv.gz'.
+    The regular files of tar and zip archives are extracted to data files named after the pipeline and the member's path,
+    e.g. 'penguins-data-train.csv' for member 'data/train.csv', skipping hidden files.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the URL of a public data source.
+        dest: A string specifying filesystem or cloud storage destination.
+        chunk_size: An integer count of bytes per streamed chunk, a multiple of 256 KiB for GCS destinations.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+
+    Returns:
+        destination: A string specifying the location of the data for gzip files, or a list of strings specifying
+            the locations of the extracted data, in archive order, for tar and zip archives.
+
+    Raises:
+        e (Exception): If the archive format is not supported, the archive is corrupt, or any unhandled exception.
+    '''
+    format = _archive_format(source)
+    backend = get_backend(dest, client)
+
+    with geturl.urlopen(source) as response:
+        if format == 'gzip':
+            location = os.path.join(dest, _data_filename(name, source.split('/')[-1][:-len('.gz')]))
+            with backend.open(location, 'wb', chunk_size=chunk_size) as writer:
+                gunzip = _GunzipWriter(writer, chunk_size)
+                _pipe(response, gunzip, chunk_size)
+                gunzip.close()
+            logger.info(f'Decompressed {gunzip.size} bytes from {source} to {location}.')
+            return location
+
+        locations: list = []
+        members = _tar_members(response, chunk_size) if format == 'tar' else _zip_members(response, chunk_size)
+        for member, chunks in members:
+            if member.endswith('/') or member.split('/')[-1].startswith('.'):
+                for _ in chunks:
+                    pass
+                continue
+            location = os.path.join(dest, _member_filename(name, member))
+            with backend.open(location, 'wb', chunk_size=chunk_size) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+            locations.append(location)
+            logger.info(f'Extracted member {member} of {source} to {location}.')
+
+    logger.info(f'Extracted {len(locations)} files from {source}.')
+    return locations
+
+
+class _GunzipWriter():
+    '''
+    A writer that decompresses the gzip data written to it into another writer, e.g. as the writer of _pipe().
+
+    Concatenated gzip members are decompressed in turn, like gunzip does. Output is limited to
+    chunk_size bytes per decompression call, so highly compressed input doesn't exhaust memory.
+    '''
+
+    def __init__(self, writer, chunk_size: int):
+        '''
+        Args:
+            writer: A writable file-like object for the decompressed data.
+            chunk_size: An integer count of bytes per decompressed chunk.
+        '''
+        self.writer = writer
+        self.chunk_size = chunk_size
+        self.size: int = 0
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._pending: bool = False
+
+    def write(self, data: bytes):
+        length = len(data)
+        while data:
+            if self._decompressor.eof:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            self._pending = True
+            for chunk in _inflate(self._decompressor, data, self.chunk_size):
+                self.writer.write(chunk)
+                self.size += len(chunk)
+            data = self._decompressor.unused_data if self._decompressor.eof else b''
+        return length
+
+    def close(self):
+        '''
+        Checks that the gzip data is complete.
+
+        Raises:
+            e (Exception): If the gzip data ended before the end of a member.
+        '''
+        if self._pending and not self._decompressor.eof:
+            try:
+                raise EOFError('Compressed data ended before the end of the gzip stream.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+
+def _inflate(decompressor, data: bytes, chunk_size: int):
+    '''
+    Decompresses data with a zlib decompressor, yielding at most chunk_size bytes at a time.
+
+    Args:
+        decompressor: A zlib decompression object.
+        data: The compressed bytes.
+        chunk_size: An integer count of bytes per decompressed chunk.
+
+    Returns:
+        chunks: A generator of decompressed chunks.
+    '''
+    while True:
+        chunk = decompressor.decompress(data, chunk_size)
+        if chunk:
+            yield chunk
+        data = decompressor.unconsumed_tail
+        ''' A full chunk may leave decompressed output pending, even when all input was consumed.'''
+        if decompressor.eof or (not data and len(chunk) < chunk_size):
+            return
+
+
+def _tar_members(response, chunk_size: int):
+    '''
+    Reads a gzipped tar archive as a stream, without seeking.
+
+    Args:
+        response: A readable file-like object, e.g. an HTTP response.
+        chunk_size: An integer count of bytes per chunk.
+
+    Returns:
+        members: A generator of (name, chunks) tuples, with chunks a generator of the member data. Each member's
+            chunks must be consumed before the next member is read. Directories and other special members are
+            yielded with no data, named with a trailing '/'.
+    '''
+    with tarfile.open(fileobj=response, mode='r|gz') as archive:
+        for member in archive:
+            file = archive.extractfile(member) if member.isfile() else None
+            if file is None:
+                yield f'{member.name.rstrip("/")}/', iter(())
+                continue
+            yield member.name, iter(functools.partial(file.read, chunk_size), b'')
+
+
+class _ByteStream():
+    '''
+    A byte stream over a readable file-like object, with exact reads and push back for archive parsing.
+    '''
+
+    def __init__(self, response, chunk_size: int):
+        '''
+        Args:
+            response: A readable file-like object, e.g. an HTTP response.
+            chunk_size: An integer count of bytes per read.
+        '''
+        self.response = response
+        self.chunk_size = chunk_size
+        self._buffer: bytes = b''
+
+    def read(self, size: int):
+        '''
+        Reads exactly size bytes, or fewer at the end of the stream.
+        '''
+        while len(self._buffer) < size:
+            chunk = self.response.read(max(self.chunk_size, size - len(self._buffer)))
+            if not chunk:
+                break
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def read_some(self):
+        '''
+        Reads the buffered bytes, or the next chunk of the stream.
+        '''
+        if self._buffer:
+            data, self._buffer = self._buffer, b''
+            return data
+        return self.response.read(self.chunk_size)
+
+    def unread(self, data: bytes):
+        '''
+        Pushes bytes back onto the stream.
+        '''
+        self._buffer = data + self._buffer
+
+
+def _zip_members(response, chunk_size: int):
+    '''
+    Reads a zip archive as a stream, from its local file headers, without seeking to the central directory.
+
+    Deflated members are read to the end of their deflate stream, so members with data descriptors are
+    supported, as written by zip tools that stream their output. Member data is checked against its CRC-32.
+
+    Args:
+        response: A readable file-like object, e.g. an HTTP response.
+        chunk_size: An integer count of bytes per chunk.
+
+    Returns:
+        members: A generator of (name, chunks) tuples, with chunks a generator of the member data.
+            Each member's chunks must be consumed before the next member is read.
+
+    Raises:
+        e (Exception): If the archive is corrupt, encrypted, or uses a compression method other than stored or deflated.
+    '''
+    stream = _ByteStream(response, chunk_size)
+
+    while True:
+        signature = stream.read(4)
+        ''' The central directory follows the last member.'''
+        if signature in [b'', b'PK\x01\x02', b'PK\x05\x06']:
+            return
+        if signature != b'PK\x03\x04':
+            try:
+                raise ValueError('Invalid zip archive, expected a local file header.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+        _, flags, method, _, _, crc, compressed_size, uncompressed_size, name_length, extra_length = struct.unpack('<HHHHHIIIHH', stream.read(26))
+        name = stream.read(name_length).decode('utf-8' if flags & 0x800 else 'cp437')
+        extra = stream.read(extra_length)
+
+        ''' Extra field 0x0001 holds the 64-bit sizes of zip64 members, and then their data descriptors have 64-bit sizes.'''
+        zip64: bool = False
+        offset: int = 0
+        while offset + 4 <= len(extra):
+            field, length = struct.unpack('<HH', extra[offset:offset + 4])
+            if field == 0x0001:
+                zip64 = True
+                sizes = struct.unpack(f'<{length // 8}Q', extra[offset + 4:offset + 4 + length // 8 * 8])
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = sizes[1] if uncompressed_size == 0xFFFFFFFF else sizes[0]
+            offset += 4 + length
+
+        if flags & 0x1 or method not in [0, 8] or (method == 0 and flags & 0x8):
+            try:
+                raise ValueError(f'Unsupported zip member {name}, must be unencrypted and deflated, or stored with known size.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+        def _chunks():
+            checksum: int = 0
+            if method == 8:
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                while not decompressor.eof:
+                    data = stream.read_some()
+                    if not data:
+                        raise EOFError(f'Zip archive ended in member {name}.')
+                    for chunk in _inflate(decompressor, data, chunk_size):
+                        checksum = zlib.crc32(chunk, checksum)
+                        yield chunk
+                stream.unread(decompressor.unused_data)
+            else:
+                remaining = compressed_size
+                while remaining:
+                    chunk = stream.read(min(chunk_size, remaining))
+                    if not chunk:
+                        raise EOFError(f'Zip archive ended in member {name}.')
+                    remaining -= len(chunk)
+                    checksum = zlib.crc32(chunk, checksum)
+                    yield chunk
+
+            if flags & 0x8:
+                descriptor = stream.read(4)
+                if descriptor != b'PK\x07\x08':
+                    stream.unread(descriptor)
+                expected = struct.unpack('<I', stream.read(20 if zip64 else 12)[:4])[0]
+            else:
+                expected = crc
+            if checksum != expected:
+                raise ValueError(f'CRC-32 mismatch in zip member {name}.')
+
+        chunks = _chunks()
+        yield name, chunks
+        ''' Skip any data that the consumer didn't read.'''
+        for _ in chunks:
+            pass
+
+
+def _cached_fetcher(name: str, source: str, dest: str, cache: DownloadCache, chunk_size: int, client: Optional[storage.Client] = None):
+    '''
+    Fetches data from external URL through a download cache, and copies it to the pipeline data root.
+
+    Args:
+        name: A string specifying the pipeline name.
+        source: A string specifying the URL of a public data source.
+        dest: A string specifying filesystem or cloud storage destination.
+        cache: A DownloadCache.
+        chunk_size: An integer count of bytes per downloaded chunk.
+        client: An optional storage.Client to use for GCS destinations, defaults to a new client.
+
+    Returns:
+        destination: A string specifying the location of the data.
+    '''
+    cached_path = cache.fetch(source, chunk_size=chunk_size)
+    location = get_backend(dest, client).put(cached_path, os.path.join(dest, _data_filename(name, source)))
+    logger.info(f'Copied cached file {cached_path} to {location}.')
     return location
@@ -1,39 +1,34 @@
 from contextlib2 import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 
 import logging
+import multiprocessing as mp
 import sys
 
 
 logger = logging.getLogger(__name__)
 
+''' The log queue of a worker process, as set by set_log_queue(), used by default by getContextLogger().'''
+_LOG_QUEUE = None
 
-@contextmanager
-def getContextLogger(format: str = '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
-                     level: int = logging.WARN,
-                     name: str = __name__,
-                     path: str = 'stdout',
-                     type: str = 'stream'):
+
+def _build_handler(format: str, path: str, type: str):
     '''
-    A function to return a Logger() instance with a Context Manager.
+    Builds a formatted stream or file log handler.
 
     Args:
         format (str): The format string to use for log entries.
-        level (int): The initial loglevel to use. One of [0, 10, 20, 30, 40, 50]
-        name (str): A name for the log.
         path (str): A file path or stream to log to.
         type (str): The type of log handler to use. One of ['file', 'stream'].
 
     Returns:
-        ctxtlogger (logging.Logger): A configured instance of the Logger class, enabled with the @contextmanager decorator.
+        handler (logging.Handler): A StreamHandler or FileHandler, with a Formatter.
 
     Raises:
-        e (Exception): Any unhandled exception, as necessary.
+        e (Exception): If the handler type is not supported, or any unhandled exception.
     '''
-    ctxtlogger: logging.Logger | None
     handler: logging.Handler
 
-    ctxtlogger = logging.getLogger(name)
-
     try:
         formatter = logging.Formatter(format)
 
@@ -66,8 +61,66 @@ def getContextLogger(format: str = '%(asctime)s: %(name)s: %(levelname)s: %(mess
             logger.exception(e)
             raise e
 
+    handler.setFormatter(formatter)
+    return handler
+
+
+def set_log_queue(queue):
+    '''
+    Routes the getContextLogger() logs of the current process to a log queue, e.g. as a pool initializer.
+
+    Args:
+        queue (Queue): The log queue of a getContextLogListener(), or None to log with stream or file handlers.
+
+    Returns:
+        None
+    '''
+    global _LOG_QUEUE
+    _LOG_QUEUE = queue
+
+
+@contextmanager
+def getContextLogger(format: str = '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
+                     level: int = logging.WARN,
+                     name: str = __name__,
+                     path: str = 'stdout',
+                     type: str = 'stream',
+                     queue=None):
+    '''
+    A function to return a Logger() instance with a Context Manager.
+
+    If a log queue is given, or set for the process with set_log_queue(), log records are put on the
+    queue with a QueueHandler, and formatted and written by the getContextLogListener() that owns it.
+
+    Args:
+        format (str): The format string to use for log entries.
+        level (int): The initial loglevel to use. One of [0, 10, 20, 30, 40, 50]
+        name (str): A name for the log.
+        path (str): A file path or stream to log to.
+        type (str): The type of log handler to use. One of ['file', 'stream'].
+        queue (Queue): An optional log queue to put log records on, instead of writing them.
+
+    Returns:
+        ctxtlogger (logging.Logger): A configured instance of the Logger class, enabled with the @contextmanager decorator.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    ctxtlogger: logging.Logger | None
+    handler: logging.Handler
+
+    ctxtlogger = logging.getLogger(name)
+
+    if queue is None:
+        queue = _LOG_QUEUE
+
+    if queue is not None:
+        ''' Leave formatting and I/O to the listener.'''
+        handler = QueueHandler(queue)
+    else:
+        handler = _build_handler(format, path, type)
+
     try:
-        handler.setFormatter(formatter)
         ctxtlogger.addHandler(handler)
         if level in [0, 10, 20, 30, 40, 50]:
             ctxtlogger.setLevel(level)
@@ -83,3 +136,45 @@ def getContextLogger(format: str = '%(asctime)s: %(name)s: %(levelname)s: %(mess
     finally:
         ctxtlogger.removeHandler(handler)
         ctxtlogger = None
+
+
+@contextmanager
+def getContextLogListener(format: str = '%(asctime)s: %(name)s: %(levelname)s: %(message)s',
+                          path: str = 'stdout',
+                          type: str = 'stream',
+                          queue=None,
+                          context=None):
+    '''
+    A function to run a QueueListener, which writes the log records of worker processes, with a Context Manager.
+
+    Workers log to the yielded queue with getContextLogger(queue=...), or after set_log_queue(), so that one
+    thread in the parent formats and writes every record, and workers don't contend for the stream or file.
+
+    Args:
+        format (str): The format string to use for log entries.
+        path (str): A file path or stream to log to.
+        type (str): The type of log handler to use. One of ['file', 'stream'].
+        queue (Queue): An optional log queue, e.g. a Manager().Queue() to pass to Pool tasks, defaults to a new multiprocessing Queue.
+        context: An optional multiprocessing context to create the queue with, defaults to the multiprocessing module.
+
+    Returns:
+        queue (Queue): The log queue for worker processes to log to.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    handler = _build_handler(format, path, type)
+
+    if queue is None:
+        queue = (context or mp).Queue()
+
+    listener = QueueListener(queue, handler, respect_handler_level=True)
+    listener.start()
+
+    try:
+        yield queue
+
+    finally:
+        ''' Stopping the listener writes the records left on the queue.'''
+        listener.stop()
+        handler.close()
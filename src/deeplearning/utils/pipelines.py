@@ -1,11 +1,15 @@
 from ml_metadata.proto import metadata_store_pb2  # type: ignore
-from typing import Optional
+from tensorflow.core.framework import tensor_pb2  # type: ignore
+from typing import Optional, Union
 
 import logging
+import multiprocessing as mp
 import numpy  # type: ignore
 import os
+import struct
 import tensorflow as tf  # type: ignore
 import tfx.v1 as tfx  # type: ignore
+import zipfile
 
 
 logger = logging.getLogger(__name__)
@@ -15,7 +19,12 @@ def create_csv_pipeline(pipeline_name: str,
                         pipeline_root: str,
                         data_root: str,
                         enable_cache: bool = False,
-                        metadata_path: Optional[str] = None):
+                        metadata_path: Optional[str] = None,
+                        input_pattern: Optional[Union[str, dict]] = None,
+                        range_config: Optional[tfx.proto.RangeConfig] = None,
+                        output_config: Optional[tfx.proto.Output] = None,
+                        example_gen_workers: Optional[int] = None,
+                        beam_pipeline_args: Optional[list] = None):
     '''
     Builds a TFX pipeline from imported CSV data.
 
@@ -25,6 +34,12 @@ def create_csv_pipeline(pipeline_name: str,
         data_root: A string specifying the path of the CSV data source.
         enable_cache: A bool indicating whether pipeline caching should be enabled.
         metadata_path: A optional string specifying the location of the metadata store, relative to the pipeline root.
+        input_pattern: An optional file pattern relative to the data root, which may contain {SPAN} and {VERSION} specs, e.g. 'span-{SPAN}/version-{VERSION}/*',
+            or a dictionary of file patterns keyed by split name, e.g. {'train': 'train/*', 'eval': 'eval/*'}.
+        range_config: An optional tfx.proto.RangeConfig of the single span to ingest, as returned by create_range_config(start_span=...). Defaults to the latest span.
+        output_config: An optional tfx.proto.Output with a hash bucket split config, as returned by create_output_config(). Defaults to a 2:1 train/eval split.
+        example_gen_workers: An optional count of DirectRunner workers for ExampleGen, which has no effect on other runners.
+        beam_pipeline_args: An optional list of Beam pipeline arguments, as returned by create_beam_pipeline_args().
 
     Returns:
         A tfx.dsl.Pipeline, configured for tfx.components.CSVExampleGen input.
@@ -39,7 +54,13 @@ def create_csv_pipeline(pipeline_name: str,
     else:
         metadata_connection_config = tfx.orchestration.metadata.sqlite_metadata_connection_config(os.path.join(pipeline_root, 'metadata/metadata.db'))
 
-    example_gen = tfx.components.CsvExampleGen(input_base=data_root)
+    example_gen = _create_example_gen(component=tfx.components.CsvExampleGen,
+                                      data_root=data_root,
+                                      input_pattern=input_pattern,
+                                      range_config=range_config,
+                                      output_config=output_config,
+                                      example_gen_workers=example_gen_workers,
+                                      beam_pipeline_args=beam_pipeline_args)
     components.append(example_gen)
 
     try:
@@ -47,7 +68,8 @@ def create_csv_pipeline(pipeline_name: str,
                                 pipeline_root=pipeline_root,
                                 components=components,
                                 enable_cache=enable_cache,
-                                metadata_connection_config=metadata_connection_config)
+                                metadata_connection_config=metadata_connection_config,
+                                beam_pipeline_args=beam_pipeline_args)
     except Exception as e:
         logger.exception(e)
 
@@ -56,7 +78,13 @@ def create_tfr_pipeline(pipeline_name: str,
                         pipeline_root: str,
                         data_root: str,
                         enable_cache: bool = False,
-                        metadata_path: Optional[str] = None):
+                        metadata_path: Optional[str] = None,
+                        compression: Optional[str] = None,
+                        input_pattern: Optional[Union[str, dict]] = None,
+                        range_config: Optional[tfx.proto.RangeConfig] = None,
+                        output_config: Optional[tfx.proto.Output] = None,
+                        example_gen_workers: Optional[int] = None,
+                        beam_pipeline_args: Optional[list] = None):
     '''
     Builds a TFX pipeline from imported TF Records.
 
@@ -66,6 +94,13 @@ def create_tfr_pipeline(pipeline_name: str,
         data_root: A string specifying the path of the serialized (TF Record) data source.
         enable_cache: A bool indicating whether pipeline caching should be enabled.
         metadata_path: A optional string specifying the location of the metadata store, relative to the pipeline root.
+        compression: An optional string specifying the TFRecord compression type of the data source. One of [None, 'GZIP', 'ZLIB'].
+        input_pattern: An optional file pattern relative to the data root, which may contain {SPAN} and {VERSION} specs, e.g. 'span-{SPAN}/version-{VERSION}/*',
+            or a dictionary of file patterns keyed by split name, e.g. {'train': 'train/*', 'eval': 'eval/*'}.
+        range_config: An optional tfx.proto.RangeConfig of the single span to ingest, as returned by create_range_config(start_span=...). Defaults to the latest span.
+        output_config: An optional tfx.proto.Output with a hash bucket split config, as returned by create_output_config(). Defaults to a 2:1 train/eval split.
+        example_gen_workers: An optional count of DirectRunner workers for ExampleGen, which has no effect on other runners.
+        beam_pipeline_args: An optional list of Beam pipeline arguments, as returned by create_beam_pipeline_args().
 
     Returns:
         A tfx.dsl.Pipeline, configured for tfx.components.ImportExampleGen input.
@@ -80,24 +115,336 @@ def create_tfr_pipeline(pipeline_name: str,
     else:
         metadata_connection_config = tfx.orchestration.metadata.sqlite_metadata_connection_config(os.path.join(pipeline_root, 'metadata/metadata.db'))
 
-    example_gen = tfx.components.ImportExampleGen(input_base=data_root)
+    if input_pattern is None and compression is not None:
+        ''' ExampleGen detects the compression type from the file extension, so only read matching files.'''
+        input_pattern = f'*.{tfrecord_suffix(compression).split(".")[-1]}'
+
+    example_gen = _create_example_gen(component=tfx.components.ImportExampleGen,
+                                      data_root=data_root,
+                                      input_pattern=input_pattern,
+                                      range_config=range_config,
+                                      output_config=output_config,
+                                      example_gen_workers=example_gen_workers,
+                                      beam_pipeline_args=beam_pipeline_args)
+    components.append(example_gen)
+
+    try:
+        return _create_pipeline(pipeline_name=pipeline_name,
+                                pipeline_root=pipeline_root,
+                                components=components,
+                                enable_cache=enable_cache,
+                                metadata_connection_config=metadata_connection_config,
+                                beam_pipeline_args=beam_pipeline_args)
+    except Exception as e:
+        logger.exception(e)
+
+
+def create_training_pipeline(pipeline_name: str,
+                             pipeline_root: str,
+                             data_root: str,
+                             serving_model_dir: Optional[str] = None,
+                             enable_cache: bool = True,
+                             metadata_path: Optional[str] = None,
+                             compression: Optional[str] = None,
+                             input_pattern: Optional[Union[str, dict]] = None,
+                             range_config: Optional[tfx.proto.RangeConfig] = None,
+                             output_config: Optional[tfx.proto.Output] = None,
+                             example_gen_workers: Optional[int] = None,
+                             num_spans: Optional[int] = None,
+                             encoding: str = 'tensor',
+                             image_shape: tuple = (28, 28, 1),
+                             num_classes: int = 10,
+                             train_steps: int = 1000,
+                             eval_steps: int = 100,
+                             batch_size: int = 128,
+                             learning_rate: float = 1e-3,
+                             transform_module_file: Optional[str] = None,
+                             trainer_module_file: Optional[str] = None,
+                             beam_pipeline_args: Optional[list] = None):
+    '''
+    Builds a TFX training pipeline from imported TF Records of images, as written by serialize_image_data().
+
+    The pipeline runs ImportExampleGen, StatisticsGen, SchemaGen, Transform and a Trainer that fits a
+    SequentialConv2D model, followed by a Pusher when a serving model directory is given. Caching is
+    enabled by default, so re-runs with unchanged inputs and module files skip the completed stages.
+    The Transform and Trainer module files are separate, so a change to the trainer only re-runs the Trainer.
+
+    Args:
+        pipeline_name: A string specifying the pipeline's name.
+        pipeline_root: A string specifying the pipeline's root path.
+        data_root: A string specifying the path of the serialized (TF Record) data source.
+        serving_model_dir: An optional string specifying the path to push the trained model to.
+        enable_cache: A bool indicating whether pipeline caching should be enabled.
+        metadata_path: A optional string specifying the location of the metadata store, relative to the pipeline root.
+        compression: An optional string specifying the TFRecord compression type of the data source. One of [None, 'GZIP', 'ZLIB'].
+        input_pattern: An optional file pattern relative to the data root, which may contain {SPAN} and {VERSION} specs, e.g. 'span-{SPAN}/version-{VERSION}/*',
+            or a dictionary of file patterns keyed by split name, e.g. {'train': 'train/*', 'eval': 'eval/*'}.
+        range_config: An optional tfx.proto.RangeConfig of the single span to ingest, as returned by create_range_config(start_span=...). Defaults to the latest span.
+        output_config: An optional tfx.proto.Output with a hash bucket split config, as returned by create_output_config(). Defaults to a 2:1 train/eval split.
+        example_gen_workers: An optional count of DirectRunner workers for ExampleGen, which has no effect on other runners.
+        num_spans: An optional count of the latest spans to train on, resolved from the metadata store. Defaults to the ingested span only.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        image_shape: A (height, width, depth) tuple of the images.
+        num_classes: Integer count of classifications or categories.
+        train_steps: Integer count of training steps.
+        eval_steps: Integer count of evaluation steps.
+        batch_size: Integer count of records per training batch.
+        learning_rate: Float learning rate of the optimizer.
+        transform_module_file: An optional path to a module file defining preprocessing_fn(), defaults to deeplearning.utils.transform.
+        trainer_module_file: An optional path to a module file defining run_fn(), defaults to deeplearning.utils.trainer.
+        beam_pipeline_args: An optional list of Beam pipeline arguments, as returned by create_beam_pipeline_args().
+
+    Returns:
+        A tfx.dsl.Pipeline, configured for training from tfx.components.ImportExampleGen input.
+
+    Raises:
+        e (Exception): If the encoding is not supported, or any unhandled exception, as necessary.
+    '''
+    _check_encoding(encoding)
+
+    components: list = []
+
+    if metadata_path is not None:
+        metadata_connection_config = tfx.orchestration.metadata.sqlite_metadata_connection_config(metadata_path)
+    else:
+        metadata_connection_config = tfx.orchestration.metadata.sqlite_metadata_connection_config(os.path.join(pipeline_root, 'metadata/metadata.db'))
+
+    custom_config: dict = {
+        'encoding': encoding,
+        'image_shape': list(image_shape),
+        'num_classes': num_classes,
+        'batch_size': batch_size,
+        'learning_rate': learning_rate
+    }
+
+    if input_pattern is None and compression is not None:
+        ''' ExampleGen detects the compression type from the file extension, so only read matching files.'''
+        input_pattern = f'*.{tfrecord_suffix(compression).split(".")[-1]}'
+
+    example_gen = _create_example_gen(component=tfx.components.ImportExampleGen,
+                                      data_root=data_root,
+                                      input_pattern=input_pattern,
+                                      range_config=range_config,
+                                      output_config=output_config,
+                                      example_gen_workers=example_gen_workers,
+                                      beam_pipeline_args=beam_pipeline_args)
     components.append(example_gen)
 
+    statistics_gen = tfx.components.StatisticsGen(examples=example_gen.outputs['examples'])
+    components.append(statistics_gen)
+
+    schema_gen = tfx.components.SchemaGen(statistics=statistics_gen.outputs['statistics'], infer_feature_shape=True)
+    components.append(schema_gen)
+
+    examples = example_gen.outputs['examples']
+    if num_spans is not None:
+        ''' Train on the latest spans, reusing the examples of earlier spans from the metadata store.'''
+        span_resolver = tfx.dsl.Resolver(
+            strategy_class=tfx.dsl.experimental.SpanRangeStrategy,
+            config={'range_config': create_range_config(num_spans=num_spans)},
+            examples=tfx.dsl.Channel(type=tfx.types.standard_artifacts.Examples, producer_component_id=example_gen.id)).with_id('span_resolver')
+        components.append(span_resolver)
+        examples = span_resolver.outputs['examples']
+
+    transform = tfx.components.Transform(examples=examples,
+                                         schema=schema_gen.outputs['schema'],
+                                         module_file=transform_module_file or os.path.join(os.path.dirname(__file__), 'transform.py'),
+                                         custom_config=custom_config)
+    components.append(transform)
+
+    trainer = tfx.components.Trainer(module_file=trainer_module_file or os.path.join(os.path.dirname(__file__), 'trainer.py'),
+                                     examples=transform.outputs['transformed_examples'],
+                                     transform_graph=transform.outputs['transform_graph'],
+                                     schema=schema_gen.outputs['schema'],
+                                     train_args=tfx.proto.TrainArgs(num_steps=train_steps),
+                                     eval_args=tfx.proto.EvalArgs(num_steps=eval_steps),
+                                     custom_config=custom_config)
+    components.append(trainer)
+
+    if serving_model_dir is not None:
+        pusher = tfx.components.Pusher(model=trainer.outputs['model'],
+                                       push_destination=tfx.proto.PushDestination(
+                                           filesystem=tfx.proto.PushDestination.Filesystem(base_directory=serving_model_dir)))
+        components.append(pusher)
+
     try:
         return _create_pipeline(pipeline_name=pipeline_name,
                                 pipeline_root=pipeline_root,
                                 components=components,
                                 enable_cache=enable_cache,
-                                metadata_connection_config=metadata_connection_config)
+                                metadata_connection_config=metadata_connection_config,
+                                beam_pipeline_args=beam_pipeline_args)
     except Exception as e:
         logger.exception(e)
 
 
+def _create_example_gen(component,
+                        data_root: str,
+                        input_pattern: Optional[Union[str, dict]] = None,
+                        range_config: Optional[tfx.proto.RangeConfig] = None,
+                        output_config: Optional[tfx.proto.Output] = None,
+                        example_gen_workers: Optional[int] = None,
+                        beam_pipeline_args: Optional[list] = None):
+    '''
+    Builds a file-based ExampleGen component.
+
+    A count of ExampleGen workers sets the component's DirectRunner parallelism, in place of the pipeline's
+    --direct_num_workers argument, and keeps the pipeline's other Beam arguments. It has no effect on other
+    runners, e.g. Dataflow, and doesn't set the count of output files, which the Beam runner chooses.
+
+    Args:
+        component: The ExampleGen component class, e.g. tfx.components.CsvExampleGen or tfx.components.ImportExampleGen.
+        data_root: A string specifying the path of the data source.
+        input_pattern: An optional file pattern relative to the data root, or a dictionary of file patterns keyed by split name.
+        range_config: An optional tfx.proto.RangeConfig of the single span to ingest, as a static range.
+        output_config: An optional tfx.proto.Output with a hash bucket split config.
+        example_gen_workers: An optional count of DirectRunner workers for the component.
+        beam_pipeline_args: An optional list of the pipeline's Beam pipeline arguments.
+
+    Returns:
+        An ExampleGen component.
+
+    Raises:
+        e (Exception): If an output split config is combined with multiple input splits, the range config isn't a single span, or example_gen_workers is not positive.
+    '''
+    try:
+        if isinstance(input_pattern, dict) and len(input_pattern) > 1 and output_config is not None:
+            raise ValueError('An output split config requires a single input pattern, input splits are kept as output splits.')
+        static_range = range_config.static_range if range_config is not None and range_config.HasField('static_range') else None
+        if range_config is not None and (static_range is None or static_range.start_span_number != static_range.end_span_number):
+            raise ValueError(f'ExampleGen only ingests a single span as a static range, got {range_config}. Span ranges are supported by create_training_pipeline(num_spans=...).')
+        if example_gen_workers is not None and example_gen_workers < 1:
+            raise ValueError(f'ExampleGen worker count must be at least 1, got {example_gen_workers}.')
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+    example_gen = component(input_base=data_root,
+                            input_config=_create_input_config(input_pattern),
+                            output_config=output_config,
+                            range_config=range_config)
+
+    if example_gen_workers is not None:
+        ''' Component Beam arguments replace the pipeline's, so carry the others over.'''
+        args = [arg for arg in beam_pipeline_args or [] if not arg.startswith('--direct_num_workers=')]
+        example_gen = example_gen.with_beam_pipeline_args(args + [f'--direct_num_workers={example_gen_workers}'])
+
+    return example_gen
+
+
+def _create_input_config(input_pattern: Optional[Union[str, dict]] = None):
+    '''
+    Builds an ExampleGen input config from one or more file patterns.
+
+    Args:
+        input_pattern: An optional file pattern relative to the data root, or a dictionary of file patterns keyed by split name.
+            Patterns may contain {SPAN} and {VERSION} specs.
+
+    Returns:
+        A tfx.proto.Input with a split per pattern, defaults to a single split of the files in the data root that aren't hidden,
+            e.g. checksum sidecars.
+    '''
+    if input_pattern is None:
+        input_pattern = '[!.]*'
+    if isinstance(input_pattern, str):
+        input_pattern = {'single_split': input_pattern}
+    return tfx.proto.Input(splits=[tfx.proto.Input.Split(name=name, pattern=pattern) for name, pattern in input_pattern.items()])
+
+
+def create_output_config(splits: Optional[dict] = None, partition_feature_name: Optional[str] = None):
+    '''
+    Builds an ExampleGen output config that splits examples into hash buckets.
+
+    Examples are assigned to buckets by a hash of the whole record, or of a partition feature to
+    keep related examples in the same split. Each split gets the given number of buckets, so
+    {'train': 8, 'eval': 2} is an 80/20 split.
+
+    Args:
+        splits: An optional dictionary of hash bucket counts keyed by split name. Defaults to {'train': 2, 'eval': 1}.
+        partition_feature_name: An optional name of the feature to hash, instead of the whole record.
+
+    Returns:
+        A tfx.proto.Output.
+
+    Raises:
+        e (Exception): If there are no splits, or a split has no hash buckets.
+    '''
+    splits = {'train': 2, 'eval': 1} if splits is None else splits
+
+    try:
+        if not splits:
+            raise ValueError('Output split config requires at least one split.')
+        for name, buckets in splits.items():
+            if buckets < 1:
+                raise ValueError(f'Output split {name} must have at least one hash bucket, got {buckets}.')
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+    split_config = tfx.proto.SplitConfig(splits=[tfx.proto.SplitConfig.Split(name=name, hash_buckets=buckets) for name, buckets in splits.items()])
+    if partition_feature_name is not None:
+        split_config.partition_feature_name = partition_feature_name
+    return tfx.proto.Output(split_config=split_config)
+
+
+def create_range_config(start_span: Optional[int] = None, end_span: Optional[int] = None, num_spans: Optional[int] = None):
+    '''
+    Builds a range config of input spans, for ExampleGen ingestion or span resolution.
+
+    A static range selects the spans from start_span to end_span inclusive, and a rolling range selects
+    the latest num_spans spans. ExampleGen only ingests a single span, so the range_config of the pipeline
+    builders must be a static range with start_span alone, e.g. to re-ingest a specific span. Multi-span and
+    rolling ranges are only supported for span resolution, e.g. by a tfx.dsl.experimental.SpanRangeStrategy resolver.
+
+    Args:
+        start_span: An optional integer of the first span of a static range.
+        end_span: An optional integer of the last span of a static range, defaults to start_span.
+        num_spans: An optional integer count of the latest spans in a rolling range.
+
+    Returns:
+        A tfx.proto.RangeConfig.
+
+    Raises:
+        e (Exception): If neither or both of start_span and num_spans are set, or the range is empty.
+    '''
+    try:
+        if (start_span is None) == (num_spans is None):
+            raise ValueError('Exactly one of start_span or num_spans must be set for a span range.')
+        if start_span is not None:
+            end_span = start_span if end_span is None else end_span
+            if end_span < start_span:
+                raise ValueError(f'Span range end {end_span} is before its start {start_span}.')
+            return tfx.proto.RangeConfig(static_range=tfx.proto.StaticRange(start_span_number=start_span, end_span_number=end_span))
+        if num_spans is not None and num_spans < 1:
+            raise ValueError(f'Rolling span range must include at least one span, got {num_spans}.')
+        return tfx.proto.RangeConfig(rolling_range=tfx.proto.RollingRange(num_spans=num_spans))
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def create_beam_pipeline_args(config: Optional[dict] = None):
+    '''
+    Builds Beam pipeline arguments from the pipelines.beam section of the Config() class.
+
+    With the default configuration, Beam runs pipeline components such as ExampleGen on one
+    DirectRunner worker per CPU core, in separate processes, instead of a single in-process worker.
+
+    Args:
+        config: A dictionary of Beam pipeline options, e.g. {'direct_num_workers': 0, 'direct_running_mode': 'multi_processing'}.
+
+    Returns:
+        beam_pipeline_args: A list of Beam pipeline arguments, e.g. ['--direct_num_workers=0', '--direct_running_mode=multi_processing'].
+    '''
+    return [f'--{key}={value}' for key, value in (config or {}).items() if value is not None]
+
+
 def _create_pipeline(pipeline_name: str,
                      pipeline_root: str,
                      components: list,
                      enable_cache: bool,
-                     metadata_connection_config: metadata_store_pb2.ConnectionConfig = None):
+                     metadata_connection_config: metadata_store_pb2.ConnectionConfig = None,
+                     beam_pipeline_args: Optional[list] = None):
     '''
     Build a TFX pipeline.
 
@@ -107,6 +454,7 @@ def _create_pipeline(pipeline_name: str,
         components: A list of TFX components to add to the pipeline, can be empty.
         enable_cache: A bool indicating whether pipeline caching should be enabled.
         metadata_connection_config: A ConnectionConfig object specifying the metadata store connection.
+        beam_pipeline_args: An optional list of Beam pipeline arguments for Beam-based components.
 
     Returns:
         A tfx.dsl.Pipeline, configured with the components supplied in the components list.
@@ -120,7 +468,8 @@ def _create_pipeline(pipeline_name: str,
             pipeline_root=pipeline_root,
             components=components,
             enable_cache=enable_cache,
-            metadata_connection_config=metadata_connection_config)
+            metadata_connection_config=metadata_connection_config,
+            beam_pipeline_args=beam_pipeline_args)
     except Exception as e:
         logger.exception(e)
 
@@ -179,22 +528,669 @@ def serialize_array(array):
     return array
 
 
-def serialize_image_data(image: numpy.array, label: numpy.array):
+def _check_encoding(encoding: str):
+    '''
+    Validates an image record encoding.
+
+    Args:
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): If the encoding is not supported.
+    '''
+    if encoding not in ['raw', 'tensor']:
+        try:
+            raise ValueError(f'Unsupported image record encoding {encoding}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+
+def serialize_image_data(image: numpy.array, label: numpy.array, encoding: str = 'tensor'):
     '''
     Serializes images and labels to tf.train.Example format.
 
+    The 'tensor' encoding stores the image and label as serialized tensors of any dtype, usually
+    normalized float32 images and one-hot float32 labels. The 'raw' encoding stores uint8 pixel
+    bytes and an int64 class id, leaving normalization and one-hot encoding to decode_image_batch().
+
     Args:
         image: An image tensor, as numpy.array of bytes.
-        label: A categorical label, as a numpy.array of binary byte values.
+        label: A categorical label, as a numpy.array of binary byte values, or an integer class id for the 'raw' encoding.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
 
     Returns:
         A tf.train.Example object containing a tf.train.Features record.
+
+    Raises:
+        e (Exception): If the encoding is not supported, or the image is not uint8 for the 'raw' encoding.
     '''
+    _check_encoding(encoding)
+
+    if encoding == 'raw':
+        if image.dtype != numpy.uint8:
+            try:
+                raise ValueError(f'Unsupported image dtype {image.dtype} for raw encoding, expected uint8.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+        raw_image = _bytes_feature(numpy.ascontiguousarray(image).tobytes())
+        raw_label = _int64_feature(int(label))
+    else:
+        raw_image = _bytes_feature(serialize_array(image))
+        raw_label = _bytes_feature(serialize_array(label))
+
     record = {
         'height': _int64_feature(value=image.shape[0]),
         'width': _int64_feature(value=image.shape[1]),
         'depth': _int64_feature(value=image.shape[2]),
-        'raw_image': _bytes_feature(serialize_array(image)),
-        'label': _bytes_feature(serialize_array(label))
+        'raw_image': raw_image,
+        'label': raw_label
     }
     return tf.train.Example(features=tf.train.Features(feature=record))
+
+
+def _decode_tensor_content(serialized: tf.Tensor, dtype: tf.DType, elements):
+    '''
+    Decodes a batch of serialized tensors of a common dtype and shape, as written by serialize_array().
+
+    Equivalent to tf.io.parse_tensor() on each element, but vectorized: the raw tensor content is
+    the fixed-length tail of each serialized tensor, so it can be sliced and decoded for the whole batch at once.
+
+    Args:
+        serialized: A 1-D string tensor of serialized tensors.
+        dtype: The tf.DType of the serialized tensors.
+        elements: The number of elements in each serialized tensor.
+
+    Returns:
+        A tensor of shape (records, elements) and type dtype.
+    '''
+    length = tf.cast(elements, tf.int32) * dtype.size
+    start = tf.strings.length(serialized) - length
+    return tf.io.decode_raw(tf.strings.substr(serialized, start, tf.ones_like(start) * length), dtype)
+
+
+def decode_image_batch(serialized: tf.Tensor, num_classes: int, encoding: str = 'tensor', image_shape: Optional[tuple] = None):
+    '''
+    Decodes a batch of serialized image records, as written by serialize_image_data().
+
+    Records in the 'tensor' encoding are expected to hold float32 images and one-hot labels, which
+    are returned as stored. Records in the 'raw' encoding are normalized to scale [0,1] and their
+    class ids are one-hot encoded, so both encodings decode to the same tensors.
+
+    Args:
+        serialized: A 1-D string tensor of serialized tf.train.Example records with a common image shape.
+        num_classes: Integer count of classifications or categories.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        image_shape: An optional (height, width, depth) tuple, to give the images a static shape.
+
+    Returns:
+        A tuple of float32 image tensor (records, height, width, depth) and float32 one-hot label tensor (records, classes).
+
+    Raises:
+        e (Exception): If the encoding is not supported.
+    '''
+    _check_encoding(encoding)
+
+    spec = {
+        'height': tf.io.FixedLenFeature([], tf.int64),
+        'width': tf.io.FixedLenFeature([], tf.int64),
+        'depth': tf.io.FixedLenFeature([], tf.int64),
+        'raw_image': tf.io.FixedLenFeature([], tf.string),
+        'label': tf.io.FixedLenFeature([], tf.int64 if encoding == 'raw' else tf.string)
+    }
+    features = tf.io.parse_example(serialized, spec)
+
+    if image_shape is not None:
+        shape = [-1, *image_shape]
+        elements = numpy.prod(image_shape)
+    else:
+        shape = tf.stack([-1, features['height'][0], features['width'][0], features['depth'][0]])
+        elements = features['height'][0] * features['width'][0] * features['depth'][0]
+
+    if encoding == 'raw':
+        images = tf.cast(tf.reshape(tf.io.decode_raw(features['raw_image'], tf.uint8), shape), tf.float32) / 255.0
+        labels = tf.one_hot(features['label'], num_classes)
+    else:
+        images = tf.reshape(_decode_tensor_content(features['raw_image'], tf.float32, elements), shape)
+        labels = tf.reshape(_decode_tensor_content(features['label'], tf.float32, num_classes), [-1, num_classes])
+
+    return images, labels
+
+
+def _varint(value: int):
+    '''
+    Encodes a non-negative integer in protocol buffer base 128 varint format.
+
+    Args:
+        value: A non-negative integer.
+
+    Returns:
+        A bytes object containing the encoded integer.
+    '''
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _length_delimited(field: int, length: int):
+    '''
+    Encodes the tag and length of a length-delimited protocol buffer field.
+
+    Args:
+        field: The protocol buffer field number.
+        length: The length in bytes of the field payload.
+
+    Returns:
+        A bytes object containing the field tag and payload length.
+    '''
+    return _varint((field << 3) | 2) + _varint(length)
+
+
+def _bytes_entry_prefix(key: str, length: int):
+    '''
+    Encodes everything that precedes the payload of a bytes feature in a serialized tf.train.Features map.
+
+    Args:
+        key: The feature name.
+        length: The length in bytes of the feature payload.
+
+    Returns:
+        A bytes object that, followed by a payload of the given length, is a complete Features map entry.
+    '''
+    name = key.encode()
+    bytes_list = _length_delimited(1, length)
+    feature = _length_delimited(1, len(bytes_list) + length) + bytes_list
+    entry = _length_delimited(1, len(name)) + name + _length_delimited(2, len(feature) + length) + feature
+    return _length_delimited(1, len(entry) + length) + entry
+
+
+def _class_entry(class_id: int):
+    '''
+    Encodes the int64 'label' feature of a raw image record as a serialized tf.train.Features map entry.
+
+    Args:
+        class_id: An integer class id.
+
+    Returns:
+        A bytes object containing the map entry.
+    '''
+    return tf.train.Features(feature={'label': _int64_feature(class_id)}).SerializeToString()
+
+
+def _tensor_header(array: numpy.ndarray):
+    '''
+    Returns the serialized tensor header that serialize_array writes ahead of an array's raw bytes.
+
+    The header is encoded in Python rather than with a tensorflow op, so that the spawned shard
+    writers of write_sharded_tfrecords serialize records without running tensorflow ops.
+
+    Args:
+        array: A numeric tensor (numpy.ndarray) with native byte order.
+
+    Returns:
+        A bytes object shared by every serialized tensor of the same dtype and shape.
+
+    Raises:
+        e (Exception): If the array dtype is not serialized as raw tensor content.
+    '''
+    if array.dtype.kind not in 'biuf':
+        try:
+            raise ValueError(f'Unsupported array dtype {array.dtype} for batch serialization.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+    header = tensor_pb2.TensorProto(dtype=tf.as_dtype(array.dtype).as_datatype_enum,
+                                    tensor_shape=tf.TensorShape(array.shape).as_proto()).SerializeToString()
+    if array.nbytes > 0:
+        header += _length_delimited(4, array.nbytes)
+    return header
+
+
+def serialize_image_batch(images: numpy.ndarray, labels: numpy.ndarray, batch_size: int = 1024, encoding: str = 'tensor'):
+    '''
+    Serializes batches of images and labels to tf.train.Example records.
+
+    Records parse to the same Example as serialize_image_data(image, label, encoding), though their
+    bytes may differ, e.g. in field order. The shape features and tensor headers are encoded once per
+    batch and the records are assembled with vectorized numpy copies instead of per-record protocol
+    buffer construction.
+
+    Args:
+        images: An image tensor of shape (records, height, width, depth), as numpy.array.
+        labels: A label tensor with one row per image, as numpy.array, or a vector of integer class ids for the 'raw' encoding.
+        batch_size: The number of records to assemble per vectorized copy.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+
+    Returns:
+        A generator of serialized tf.train.Example records, ready for tf.io.TFRecordWriter.write().
+
+    Raises:
+        e (Exception): If the images and labels do not describe a batch of image records in the given encoding.
+    '''
+    _check_encoding(encoding)
+
+    images = numpy.ascontiguousarray(images, dtype=images.dtype.newbyteorder('='))
+    labels = numpy.ascontiguousarray(labels, dtype=labels.dtype.newbyteorder('='))
+
+    if images.ndim != 4 or labels.ndim < 1 or images.shape[0] != labels.shape[0]:
+        try:
+            raise ValueError(f'Unsupported batch shapes {images.shape} (images) and {labels.shape} (labels).')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    if encoding == 'raw' and (images.dtype != numpy.uint8 or labels.ndim != 1 or labels.dtype.kind not in 'iu'):
+        try:
+            raise ValueError(f'Unsupported batch dtypes {images.dtype} (images) and {labels.dtype} (labels) for raw encoding, expected uint8 and integer class ids.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    if images.shape[0] == 0:
+        return
+
+    ''' Encode everything except the raw image and label bytes once for the whole batch.'''
+    shape = tf.train.Features(feature={
+        'height': _int64_feature(value=images.shape[1]),
+        'width': _int64_feature(value=images.shape[2]),
+        'depth': _int64_feature(value=images.shape[3])
+    }).SerializeToString()
+
+    image_payload = b'' if encoding == 'raw' else _tensor_header(images[0])
+    image_bytes = images[0].nbytes
+    image_entry = _bytes_entry_prefix('raw_image', len(image_payload) + image_bytes) + image_payload
+
+    if encoding == 'raw':
+        ''' Class id entries vary in length, so each one is prepended with its own Features header.'''
+        label_bytes = 0
+        middle = numpy.empty(0, dtype=numpy.uint8)
+        label_heads: dict = {}
+        for class_id in numpy.unique(labels).tolist():
+            label_entry = _class_entry(class_id)
+            features_length = len(label_entry) + len(shape) + len(image_entry) + image_bytes
+            label_heads[class_id] = _length_delimited(1, features_length) + label_entry
+        head = numpy.frombuffer(shape + image_entry, dtype=numpy.uint8)
+    else:
+        label_payload = _tensor_header(labels[0])
+        label_bytes = labels[0].nbytes
+        label_entry = _bytes_entry_prefix('label', len(label_payload) + label_bytes) + label_payload
+        features_length = len(shape) + len(image_entry) + image_bytes + len(label_entry) + label_bytes
+        middle = numpy.frombuffer(label_entry, dtype=numpy.uint8)
+        head = numpy.frombuffer(_length_delimited(1, features_length) + shape + image_entry, dtype=numpy.uint8)
+
+    ''' Column offsets of each record segment.'''
+    image_start = head.size
+    middle_start = image_start + image_bytes
+    label_start = middle_start + middle.size
+    record_length = label_start + label_bytes
+
+    for start in range(0, images.shape[0], batch_size):
+        image_chunk = images[start:start + batch_size]
+        label_chunk = labels[start:start + batch_size]
+        count = image_chunk.shape[0]
+
+        buffer = numpy.empty((count, record_length), dtype=numpy.uint8)
+        buffer[:, :image_start] = head
+        buffer[:, image_start:middle_start] = image_chunk.reshape(count, -1).view(numpy.uint8)
+
+        if encoding == 'raw':
+            for class_id, record in zip(label_chunk.tolist(), buffer):
+                yield label_heads[class_id] + record.tobytes()
+        else:
+            buffer[:, middle_start:label_start] = middle
+            buffer[:, label_start:] = label_chunk.reshape(count, -1).view(numpy.uint8)
+
+            for record in buffer:
+                yield record.tobytes()
+
+
+def tfrecord_suffix(compression: Optional[str] = None):
+    '''
+    Returns the TFRecord file name suffix for a compression type.
+
+    Args:
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        suffix: A string specifying the file name suffix, as one of ['.tfrecord', '.tfrecord.gz', '.tfrecord.deflate'].
+
+    Raises:
+        e (Exception): If the compression type is not supported.
+    '''
+    suffixes = {None: '.tfrecord', 'GZIP': '.tfrecord.gz', 'ZLIB': '.tfrecord.deflate'}
+
+    if compression not in suffixes:
+        try:
+            raise ValueError(f'Unsupported TFRecord compression type {compression}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+    return suffixes[compression]
+
+
+def write_tfrecords(records, path: str, compression: Optional[str] = None):
+    '''
+    Writes serialized records to a TFRecord file, optionally compressed. Supports GCS destinations.
+
+    Compressed files should be named with the suffix returned by tfrecord_suffix(), so that
+    ExampleGen components can detect the compression type from the file extension.
+
+    Args:
+        records: An iterable of serialized records, as bytes.
+        path: A string specifying the path of the TFRecord file.
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        count: The number of records written.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    tfrecord_suffix(compression)
+
+    try:
+        count = 0
+        with tf.io.TFRecordWriter(path, options=tf.io.TFRecordOptions(compression_type=compression or '')) as writer:
+            for record in records:
+                writer.write(record)
+                count += 1
+        return count
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def _shard_path(dest: str, name: str, index: int, num_shards: int, compression: Optional[str] = None):
+    '''
+    Names a TFRecord shard after the pipeline.
+
+    Args:
+        dest: A string specifying filesystem or cloud storage destination.
+        name: A string specifying the pipeline name.
+        index: The zero-based index of the shard.
+        num_shards: The total number of shards.
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        A string specifying the shard path, as dest/name-00000-of-00010.tfrecord with a compression suffix.
+    '''
+    return os.path.join(dest, f'{name}-{index:05d}-of-{num_shards:05d}{tfrecord_suffix(compression)}')
+
+
+def _write_tfrecord_shard(path: str, images: numpy.ndarray, labels: numpy.ndarray, batch_size: int, encoding: str, compression: Optional[str]):
+    '''
+    Serializes images and labels to a single TFRecord file. Runs in a worker process.
+
+    Args:
+        path: A string specifying the path of the TFRecord file.
+        images: An image tensor of shape (records, height, width, depth), as numpy.array.
+        labels: A label tensor with one row per image, as numpy.array, or a vector of integer class ids for the 'raw' encoding.
+        batch_size: The number of records to assemble per vectorized copy.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        path: A string specifying the path of the TFRecord file.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    try:
+        write_tfrecords(serialize_image_batch(images, labels, batch_size=batch_size, encoding=encoding), path, compression=compression)
+        return path
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def write_sharded_tfrecords(images: numpy.ndarray,
+                            labels: numpy.ndarray,
+                            dest: str,
+                            name: str,
+                            num_shards: int,
+                            workers: Optional[int] = None,
+                            batch_size: int = 1024,
+                            encoding: str = 'tensor',
+                            compression: Optional[str] = None):
+    '''
+    Serializes images and labels to sharded TFRecord files using a pool of spawned worker processes.
+
+    Shards are named name-00000-of-000NN.tfrecord, plus a compression suffix, so that create_tfr_pipeline() or a file glob
+    can read them back as a single dataset.
+
+    Args:
+        images: An image tensor of shape (records, height, width, depth), as numpy.array.
+        labels: A label tensor with one row per image, as numpy.array, or a vector of integer class ids for the 'raw' encoding.
+        dest: A string specifying filesystem or cloud storage destination.
+        name: A string specifying the pipeline name.
+        num_shards: The number of TFRecord files to write.
+        workers: The number of worker processes. Defaults to the number of shards or CPUs, whichever is lower.
+        batch_size: The number of records to assemble per vectorized copy.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        paths: A list of strings specifying the shard locations, in shard order.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    tfrecord_suffix(compression)
+
+    if num_shards < 1 or images.shape[0] != labels.shape[0]:
+        try:
+            raise ValueError(f'Unsupported shard count {num_shards} for {images.shape[0]} images and {labels.shape[0]} labels.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    try:
+        tf.io.gfile.makedirs(dest)
+
+        shards = [(_shard_path(dest, name, index, num_shards, compression), image_shard, label_shard, batch_size, encoding, compression)
+                  for index, (image_shard, label_shard) in enumerate(zip(numpy.array_split(images, num_shards),
+                                                                         numpy.array_split(labels, num_shards)))]
+
+        ''' Workers write with tensorflow I/O, so spawn them rather than fork a process that has initialized tensorflow.'''
+        with mp.get_context('spawn').Pool(min(workers or os.cpu_count() or 1, num_shards)) as pool:
+            paths = pool.starmap(_write_tfrecord_shard, shards)
+
+        logger.info(f'Wrote {images.shape[0]} records to {num_shards} TFRecord shards in {dest}.')
+        return paths
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def _iter_npz_chunks(archive: zipfile.ZipFile, member: str, chunk_size: int):
+    '''
+    Streams an array from an npz archive in chunks of rows.
+
+    Uncompressed members are memory-mapped, so chunks are read from the page cache on demand.
+    Compressed members are decompressed incrementally, one chunk at a time.
+
+    Args:
+        archive: An open zipfile.ZipFile of an npz archive.
+        member: The name of the array in the archive, as in numpy.load(archive)[member].
+        chunk_size: The maximum number of rows per chunk.
+
+    Returns:
+        A generator of numpy.ndarray chunks, each with up to chunk_size rows.
+
+    Raises:
+        e (Exception): If the member can't be streamed by rows.
+    '''
+    info = archive.getinfo(f'{member}.npy')
+
+    with archive.open(info) as stream:
+        version = numpy.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = numpy.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = numpy.lib.format.read_array_header_2_0(stream)
+        header_size = stream.tell()
+
+        if fortran_order or dtype.hasobject or len(shape) == 0:
+            try:
+                raise ValueError(f'Unsupported array {member} for chunked reads, expected C-ordered rows.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+        if info.compress_type == zipfile.ZIP_STORED:
+            ''' Locate the member data after its local file header, and map it read-only.'''
+            with open(archive.filename, 'rb') as file:  # type: ignore[arg-type]
+                file.seek(info.header_offset)
+                local_header = file.read(30)
+            name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+            offset = info.header_offset + 30 + name_length + extra_length + header_size
+            array = numpy.memmap(archive.filename, dtype=dtype, mode='r', offset=offset, shape=shape)  # type: ignore[call-overload]
+
+            for start in range(0, shape[0], chunk_size):
+                yield array[start:start + chunk_size]
+
+        else:
+            row_bytes = int(numpy.prod(shape[1:], dtype=numpy.int64)) * dtype.itemsize
+
+            for start in range(0, shape[0], chunk_size):
+                rows = min(chunk_size, shape[0] - start)
+                yield numpy.frombuffer(stream.read(rows * row_bytes), dtype=dtype).reshape((rows,) + shape[1:])
+
+
+def convert_npz_to_tfrecords(source: str,
+                             dest: str,
+                             name: str,
+                             splits: Optional[dict] = None,
+                             num_classes: int = 10,
+                             chunk_size: int = 4096,
+                             encoding: str = 'tensor',
+                             compression: Optional[str] = None):
+    '''
+    Converts image arrays in an npz archive to TFRecord files, one chunk at a time.
+
+    Images and labels are streamed from the archive, then normalized and one-hot encoded (for the
+    'tensor' encoding) and serialized chunk by chunk, so peak memory is bounded by the chunk size
+    rather than the size of the dataset.
+
+    Args:
+        source: A string specifying the path of the npz archive.
+        dest: A string specifying filesystem or cloud storage destination.
+        name: A string specifying the pipeline name.
+        splits: A dict of split name to (images, labels) array names. Defaults to the keras mnist layout.
+        num_classes: Integer count of classifications or categories, used to one-hot encode 'tensor' labels.
+        chunk_size: The maximum number of records held in memory at once.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+
+    Returns:
+        paths: A list of strings specifying the TFRecord locations, as dest/name-split.tfrecord, in split order.
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _check_encoding(encoding)
+    suffix = tfrecord_suffix(compression)
+
+    if splits is None:
+        splits = {'train': ('x_train', 'y_train'), 'test': ('x_test', 'y_test')}
+
+    def _records(archive: zipfile.ZipFile, images_member: str, labels_member: str):
+        ''' Normalize and serialize one chunk of a split at a time.'''
+        for images, labels in zip(_iter_npz_chunks(archive, images_member, chunk_size),
+                                  _iter_npz_chunks(archive, labels_member, chunk_size)):
+            if images.ndim == 3:
+                images = numpy.expand_dims(images, -1)
+            if encoding == 'tensor':
+                images = images.astype('float32') / 255.0
+                labels = numpy.eye(num_classes, dtype='float32')[labels]
+            yield from serialize_image_batch(images, labels, batch_size=chunk_size, encoding=encoding)
+
+    try:
+        tf.io.gfile.makedirs(dest)
+        paths: list = []
+
+        with zipfile.ZipFile(source) as archive:
+            for split, (images_member, labels_member) in splits.items():
+                path = os.path.join(dest, f'{name}-{split}{suffix}')
+                count = write_tfrecords(_records(archive, images_member, labels_member), path, compression=compression)
+                logger.info(f'Converted {count} records from {source} arrays {images_member} and {labels_member} to {path}.')
+                paths.append(path)
+
+        return paths
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def load_image_dataset(pattern: str,
+                       batch_size: int,
+                       num_classes: int = 10,
+                       encoding: str = 'tensor',
+                       compression: Optional[str] = None,
+                       shuffle_buffer: int = 0,
+                       cache: bool | str = True,
+                       drop_remainder: bool = False):
+    '''
+    Builds a tf.data pipeline over TFRecord image files, as written by serialize_image_data().
+
+    Files are read in parallel with interleave(), serialized records are optionally cached and
+    shuffled, then whole batches are parsed and decoded with decode_image_batch() before an
+    autotuned prefetch. The result can be passed straight to keras.Model.fit().
+
+    Args:
+        pattern: A string specifying a file glob, e.g. dest/mnist-*.tfrecord. Supports GCS paths.
+        batch_size: The number of records per batch.
+        num_classes: Integer count of classifications or categories.
+        encoding: A string specifying the record encoding. One of ['raw', 'tensor'].
+        compression: A string specifying the TFRecord compression type. One of [None, 'GZIP', 'ZLIB'].
+        shuffle_buffer: The number of records to shuffle over. Disables shuffling if 0.
+        cache: A bool indicating whether to cache the serialized records in memory, or a string specifying a cache file path.
+        drop_remainder: A bool indicating whether to drop the last batch if it is smaller than batch_size.
+
+    Returns:
+        dataset: A tf.data.Dataset of (images, labels) batches, as float32 (batch, height, width, depth) and (batch, classes).
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    _check_encoding(encoding)
+    tfrecord_suffix(compression)
+
+    try:
+        files = sorted(tf.io.gfile.glob(pattern))
+        if not files:
+            raise FileNotFoundError(f'No TFRecord files match {pattern}.')
+
+        ''' Read the image shape from the first record, so batches have a static shape.'''
+        first = next(iter(tf.data.TFRecordDataset(files[0], compression_type=compression or '').take(1)))
+        feature = tf.train.Example.FromString(first.numpy()).features.feature
+        image_shape = tuple(feature[key].int64_list.value[0] for key in ['height', 'width', 'depth'])
+
+        dataset = tf.data.Dataset.from_tensor_slices(files)
+        dataset = dataset.interleave(lambda file: tf.data.TFRecordDataset(file, compression_type=compression or '', buffer_size=8 * 1024 * 1024),
+                                     cycle_length=min(len(files), os.cpu_count() or 1),
+                                     num_parallel_calls=tf.data.AUTOTUNE,
+                                     deterministic=shuffle_buffer == 0)
+
+        if cache:
+            dataset = dataset.cache(cache if isinstance(cache, str) else '')
+        if shuffle_buffer > 0:
+            dataset = dataset.shuffle(shuffle_buffer, reshuffle_each_iteration=True)
+
+        dataset = dataset.batch(batch_size, drop_remainder=drop_remainder)
+        dataset = dataset.map(lambda records: decode_image_batch(records, num_classes, encoding=encoding, image_shape=image_shape),
+                              num_parallel_calls=tf.data.AUTOTUNE,
+                              deterministic=shuffle_buffer == 0)
+
+        logger.info(f'Loaded image dataset from {len(files)} files matching {pattern} with image shape {image_shape}.')
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -1,9 +1,16 @@
+from collections import deque
+from contextlib2 import AbstractContextManager, contextmanager
 from deeplearning.utils.logger import getContextLogger
-from queue import Queue
+from multiprocessing import connection, shared_memory
+from multiprocessing.managers import SyncManager
+from queue import Empty, Queue
 from typing import Optional
 
 import logging
+import multiprocessing as mp
+import numpy  # type: ignore
 import os
+import time
 
 
 logger = logging.getLogger(__name__)
@@ -51,6 +58,128 @@ def enqueue(item: tuple, queue: Queue):
         raise e
 
 
+class BatchQueue(Queue):
+    '''
+    A queue with batch methods, so that a proxy to it from a BatchManager moves many items per round trip.
+    '''
+
+    def put_many(self, items: list, block: bool = True, timeout: Optional[float] = None):
+        '''
+        Puts a list of items on the queue in order, with one deadline for the whole batch.
+
+        Args:
+            items: A list of items to put.
+            block: Whether to wait for free slots in a bounded queue.
+            timeout: An optional count of seconds to wait for free slots, or None to wait indefinitely.
+
+        Returns:
+            None
+
+        Raises:
+            queue.Full: If no free slot is available by the deadline, with the earlier items put.
+        '''
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for item in items:
+            self.put(item, block=block, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def get_many(self, count: int, block: bool = True, timeout: Optional[float] = None):
+        '''
+        Gets up to count items from the queue, waiting only for the first.
+
+        Args:
+            count: An integer maximum count of items to get.
+            block: Whether to wait for the first item.
+            timeout: An optional count of seconds to wait for the first item, or None to wait indefinitely.
+
+        Returns:
+            items: A list of one to count items, in queue order.
+
+        Raises:
+            queue.Empty: If no item is available by the deadline.
+        '''
+        items = [self.get(block=block, timeout=timeout)]
+        with self.mutex:
+            while self._qsize() and len(items) < count:
+                items.append(self._get())
+            self.not_full.notify(len(items) - 1)
+        return items
+
+
+class BatchManager(SyncManager):
+    '''
+    A multiprocessing manager that also serves BatchQueue objects, e.g. with BatchManager() as manager: manager.BatchQueue().
+    '''
+
+
+BatchManager.register('BatchQueue', BatchQueue)
+
+
+def dequeue_many(queue: Queue, count: int, timeout: Optional[float] = 0):
+    '''
+    Batch dequeue wrapper.
+
+    Gets up to count items in one round trip from a BatchQueue or its BatchManager proxy, and one
+    item per round trip from other queues.
+
+    Args:
+        queue: A queue object from which to fetch.
+        count: An integer maximum count of items to fetch.
+        timeout: A count of seconds to wait for the first item, 0 not to wait, or None to wait indefinitely.
+
+    Returns:
+        results: A list of one to count dequeued (tuple) values.
+
+    Raises:
+        e (Exception): If no item is available in time (queue.Empty), or any unhandled exception.
+    '''
+    try:
+        block = timeout is None or timeout > 0
+        if hasattr(queue, 'get_many'):
+            return queue.get_many(count, block, timeout)
+
+        results = [queue.get(block=block, timeout=timeout)]
+        while len(results) < count:
+            try:
+                results.append(queue.get(block=False))
+            except Empty:
+                break
+        return results
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
+def enqueue_many(items: list, queue: Queue, timeout: Optional[float] = None):
+    '''
+    Batch enqueue wrapper.
+
+    Puts the items in one round trip to a BatchQueue or its BatchManager proxy, and one item per
+    round trip to other queues.
+
+    Args:
+        items: A list of tuples, each containing an item or collection of items to enqueue.
+        queue: A queue object to put the items on.
+        timeout: A count of seconds to wait for free slots in a bounded queue, or None to wait indefinitely.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): If a bounded queue has no free slot in time (queue.Full), or any unhandled exception.
+    '''
+    try:
+        if hasattr(queue, 'put_many'):
+            queue.put_many(list(items), True, timeout)
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for item in items:
+            queue.put(item, block=True, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+    except Exception as e:
+        logger.exception(e)
+        raise e
+
+
 def pid_logger(logname: str, queue: Optional[Queue] = None, loglevel: int = logging.INFO):
     '''
     Within the context of a logger to document the experiment,
@@ -78,3 +207,269 @@ def pid_logger(logname: str, queue: Optional[Queue] = None, loglevel: int = logg
     except Exception as e:
         logger.exception(e)
         raise e
+
+
+def _run_worker(target, args: tuple, kwargs: dict, writer, initializer=None, initargs: tuple = ()):
+    '''
+    Runs a WorkerPool target in a worker process, and sends its result or exception to the parent.
+
+    Args:
+        target: A callable to run.
+        args: A tuple of positional arguments of the target.
+        kwargs: A dictionary of keyword arguments of the target.
+        writer: A multiprocessing Connection to send the ('result', value) or ('error', exception) tuple on.
+        initializer: An optional callable to run before the target, e.g. set_log_queue.
+        initargs: A tuple of positional arguments of the initializer.
+
+    Returns:
+        None
+    '''
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+        message = ('result', target(*args, **kwargs))
+    except Exception as e:
+        message = ('error', e)
+
+    try:
+        writer.send(message)
+    except Exception as e:
+        ''' Send a picklable error if the result or exception can't be pickled.'''
+        writer.send(('error', RuntimeError(f'Failed to send the {message[0]} of {getattr(target, "__name__", target)}: {e}')))
+    finally:
+        writer.close()
+
+
+class WorkerPool(AbstractContextManager):
+    '''
+    A pool of worker processes running one item of work each, with at most a fixed count running at once.
+
+    The parent blocks in multiprocessing.connection.wait() on the result pipes and process sentinels of the
+    running workers, rather than polling their exit codes, and starts queued work as soon as a worker finishes.
+    Results are collected in completion order. Workers that raise have their exception raised in the parent,
+    and workers that exit without a result raise a ChildProcessError. Running workers are terminated if the
+    context exits with an exception.
+    '''
+
+    def __init__(self, workers: int, context=None, initializer=None, initargs: tuple = ()):
+        '''
+        Args:
+            workers: An integer count of worker processes to run at once.
+            context: An optional multiprocessing context, e.g. multiprocessing.get_context('spawn'), defaults to the multiprocessing module.
+            initializer: An optional callable to run in each worker process before its target, like a Pool initializer.
+            initargs: A tuple of positional arguments of the initializer.
+
+        Raises:
+            e (Exception): If the count of workers is less than 1.
+        '''
+        if workers < 1:
+            try:
+                raise ValueError(f'Worker count must be at least 1, got {workers}.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+
+        self.workers = workers
+        self.context = context or mp
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pending: deque = deque()
+        self._running: dict = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        for process, reader in list(self._running.values()):
+            if exc_type is not None and process.is_alive():
+                process.terminate()
+                logger.warning(f'Terminated process {process.name} with PID {process.pid}.')
+            process.join()
+            reader.close()
+        self._running.clear()
+        self._pending.clear()
+
+    def submit(self, target, *args, **kwargs):
+        '''
+        Queues an item of work, started when a worker is free while results are collected.
+
+        Args:
+            target: A picklable callable to run in a worker process.
+            args: Positional arguments of the target.
+            kwargs: Keyword arguments of the target.
+
+        Returns:
+            None
+        '''
+        self._pending.append((target, args, kwargs))
+
+    def _start(self):
+        target, args, kwargs = self._pending.popleft()
+        reader, writer = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=_run_worker, args=(target, args, kwargs, writer, self.initializer, self.initargs))
+        process.start()
+        ''' Close the parent's copy of the writer, so the reader sees EOF if the worker dies.'''
+        writer.close()
+        self._running[process.sentinel] = (process, reader)
+        logger.info(f'Started process {process.name} with PID {process.pid}.')
+
+    def _finish(self, sentinel: int):
+        process, reader = self._running.pop(sentinel)
+        try:
+            message = reader.recv() if reader.poll() else None
+        except EOFError:
+            message = None
+        finally:
+            reader.close()
+        process.join()
+        logger.info(f'Finished process {process.name} with PID {process.pid}.')
+
+        if message is None:
+            try:
+                raise ChildProcessError(f'Process {process.name} exited with code {process.exitcode} without a result.')
+            except Exception as e:
+                logger.exception(e)
+                raise e
+        if message[0] == 'error':
+            logger.error(f'Process {process.name} raised {message[1]!r}.')
+            raise message[1]
+        return message[1]
+
+    def results(self):
+        '''
+        Runs the queued work and yields the results in completion order.
+
+        Returns:
+            results: A generator of the return values of the targets.
+
+        Raises:
+            e (Exception): The exception raised by a target, or a ChildProcessError if a worker exits without a result.
+        '''
+        while self._pending or self._running:
+            while self._pending and len(self._running) < self.workers:
+                self._start()
+
+            readers = {reader: sentinel for sentinel, (_, reader) in self._running.items()}
+            ''' A worker's result pipe is ready before it exits, and reading it lets a worker with a large result exit.'''
+            for ready in connection.wait(list(readers) + list(self._running)):
+                sentinel = readers.get(ready, ready)
+                if sentinel in self._running:
+                    yield self._finish(sentinel)
+
+    def map(self, target, args_list: list):
+        '''
+        Runs a target for each tuple of arguments, and yields the results in completion order.
+
+        Args:
+            target: A picklable callable to run in worker processes.
+            args_list: A list of tuples of positional arguments of the target.
+
+        Returns:
+            results: A generator of the return values of the targets.
+        '''
+        for args in args_list:
+            self.submit(target, *args)
+        yield from self.results()
+
+
+class SharedArrays(AbstractContextManager):
+    '''
+    Copies numpy arrays into shared memory blocks once, for worker processes to attach zero-copy read-only views by name.
+
+    Pass the picklable specs to workers, and attach them with getContextSharedArrays(). The blocks are
+    unlinked when the context exits, even with an exception, and the multiprocessing resource tracker
+    unlinks them if the owning process dies before then.
+    '''
+
+    def __init__(self, arrays: dict):
+        '''
+        Args:
+            arrays: A dictionary of numpy arrays to share, keyed by name.
+        '''
+        self._blocks: list = []
+        self.specs: dict = {}
+        self.arrays: dict = {}
+
+        try:
+            for key, array in arrays.items():
+                array = numpy.ascontiguousarray(array)
+                ''' Zero-size blocks aren't allowed, so empty arrays take one byte.'''
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.specs[key] = (block.name, array.shape, array.dtype.str)
+                self.arrays[key] = numpy.ndarray(array.shape, dtype=array.dtype, buffer=block.buf.toreadonly())
+            logger.info(f'Shared {len(self.specs)} arrays in {sum(block.size for block in self._blocks)} bytes of shared memory.')
+        except Exception as e:
+            self.__exit__(type(e), e, None)
+            logger.exception(e)
+            raise e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.arrays.clear()
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:
+                ''' Views still held by the caller keep the mapping open until they're released.'''
+                logger.debug(f'Shared memory block {block.name} still has views, leaving it mapped.')
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+
+def _attach_shared_memory(name: str):
+    '''
+    Attaches an existing shared memory block without registering it with this process's resource tracker.
+
+    Args:
+        name: A string specifying the shared memory block name.
+
+    Returns:
+        block: A multiprocessing.shared_memory.SharedMemory.
+    '''
+    try:
+        ''' Python 3.13 and later, so a worker's tracker doesn't unlink blocks the parent owns.'''
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+@contextmanager
+def getContextSharedArrays(specs: dict):
+    '''
+    A function to attach zero-copy read-only views of shared arrays with a Context Manager, e.g. in a worker process.
+
+    Args:
+        specs (dict): The specs of a SharedArrays object, keyed by array name.
+
+    Returns:
+        arrays (dict): A dictionary of read-only numpy arrays, keyed by name.
+
+    Raises:
+        e (Exception): If a shared memory block doesn't exist, or any unhandled exception.
+    '''
+    blocks: list = []
+    arrays: dict = {}
+
+    try:
+        for key, (name, shape, dtype) in specs.items():
+            block = _attach_shared_memory(name)
+            blocks.append(block)
+            arrays[key] = numpy.ndarray(shape, dtype=numpy.dtype(dtype), buffer=block.buf.toreadonly())
+        yield arrays
+    except Exception as e:
+        logger.exception(e)
+        raise e
+    finally:
+        arrays.clear()
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                logger.debug(f'Shared memory block {block.name} still has views, leaving it mapped.')
@@ -0,0 +1,125 @@
+from deeplearning.models.seq_conv_2d import SequentialConv2D
+from deeplearning.utils.transform import IMAGE_KEY, LABEL_KEY
+from tfx_bsl.public import tfxio  # type: ignore
+
+import keras  # type: ignore
+import logging
+import tensorflow as tf  # type: ignore
+import tensorflow_transform as tft  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+def _input_fn(file_pattern: list,
+              data_accessor,
+              tf_transform_output: tft.TFTransformOutput,
+              image_shape: tuple,
+              batch_size: int):
+    '''
+    Builds a batched dataset of transformed images and labels for training or evaluation.
+
+    Args:
+        file_pattern: A list of file patterns of the transformed examples.
+        data_accessor: A tfx.components.DataAccessor, as supplied to run_fn().
+        tf_transform_output: A tft.TFTransformOutput wrapping the Transform graph.
+        image_shape: A (height, width, depth) tuple of the model input.
+        batch_size: Integer count of records per batch.
+
+    Returns:
+        A repeating tf.data.Dataset of (images, labels) batches.
+    '''
+    dataset = data_accessor.tf_dataset_factory(
+        file_pattern,
+        tfxio.TensorFlowDatasetOptions(batch_size=batch_size, label_key=LABEL_KEY),
+        tf_transform_output.transformed_metadata.schema)
+
+    return dataset.map(lambda features, labels: (tf.reshape(features[IMAGE_KEY], [-1, *image_shape]), labels),
+                       num_parallel_calls=tf.data.AUTOTUNE)
+
+
+def _build_model(image_shape: tuple, num_classes: int, learning_rate: float):
+    '''
+    Builds and compiles a SequentialConv2D model for integer class id labels.
+
+    Args:
+        image_shape: A (height, width, depth) tuple of the model input.
+        num_classes: Integer count of classifications or categories.
+        learning_rate: Float learning rate of the Adam optimizer.
+
+    Returns:
+        model: A compiled SequentialConv2D model.
+    '''
+    model = SequentialConv2D(input_shape=image_shape, num_classes=num_classes)
+    model.compile(loss=keras.losses.SparseCategoricalCrossentropy(),
+                  optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+                  metrics=[keras.metrics.SparseCategoricalAccuracy(name='sparse_categorical_accuracy')])
+    return model
+
+
+def _serving_signature(model, tf_transform_output: tft.TFTransformOutput):
+    '''
+    Builds a serving function that applies the Transform graph to serialized examples before the model.
+
+    Args:
+        model: A trained keras model.
+        tf_transform_output: A tft.TFTransformOutput wrapping the Transform graph.
+
+    Returns:
+        A concrete tf.function accepting a 1-D string tensor of serialized tf.train.Example records.
+    '''
+    model.tft_layer = tf_transform_output.transform_features_layer()
+
+    @tf.function(input_signature=[tf.TensorSpec(shape=[None], dtype=tf.string, name='examples')])
+    def serve_tf_examples_fn(serialized):
+        feature_spec = tf_transform_output.raw_feature_spec()
+        feature_spec.pop(LABEL_KEY)
+        features = model.tft_layer(tf.io.parse_example(serialized, feature_spec))
+        return model(tf.reshape(features[IMAGE_KEY], [-1, *model.input_shape[1:]]))
+
+    return serve_tf_examples_fn.get_concrete_function()
+
+
+def run_fn(fn_args):
+    '''
+    TFX Trainer entry point: trains a SequentialConv2D model on the transformed examples.
+
+    Training parameters are read from fn_args.custom_config, as set by create_training_pipeline().
+    The function is kept in its own module file, so that changes to training code only invalidate
+    the cached Trainer output.
+
+    Args:
+        fn_args: A tfx.components.FnArgs object holding the Trainer inputs and parameters.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): Any unhandled exception, as necessary.
+    '''
+    config: dict = fn_args.custom_config or {}
+    image_shape: tuple = tuple(config.get('image_shape', (28, 28, 1)))
+    batch_size: int = config.get('batch_size', 128)
+
+    try:
+        tf_transform_output = tft.TFTransformOutput(fn_args.transform_output)
+
+        train_dataset = _input_fn(fn_args.train_files, fn_args.data_accessor, tf_transform_output, image_shape, batch_size)
+        eval_dataset = _input_fn(fn_args.eval_files, fn_args.data_accessor, tf_transform_output, image_shape, batch_size)
+
+        with _build_model(image_shape=image_shape,
+                          num_classes=config.get('num_classes', 10),
+                          learning_rate=config.get('learning_rate', 1e-3)) as model:
+            model.fit(train_dataset,
+                      steps_per_epoch=fn_args.train_steps,
+                      validation_data=eval_dataset,
+                      validation_steps=fn_args.eval_steps,
+                      callbacks=[keras.callbacks.TensorBoard(log_dir=fn_args.model_run_dir)])
+
+            tf.saved_model.save(model,
+                                fn_args.serving_model_dir,
+                                signatures={'serving_default': _serving_signature(model, tf_transform_output)})
+            logger.info(f'Saved the trained model to {fn_args.serving_model_dir}.')
+    except Exception as e:
+        logger.exception(e)
+        raise e
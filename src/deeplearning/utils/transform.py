@@ -0,0 +1,55 @@
+from deeplearning.utils.pipelines import _check_encoding, _decode_tensor_content
+from typing import Optional
+
+import logging
+import numpy  # type: ignore
+import tensorflow as tf  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+''' Feature keys of the transformed examples, as read by deeplearning.utils.trainer.'''
+IMAGE_KEY: str = 'image'
+LABEL_KEY: str = 'label'
+
+
+def preprocessing_fn(inputs: dict, custom_config: Optional[dict] = None):
+    '''
+    TFX Transform preprocessing function for image records, as written by serialize_image_data().
+
+    Decodes the serialized images to flattened float32 pixels in scale [0,1] and the labels to
+    int64 class ids, for either record encoding. The function is kept in its own module file so
+    that changes to the trainer module don't invalidate the cached Transform output.
+
+    Args:
+        inputs: A dictionary of raw feature tensors, keyed by feature name.
+        custom_config: An optional dictionary with the 'encoding', 'image_shape' and 'num_classes' of the records.
+
+    Returns:
+        outputs: A dictionary of transformed feature tensors, with keys IMAGE_KEY and LABEL_KEY.
+
+    Raises:
+        e (Exception): If the encoding is not supported.
+    '''
+    config: dict = custom_config or {}
+    encoding: str = config.get('encoding', 'tensor')
+    elements: int = int(numpy.prod(config.get('image_shape', (28, 28, 1))))
+    num_classes: int = config.get('num_classes', 10)
+
+    _check_encoding(encoding)
+
+    ''' SchemaGen infers a shape of [1] for single-valued features, so flatten them to one value per record.'''
+    raw_image = tf.reshape(inputs['raw_image'], [-1])
+    raw_label = tf.reshape(inputs['label'], [-1])
+
+    if encoding == 'raw':
+        images = tf.cast(tf.io.decode_raw(raw_image, tf.uint8), tf.float32) / 255.0
+        labels = tf.cast(raw_label, tf.int64)
+    else:
+        images = _decode_tensor_content(raw_image, tf.float32, elements)
+        labels = tf.argmax(_decode_tensor_content(raw_label, tf.float32, num_classes), axis=-1)
+
+    return {
+        IMAGE_KEY: tf.reshape(images, [-1, elements]),
+        LABEL_KEY: labels
+    }
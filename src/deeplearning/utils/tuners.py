@@ -0,0 +1,168 @@
+from deeplearning.utils.processors import WorkerPool, getContextSharedArrays
+from typing import Optional
+
+import logging
+import os
+import socket
+import time
+
+
+logger = logging.getLogger(__name__)
+
+''' The KerasTuner tuner id of the process running the chief oracle.'''
+CHIEF_ID: str = 'chief'
+
+
+def _free_port(host: str):
+    '''
+    Returns a TCP port that is free on a host, for the chief oracle to listen on.
+
+    Args:
+        host: A string specifying the host address.
+
+    Returns:
+        port: An integer port number.
+    '''
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(host: str, port: int, timeout: float):
+    '''
+    Waits until a host accepts TCP connections on a port.
+
+    Args:
+        host: A string specifying the host address.
+        port: An integer port number.
+        timeout: A float count of seconds to wait.
+
+    Returns:
+        None
+
+    Raises:
+        e (Exception): If the port doesn't accept connections in time.
+    '''
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                try:
+                    raise TimeoutError(f'The chief oracle at {host}:{port} did not start within {timeout}s.')
+                except Exception as e:
+                    logger.exception(e)
+                    raise e
+            time.sleep(0.1)
+
+
+def _search(build_tuner,
+            tuner_id: str,
+            host: str,
+            port: int,
+            overwrite: bool,
+            num_trials: int,
+            timeout: float,
+            fit_args: tuple,
+            fit_kwargs: dict,
+            shared: Optional[dict]):
+    '''
+    Builds a tuner with a KerasTuner distribution role, and runs its part of a parallel search.
+
+    Args:
+        build_tuner: A picklable callable taking an overwrite keyword argument, and returning a KerasTuner tuner.
+        tuner_id: A string specifying the tuner id, CHIEF_ID for the chief oracle.
+        host: A string specifying the chief oracle address.
+        port: An integer port number of the chief oracle.
+        overwrite: A bool indicating whether the chief overwrites the tuner project.
+        num_trials: An integer count of best trials for the chief to return.
+        timeout: A float count of seconds for workers to wait for the chief oracle to start.
+        fit_args: A tuple of positional arguments of the tuner's search().
+        fit_kwargs: A dictionary of keyword arguments of the tuner's search().
+        shared: An optional dictionary of SharedArrays specs, attached and passed to search() as keyword arguments.
+
+    Returns:
+        A tuple of the tuner id, and the chief oracle's best trials or None for workers.
+    '''
+    os.environ['KERASTUNER_TUNER_ID'] = tuner_id
+    os.environ['KERASTUNER_ORACLE_IP'] = host
+    os.environ['KERASTUNER_ORACLE_PORT'] = str(port)
+
+    if tuner_id == CHIEF_ID:
+        ''' The chief serves the oracle until the trial budget is spent and the workers' trials have ended.'''
+        tuner = build_tuner(overwrite=overwrite)
+        tuner.search(*fit_args, **fit_kwargs)
+        return tuner_id, tuner.oracle.get_best_trials(num_trials=num_trials)
+
+    ''' Wait for the chief to save the project, so workers don't read it while it's written.'''
+    _wait_for_port(host, port, timeout)
+    tuner = build_tuner(overwrite=False)
+    with getContextSharedArrays(shared or {}) as arrays:
+        tuner.search(*fit_args, **fit_kwargs, **arrays)
+    return tuner_id, None
+
+
+def parallel_search(build_tuner,
+                    workers: int,
+                    fit_args: tuple = (),
+                    fit_kwargs: Optional[dict] = None,
+                    shared: Optional[dict] = None,
+                    num_trials: int = 1,
+                    overwrite: bool = False,
+                    host: str = '127.0.0.1',
+                    port: Optional[int] = None,
+                    timeout: float = 300.0,
+                    context=None):
+    '''
+    Runs a KerasTuner search for one project over a chief oracle and local worker processes.
+
+    The chief process serves the tuner's oracle over gRPC on localhost, and each worker process requests
+    trials from it, so the project's trial budget is spread across the workers without repeating trials.
+    Each process builds its own tuner with build_tuner(), which must use the same oracle settings, directory
+    and project name in every process. The chief overwrites the project if asked, and workers never do.
+
+    Large datasets can be shared with the workers as SharedArrays, whose specs are attached in each
+    worker and passed to search() as keyword arguments, e.g. {'x_train': ..., 'y_train': ...}.
+
+    Args:
+        build_tuner: A picklable callable taking an overwrite keyword argument, and returning a KerasTuner tuner.
+        workers: An integer count of worker processes.
+        fit_args: A tuple of positional arguments of the tuner's search().
+        fit_kwargs: An optional dictionary of keyword arguments of the tuner's search().
+        shared: An optional dictionary of SharedArrays specs, passed to the workers' search() as keyword arguments.
+        num_trials: An integer count of best trials to return.
+        overwrite: A bool indicating whether to overwrite the tuner project.
+        host: A string specifying the address for the chief oracle to listen on.
+        port: An optional integer port number for the chief oracle, defaults to a free port.
+        timeout: A float count of seconds for workers to wait for the chief oracle to start.
+        context: An optional multiprocessing context, defaults to the multiprocessing module.
+
+    Returns:
+        trials: A list of the best keras_tuner Trial objects of the search.
+
+    Raises:
+        e (Exception): If the count of workers is less than 1, or the exception raised in any process.
+    '''
+    if workers < 1:
+        try:
+            raise ValueError(f'Worker count must be at least 1, got {workers}.')
+        except Exception as e:
+            logger.exception(e)
+            raise e
+
+    port = port or _free_port(host)
+    logger.info(f'Running a parallel search with a chief oracle on {host}:{port} and {workers} workers.')
+
+    trials: list = []
+    with WorkerPool(workers=workers + 1, context=context) as pool:
+        for tuner_id in [CHIEF_ID] + [f'tuner{index}' for index in range(workers)]:
+            pool.submit(_search, build_tuner, tuner_id, host, port, overwrite, num_trials, timeout, fit_args, fit_kwargs or {}, shared)
+
+        for tuner_id, result in pool.results():
+            logger.info(f'Tuner {tuner_id} finished its part of the parallel search.')
+            if tuner_id == CHIEF_ID:
+                trials = result
+
+    return trials
@@ -1,7 +1,8 @@
 from contextlib2 import nullcontext
 from deeplearning.utils.config import Config
 from deeplearning.utils.callbacks import results_logger
-from deeplearning.utils.processors import dequeue, enqueue, pid_logger
+from deeplearning.utils.logger import getContextLogListener, set_log_queue
+from deeplearning.utils.processors import WorkerPool, dequeue, enqueue, pid_logger
 
 import argparse
 import datetime
@@ -65,77 +66,60 @@ import keras  # type: ignore # noqa: E402
 
 logger.info(f'Using keras version {keras.__version__}.')
 
-''' Use a worker pool with async map and callback.'''
-with mp.Pool(conf.configuration["multiprocessing"]["workers"]) if conf.configuration["multiprocessing"]["enabled"] else nullcontext() as mpp:
-
-    if mpp is not None:
-        results = mpp.map_async(pid_logger, ['__ctxt__', '__iter__', '__test__', '__with__'], callback=results_logger)
-        results.wait()
-    else:
-        result_list: list = []
-        for name in ['__ctxt__', '__iter__', '__test__', '__with__']:
-            result = pid_logger(name)
-            result_list.append(result)
-
-        results_logger(result_list, __name__)
-
-''' Perform threaded parallel processing from a work queue.'''
-with mp.Manager() if conf.configuration["multiprocessing"]["enabled"] else nullcontext() as mpp:
-
-    if mpp is not None:
-        ''' In and out queues.'''
-        inpipe = mpp.Queue()
-        outpipe = mpp.Queue()
-
-        ''' Items to process in a list of tuples.'''
-        args_list: list = [('__ctxt__', outpipe), ('__iter__', outpipe), ('__test__', outpipe), ('__with__', outpipe)]
-        for args in args_list:
-            enqueue(args, inpipe)  # type: ignore[arg-type]
-
-        ''' Primitives for worker coordination.'''
-        proc_list: list = []
-        semaphore = mp.BoundedSemaphore(conf.configuration["multiprocessing"]["workers"])
-
-        try:
-            ''' While there's queued work, keep allocating processors to free threads.'''
-            while not inpipe.empty():
-                ''' Get a free thread, configure and start a process, and add it to a list for tracking.'''
-                if semaphore.acquire(block=False):
-                    args = dequeue(inpipe)
-                    proc = mp.Process(target=pid_logger, args=args)
-                    proc.start()
-                    logger.info(f'Started process {proc.name} with PID {proc.pid}.')
-                    proc_list.append(proc)
-
-                ''' Prune the process list and release threads as work completes.'''
-                for proc in proc_list:
-                    if proc.exitcode is not None:
-                        proc_list.remove(proc)
-                        semaphore.release()
-                        logger.info(f'Finished process {proc.name} with PID {proc.pid}.')
-
-        finally:
-            ''' When the work is all allocated, wait for it to finish.'''
-            while len(proc_list) > 0:
-                for proc in proc_list:
-                    if proc.exitcode is not None:
-                        proc_list.remove(proc)
-                        semaphore.release()
-                        logger.info(f'Finished process {proc.name} with PID {proc.pid}.')
-
-        try:
-            ''' Process the results from the output queue.'''
-            result_list = []
-            while not outpipe.empty():
-                result_list.append(dequeue(outpipe))
+''' Optionally, have workers queue their log records, and write them from one listener thread in this process.'''
+with getContextLogListener(format=conf.configuration["logging"]["format"],
+                           path=getattr(handler, 'baseFilename', conf.configuration["logging"]["path"]),
+                           type=conf.configuration["logging"]["type"]) if conf.configuration["logging"]["queue"] else nullcontext() as logqueue:
+
+    ''' Use a worker pool with async map and callback.'''
+    with mp.Pool(conf.configuration["multiprocessing"]["workers"], initializer=set_log_queue, initargs=(logqueue,)) if conf.configuration["multiprocessing"]["enabled"] else nullcontext() as mpp:
+
+        if mpp is not None:
+            results = mpp.map_async(pid_logger, ['__ctxt__', '__iter__', '__test__', '__with__'], callback=results_logger)
+            results.wait()
+        else:
+            result_list: list = []
+            for name in ['__ctxt__', '__iter__', '__test__', '__with__']:
+                result = pid_logger(name)
+                result_list.append(result)
 
-        finally:
             results_logger(result_list, __name__)
 
-    else:
-        result_list = []
-        for name in ['__ctxt__', '__iter__', '__test__', '__with__']:
-            result = pid_logger(name)
-            result_list.append(result)
+    ''' Perform threaded parallel processing from a work queue.'''
+    with mp.Manager() if conf.configuration["multiprocessing"]["enabled"] else nullcontext() as mpp:
+
+        if mpp is not None:
+            ''' In and out queues.'''
+            inpipe = mpp.Queue()
+            outpipe = mpp.Queue()
+
+            ''' Items to process in a list of tuples.'''
+            args_list: list = [('__ctxt__', outpipe), ('__iter__', outpipe), ('__test__', outpipe), ('__with__', outpipe)]
+            for args in args_list:
+                enqueue(args, inpipe)  # type: ignore[arg-type]
+
+            ''' Start a process for each item of work as workers free up, blocking on their sentinels rather than polling.'''
+            with WorkerPool(conf.configuration["multiprocessing"]["workers"], initializer=set_log_queue, initargs=(logqueue,)) as pool:
+                while not inpipe.empty():
+                    args = dequeue(inpipe)
+                    pool.submit(pid_logger, *args)
+
+                for result in pool.results():
+                    logger.info(f'Finished work for log {result[0]} in process with PID {result[1]}.')
+
+            try:
+                ''' Process the results from the output queue.'''
+                result_list = []
+                while not outpipe.empty():
+                    result_list.append(dequeue(outpipe))
+
+            finally:
+                results_logger(result_list, __name__)
 
-        results_logger(result_list, __name__)
+        else:
+            result_list = []
+            for name in ['__ctxt__', '__iter__', '__test__', '__with__']:
+                result = pid_logger(name)
+                result_list.append(result)
+
+            results_logger(result_list, __name__)